@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+lsex: headless core of the Lindenmayer System Explorer (pyLSEx).
+
+This package contains the grammar generation and output functions of
+pyLSEx without any dependency on wx, so it can be imported and used on
+machines without a display (e.g. compute nodes). The GUI in pyLSEx.py
+is a thin client of this package.
+
+Usage:
+
+    from lsex import LSEXfunctions, LSEXconfig
+
+    cfg = LSEXconfig(rule=[["0", "1"], ["1", "01"]], start="0", recs=10)
+    Grammar = LSEXfunctions().Generate_classic(cfg)
+
+    # write the iterations while they are generated, keep only the last
+    cfg.txtout = True
+    files = LSEXfunctions().Stream(cfg, keeplast=True)
+
+Importing lsex loads neither numpy nor multiprocessing. The process
+based parts are imported from their modules:
+
+    from lsex.sweep import Sweep
+    from lsex.parallel import ParallelExpander
+
+LICENCE
+This program is free software; you can redistribute it and/or modify
+it under the terms of the GNU General Public License (GPLv3) as published
+by the Free Software Foundation;
+
+This program is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY.
+"""
+
+from .functions import LSEXfunctions, LSEXconfig
+from .output import TextWriter, PickleWriter
+from .growth import Growth
+from .index import Index
+from .slp import SLP
+from .jump import Jump
+from .plan import Plan
+from .stats import Classicstats, Streamstats, StatsWriter
+from .rules import SAMPLES
+from .events import Progress, Cancelled
+from .cache import Cache
+from .memo import Blockmemo
+from .matcher import Matcher
+from .segments import Segmenter
+from .arrays import ArrayGrammar, ArrayRules
+from .bits import BitGrammar, BitRules
+from .container import Container, ContainerWriter, Convertlegacy
+
+ver = '1.0'
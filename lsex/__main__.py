@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+""" python -m lsex: command line interface (see cli.py) """
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
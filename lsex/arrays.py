@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+Array backed grammars (requires numpy).
+
+ArrayGrammar stores an iteration as numpy.uint8 codes into an alphabet
+(at most 256 symbols), i.e. one byte per symbol instead of per character
+python objects. ArrayRules expands such a grammar with classic rules by
+a vectorized gather: the replacement length of every symbol gives the
+output offsets (cumulative sum), the output buffer is allocated once and
+filled position by position of the replacements. Temporary memory is
+bounded by processing the input in blocks, so an expansion needs about
+the size of input plus output.
+"""
+
+from .rules import ClassicRules, Alphabet
+
+# input symbols expanded at once (bounds the offset arrays)
+BLOCK = 1 << 20
+
+
+# imported numpy module (None if not installed), see Numpy
+_numpy = []
+
+
+def Numpy():
+    """ numpy, imported on first use (None if it is not installed), so
+    importing lsex does not load it """
+    if not _numpy:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy.append(numpy)
+    return _numpy[0]
+
+
+def Available():
+    """ True if numpy is installed """
+    return Numpy() is not None
+
+
+class ArrayGrammar(object):
+    """ Grammar as numpy.uint8 codes into alphabet """
+
+    def __init__(self, codes, alphabet):
+        self.codes = codes
+        self.alphabet = alphabet
+
+    @classmethod
+    def Fromstring(cls, s, alphabet):
+        """ Encode the string s (all symbols must be in alphabet) """
+        numpy = Numpy()
+        index = dict((c, ii) for ii, c in enumerate(alphabet))
+        lut = cls._Lut(alphabet)
+        if lut is not None and not any(ord(c) > 255 for c in set(s)):
+            data = s if isinstance(s, bytes) else s.encode('latin-1')
+            codes = numpy.take(lut[1], numpy.frombuffer(data, dtype=numpy.uint8))
+        else:
+            codes = numpy.array([index[c] for c in s], dtype=numpy.uint8)
+        return cls(codes, alphabet)
+
+    @staticmethod
+    def _Lut(alphabet):
+        """ (code -> byte, byte -> code) tables for single byte alphabets """
+        numpy = Numpy()
+        if any(ord(c) > 255 for c in alphabet):
+            return None
+        tobyte = numpy.array([ord(c) for c in alphabet], dtype=numpy.uint8)
+        tocode = numpy.zeros(256, dtype=numpy.uint8)
+        tocode[tobyte] = numpy.arange(len(alphabet), dtype=numpy.uint8)
+        return tobyte, tocode
+
+    def __len__(self):
+        return len(self.codes)
+
+    def Tostring(self, a=0, b=None):
+        """ Symbols a..b-1 as string """
+        numpy = Numpy()
+        codes = self.codes[a:b]
+        lut = self._Lut(self.alphabet)
+        if lut is None:
+            return ''.join([self.alphabet[c] for c in codes])
+        data = numpy.take(lut[0], codes).tobytes()
+        if isinstance(self.alphabet[0], bytes):
+            return data
+        return data.decode('latin-1')
+
+    def Chunks(self, chunksize):
+        """ Yield the grammar as strings of at most chunksize symbols """
+        if len(self) == 0:
+            yield self.Tostring()
+        for xx in range(0, len(self), chunksize):
+            yield self.Tostring(xx, xx + chunksize)
+
+    def Counts(self):
+        """ Symbol counts as dict symbol -> count """
+        numpy = Numpy()
+        counts = numpy.bincount(self.codes, minlength=len(self.alphabet))
+        return dict(zip(self.alphabet, [int(c) for c in counts]))
+
+
+class ArrayRules(object):
+    """ Classic rules compiled for ArrayGrammar """
+
+    def __init__(self, rule, start):
+        numpy = Numpy()
+        if numpy is None:
+            raise ImportError("Array grammars require numpy")
+        self.rules = ClassicRules(rule)
+        table = self.rules.table
+
+        self.alphabet = Alphabet(rule, start)
+        if len(self.alphabet) > 256:
+            raise ValueError("Array grammars support at most 256 symbols")
+        index = dict((c, ii) for ii, c in enumerate(self.alphabet))
+        self.start = ArrayGrammar.Fromstring(start, self.alphabet)
+
+        k = len(self.alphabet)
+        self.lengths = numpy.array([len(table[c]) for c in self.alphabet],
+                                   dtype=numpy.int64)
+        self.width = int(self.lengths.max()) if k else 0
+        self.tab = numpy.zeros((k, max(self.width, 1)), dtype=numpy.uint8)
+        for ii, c in enumerate(self.alphabet):
+            for jj, r in enumerate(table[c]):
+                self.tab[ii, jj] = index[r]
+        self.minlen = int(self.lengths.min()) if k else 0
+
+    def Length(self, g):
+        """ Length of the expansion of g """
+        numpy = Numpy()
+        counts = numpy.bincount(g.codes, minlength=len(self.alphabet))
+        return int(numpy.dot(counts, self.lengths))
+
+    def Expand(self, g):
+        """ Apply the rules once to the ArrayGrammar g """
+        numpy = Numpy()
+        out = numpy.empty(self.Length(g), dtype=numpy.uint8)
+        base = 0
+        for bb in range(0, len(g), BLOCK):
+            base = self._Gather(g.codes[bb:bb+BLOCK], out, base)
+        return ArrayGrammar(out, self.alphabet)
+
+    def Expand_chunks(self, g, chunksize=BLOCK):
+        """ Yield the expansion of g in ArrayGrammar blocks, expanding
+        chunksize input symbols at a time """
+        numpy = Numpy()
+        for bb in range(0, max(len(g), 1), chunksize):
+            cb = g.codes[bb:bb+chunksize]
+            out = numpy.empty(int(self.lengths[cb].sum()), dtype=numpy.uint8)
+            self._Gather(cb, out, 0)
+            yield ArrayGrammar(out, self.alphabet)
+
+    def _Gather(self, codes, out, base):
+        """ write the expansion of codes to out[base:], return new base """
+        numpy = Numpy()
+        lengths = self.lengths[codes]
+        offsets = numpy.cumsum(lengths)
+        end = int(offsets[-1]) + base if len(offsets) else base
+        offsets -= lengths
+        offsets += base
+
+        for jj in range(0, self.width):
+            if jj < self.minlen:
+                out[offsets + jj] = self.tab[codes, jj]
+            else:
+                sel = lengths > jj
+                out[offsets[sel] + jj] = self.tab[codes[sel], jj]
+        return end
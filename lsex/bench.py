@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite of the generation engines and writers.
+
+    python -m lsex.bench                      # default sizes, results json
+    python -m lsex.bench --full               # extended modes up to 1 GB
+    python -m lsex.bench -g extended --sizes 1e3 1e6 -o new.json --compare old.json
+
+Groups:
+
+    systems  : every predefined system (rules.SAMPLES) iterated up to
+               --maxsymbols symbols with every classic engine (strings,
+               arrays and bits if numpy is installed), and its last
+               iteration expanded directly (direct)
+    extended : one segm, cont and cont_n iteration of random binary
+               inputs of --sizes symbols
+    writers  : text, pickle and container output of a grammar of
+               --sizes symbols
+
+Every case runs in a fresh process (unless --inprocess), so the peak
+resident memory (peak_rss, bytes) is the peak of that case. Results are
+saved as json with the time per iteration, symbols per second and the
+versions of python, numpy and lsex, and can be compared with --compare.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import tempfile
+import platform
+import argparse
+import multiprocessing
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from .functions import LSEXfunctions, LSEXconfig
+from .rules import SAMPLES, Alphabet
+from .output import TextWriter, PickleWriter, Timestamp
+from .container import ContainerWriter
+from . import arrays
+
+SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+FULLSIZES = SIZES + [10 ** 8, 10 ** 9]
+MAXSYMBOLS = 10 ** 7
+GROUPS = ('systems', 'extended', 'writers')
+SEED = 1
+
+# rules of the extended benchmarks (binary inputs)
+EXTENDED = {'segm': [["00", "01", "10", "11"], ["0", "011", "10", "1101"]],
+            'cont': [["01", "10", "110"], ["1", "0110", "0"]],
+            'cont_n': [["01", "10", "110"], ["1", "0110", "0"]]}
+
+
+def Peakrss():
+    """ Peak resident memory of this process in bytes (None if unknown) """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return rss
+    return rss * 1024
+
+
+def Randomgrammar(size, seed=SEED, block=1 << 20):
+    """ Reproducible random binary string of size symbols (a random block
+    of at most block symbols, repeated) """
+    rng = random.Random(seed)
+    n = min(size, block)
+    chunk = format(rng.getrandbits(n), '0%db' % n) if n > 0 else ''
+    return chunk * (size // n) + chunk[:size % n] if n > 0 else ''
+
+
+def Depth(rule, start, maxsymbols):
+    """ Deepest iteration of a classic grammar with at most maxsymbols
+    symbols """
+    lengths = LSEXfunctions().Lengths_classic(LSEXconfig(rule, start, 200))
+    depth = 0
+    for n, length in enumerate(lengths):
+        if length > maxsymbols:
+            break
+        depth = n
+    return depth
+
+
+def Cases(groups=GROUPS, sizes=SIZES, maxsymbols=MAXSYMBOLS):
+    """ List of benchmark cases """
+    cases = []
+    if 'systems' in groups:
+        for name, rule in SAMPLES:
+            start = rule[0][0]
+            engines = ['strings', 'direct']
+            if arrays.Available():
+                engines.append('arrays')
+                if len(Alphabet(rule, start)) <= 2:
+                    engines.append('bits')
+            depth = Depth(rule, start, maxsymbols)
+            for engine in engines:
+                cases.append({'group': 'systems', 'name': name, 'engine': engine,
+                              'rule': rule, 'start': start, 'depth': depth})
+    if 'extended' in groups:
+        for mode in ('segm', 'cont', 'cont_n'):
+            for size in sizes:
+                cases.append({'group': 'extended', 'name': mode, 'engine': mode,
+                              'rule': EXTENDED[mode], 'size': size})
+    if 'writers' in groups:
+        for writer in ('txt', 'pickle', 'lsx'):
+            for size in sizes:
+                cases.append({'group': 'writers', 'name': writer, 'engine': writer,
+                              'size': size})
+    return cases
+
+
+def Key(result):
+    """ Identifies a case across runs """
+    return '%s/%s/%s/%s' % (result['group'], result['name'], result['engine'],
+                            result.get('size', result.get('depth')))
+
+
+def _Timed(iterations):
+    """ (iteration, length, seconds) for the iterations of a generator """
+    t0 = time.time()
+    for n, ag in enumerate(iterations):
+        t1 = time.time()
+        yield n, len(ag), t1 - t0
+        t0 = time.time()
+
+
+def _Systems(case):
+    L = LSEXfunctions()
+    cfg = LSEXconfig(case['rule'], case['start'], case['depth'])
+    if case['engine'] == 'direct':
+        t0 = time.time()
+        ag = L.Direct_classic(cfg)
+        return [{'n': case['depth'], 'length': len(ag), 'seconds': time.time() - t0}]
+    if case['engine'] == 'arrays':
+        iterations = L.Iterate_arrays(cfg)
+    elif case['engine'] == 'bits':
+        iterations = L.Iterate_bits(cfg)
+    else:
+        iterations = L.Iterate_classic(cfg)
+    return [{'n': n, 'length': length, 'seconds': seconds}
+            for n, length, seconds in _Timed(iterations)][1:]
+
+
+def _Extended(case):
+    cfg = LSEXconfig(case['rule'], Randomgrammar(case['size']), 1, case['engine'])
+    iterations = LSEXfunctions().Iterate_extended(cfg)
+    result = list(_Timed(iterations))[1]
+    # symbols per second of the input
+    return [{'n': 1, 'length': case['size'], 'output': result[1], 'seconds': result[2]}]
+
+
+def _Writers(case):
+    ag = Randomgrammar(case['size'])
+    rule = [["0", "1"], ["1", "01"]]
+    folder = tempfile.mkdtemp(prefix='lsex_bench_')
+    try:
+        cfg = LSEXconfig(rule, '0', 1, outputpath=folder, prefix='bench')
+        t0 = time.time()
+        if case['engine'] == 'txt':
+            w = TextWriter(cfg)
+        elif case['engine'] == 'pickle':
+            w = PickleWriter(cfg)
+        else:
+            w = ContainerWriter(os.path.join(folder, 'bench.lsx'), rule,
+                                Alphabet(rule, '0'), encoding='utf-8')
+        w.Write(ag)
+        w.EndIteration()
+        files = w.Close([len(ag)])
+        seconds = time.time() - t0
+        written = sum(os.path.getsize(f) for f in files)
+    finally:
+        shutil.rmtree(folder, True)
+    return [{'n': 0, 'length': case['size'], 'bytes': written, 'seconds': seconds}]
+
+
+def Runcase(case):
+    """ Run one case, returns its result """
+    result = dict((k, case[k]) for k in case if k not in ('rule', 'start'))
+    base = Peakrss()
+    if case['group'] == 'systems':
+        iterations = _Systems(case)
+    elif case['group'] == 'extended':
+        iterations = _Extended(case)
+    else:
+        iterations = _Writers(case)
+
+    seconds = sum(it['seconds'] for it in iterations)
+    symbols = sum(it['length'] for it in iterations)
+    result.update(iterations=iterations, seconds=seconds, symbols=symbols,
+                  symbols_per_second=symbols / seconds if seconds > 0 else None,
+                  base_rss=base, peak_rss=Peakrss())
+    return result
+
+
+def Run(cases, inprocess=False, log=None):
+    """ Run all cases (each in a fresh process unless inprocess) """
+    results = []
+    for case in cases:
+        if inprocess:
+            result = Runcase(case)
+        else:
+            pool = multiprocessing.Pool(1)
+            try:
+                result = pool.apply(Runcase, (case,))
+            finally:
+                pool.close()
+                pool.join()
+        results.append(result)
+        if log is not None:
+            log(result)
+    return results
+
+
+def Environment():
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    from . import ver
+    return {'lsex': ver, 'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'numpy': numpy_version, 'platform': platform.platform(),
+            'machine': platform.machine(), 'cpus': multiprocessing.cpu_count(),
+            'date': Timestamp()}
+
+
+def Compare(old, new):
+    """ Lines old/new symbols per second of the cases of both runs """
+    before = dict((Key(r), r) for r in old['results'])
+    lines = []
+    for r in new['results']:
+        o = before.get(Key(r))
+        if o is None or not o['symbols_per_second'] or not r['symbols_per_second']:
+            continue
+        lines.append('%-40s %12.4g %12.4g  x%.2f' % (
+            Key(r), o['symbols_per_second'], r['symbols_per_second'],
+            r['symbols_per_second'] / o['symbols_per_second']))
+    return lines
+
+
+def _Log(result):
+    rate = result['symbols_per_second']
+    rss = result['peak_rss']
+    sys.stdout.write('%-40s %10.3fs %12s sym/s %10s MB\n' % (
+        Key(result), result['seconds'], '%.4g' % rate if rate else '-',
+        '%.1f' % (rss / 1e6) if rss else '-'))
+    sys.stdout.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='lsex.bench', description='pyLSEx benchmarks')
+    parser.add_argument('-g', '--group', choices=GROUPS, action='append',
+                        help='benchmark group, repeat for several (default: all)')
+    parser.add_argument('--sizes', type=float, nargs='+',
+                        help='input sizes of the extended and writer benchmarks')
+    parser.add_argument('--full', action='store_true', help='sizes from 1 KB to 1 GB')
+    parser.add_argument('--maxsymbols', type=float, default=MAXSYMBOLS,
+                        help='longest iteration of the system benchmarks')
+    parser.add_argument('--inprocess', action='store_true',
+                        help='run all cases in this process (peak_rss is cumulative)')
+    parser.add_argument('-o', '--output', help='results json (default: lsex_bench_<date>.json)')
+    parser.add_argument('--compare', metavar='JSON', help='earlier results to compare with')
+    args = parser.parse_args(argv)
+
+    if args.sizes:
+        sizes = [int(s) for s in args.sizes]
+    else:
+        sizes = FULLSIZES if args.full else SIZES
+    cases = Cases(args.group or GROUPS, sizes, int(args.maxsymbols))
+
+    run = {'environment': Environment(), 'results': Run(cases, args.inprocess, _Log)}
+
+    output = args.output or 'lsex_bench_%s.json' % run['environment']['date']
+    f = open(output, 'w')
+    try:
+        json.dump(run, f, indent=1, sort_keys=True)
+    finally:
+        f.close()
+    print(output)
+
+    if args.compare:
+        f = open(args.compare, 'r')
+        try:
+            old = json.load(f)
+        finally:
+            f.close()
+        for line in Compare(old, run):
+            print(line)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+Bit packed grammars for two symbol alphabets (requires numpy).
+
+Most predefined systems (Fibonacci, Algea, Thue-Morse, Feigenbaum, Cantor
+dust) only use "0" and "1". BitGrammar stores such an iteration with one
+bit per symbol (code 0 -> bit 0, code 1 -> bit 1, numpy.packbits order),
+which is 8 times smaller than one byte per symbol. BitRules expands a
+BitGrammar blockwise: a block of the input is unpacked, expanded with the
+ArrayRules gather and packed straight into the preallocated output, so
+only the packed input and output iterations are held as a whole.
+
+BitEncoder packs iterations given in chunks, the .lsx containers use it
+for their 'bits' encoding (see container.py).
+"""
+
+from .arrays import ArrayGrammar, ArrayRules, BLOCK, Numpy
+
+# number of set bits of every byte (built on first use)
+_popcount = []
+
+
+def Popcount():
+    if not _popcount:
+        numpy = Numpy()
+        _popcount.append(numpy.array([bin(ii).count('1') for ii in range(256)],
+                                     dtype=numpy.int64))
+    return _popcount[0]
+
+
+class BitGrammar(object):
+    """ Grammar of at most two symbols as packed bits """
+
+    def __init__(self, data, length, alphabet):
+        self.data = data
+        self.length = length
+        self.alphabet = alphabet
+
+    @classmethod
+    def Fromarray(cls, g):
+        """ Pack the ArrayGrammar g """
+        numpy = Numpy()
+        if len(g.alphabet) > 2:
+            raise ValueError("Bit grammars need an alphabet of at most 2 symbols")
+        return cls(numpy.packbits(g.codes), len(g), g.alphabet)
+
+    @classmethod
+    def Fromstring(cls, s, alphabet):
+        return cls.Fromarray(ArrayGrammar.Fromstring(s, alphabet))
+
+    def __len__(self):
+        return self.length
+
+    def Toarray(self, a=0, b=None):
+        """ Symbols a..b-1 as ArrayGrammar """
+        numpy = Numpy()
+        a, b, step = slice(a, b).indices(self.length)
+        b = max(a, b)
+        codes = numpy.unpackbits(self.data[a // 8:(b + 7) // 8])
+        return ArrayGrammar(codes[a % 8:a % 8 + b - a], self.alphabet)
+
+    def Tostring(self, a=0, b=None):
+        """ Symbols a..b-1 as string """
+        return self.Toarray(a, b).Tostring()
+
+    def Chunks(self, chunksize):
+        """ Yield the grammar as strings of at most chunksize symbols """
+        if self.length == 0:
+            yield self.Tostring()
+        for xx in range(0, self.length, chunksize):
+            yield self.Tostring(xx, xx + chunksize)
+
+    def Counts(self):
+        """ Symbol counts as dict symbol -> count """
+        numpy = Numpy()
+        ones = int(numpy.take(Popcount(), self.data).sum())
+        counts = [self.length - ones, ones]
+        return dict(zip(self.alphabet, counts[:len(self.alphabet)]))
+
+
+class BitPacker(object):
+    """ Packs code blocks of any length into a preallocated bit array """
+
+    def __init__(self, length):
+        numpy = Numpy()
+        self.data = numpy.zeros((length + 7) // 8, dtype=numpy.uint8)
+        self.pos = 0
+        self.carry = numpy.zeros(0, dtype=numpy.uint8)
+
+    def Add(self, codes):
+        numpy = Numpy()
+        codes = numpy.concatenate([self.carry, codes])
+        full = len(codes) - len(codes) % 8
+        packed = numpy.packbits(codes[:full])
+        self.data[self.pos:self.pos + len(packed)] = packed
+        self.pos += len(packed)
+        self.carry = codes[full:]
+
+    def Finish(self):
+        numpy = Numpy()
+        if len(self.carry):
+            self.data[self.pos] = numpy.packbits(self.carry)[0]
+        return self.data
+
+
+class BitRules(object):
+    """ Classic rules of a two symbol alphabet compiled for BitGrammar """
+
+    def __init__(self, rule, start):
+        self.arrayrules = ArrayRules(rule, start)
+        self.alphabet = self.arrayrules.alphabet
+        if len(self.alphabet) > 2:
+            raise ValueError("Bit grammars need an alphabet of at most 2 symbols")
+        self.start = BitGrammar.Fromarray(self.arrayrules.start)
+
+    def Length(self, g):
+        """ Length of the expansion of g """
+        counts = g.Counts()
+        return sum(counts[c] * int(l) for c, l in
+                   zip(self.alphabet, self.arrayrules.lengths))
+
+    def Expand(self, g):
+        """ Apply the rules once to the BitGrammar g """
+        numpy = Numpy()
+        length = self.Length(g)
+        packer = BitPacker(length)
+        for bb in range(0, len(g), BLOCK):
+            codes = g.Toarray(bb, bb + BLOCK).codes
+            block = numpy.empty(int(self.arrayrules.lengths[codes].sum()), dtype=numpy.uint8)
+            self.arrayrules._Gather(codes, block, 0)
+            packer.Add(block)
+        return BitGrammar(packer.Finish(), length, self.alphabet)
+
+    def Expand_chunks(self, g, chunksize=BLOCK):
+        """ Yield the expansion of g in ArrayGrammar blocks, expanding
+        chunksize input symbols at a time """
+        for bb in range(0, max(len(g), 1), chunksize):
+            for block in self.arrayrules.Expand_chunks(g.Toarray(bb, bb + chunksize)):
+                yield block
+
+
+class BitEncoder(object):
+    """ Packs string chunks of a two symbol alphabet into bytes. Bits
+    that do not fill a byte are carried over to the next chunk. """
+
+    def __init__(self, alphabet):
+        numpy = Numpy()
+        if numpy is None:
+            raise ImportError("Bit grammars require numpy")
+        if len(alphabet) > 2:
+            raise ValueError("Bit grammars need an alphabet of at most 2 symbols")
+        if any(ord(c) > 255 for c in alphabet):
+            raise ValueError("Bit encoded symbols must be single byte (latin-1)")
+        self.alphabet = list(alphabet)
+        self.one = ord(self.alphabet[-1]) if len(self.alphabet) == 2 else -1
+        self.carry = numpy.zeros(0, dtype=numpy.uint8)
+
+    def Encode(self, chunk):
+        numpy = Numpy()
+        data = chunk if isinstance(chunk, bytes) else chunk.encode('latin-1')
+        codes = (numpy.frombuffer(data, dtype=numpy.uint8) == self.one).astype(numpy.uint8)
+        codes = numpy.concatenate([self.carry, codes])
+        full = len(codes) - len(codes) % 8
+        self.carry = codes[full:]
+        return numpy.packbits(codes[:full]).tobytes()
+
+    def Flush(self):
+        """ Remaining bits (padded to a byte) """
+        numpy = Numpy()
+        data = numpy.packbits(self.carry).tobytes()
+        self.carry = numpy.zeros(0, dtype=numpy.uint8)
+        return data
+
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent on-disk cache of generated iterations.
+
+Every iteration is stored as a single iteration .lsx container named by
+the hash of (rules, start string, replacement type, depth), so equal
+requests find it again in later runs and other processes. A run to depth
+n loads the iterations up to the deepest cached depth d <= n and only
+generates d+1..n, which are added to the cache.
+
+The cache is limited to maxbytes. Files are touched when they are used,
+and the least recently used ones are removed when the limit is exceeded.
+
+    cfg.cache = Cache()                      # ~/.cache/lsex, 1 GB
+    cfg.cache = Cache('/scratch/lsex', 50 * 2**30)
+"""
+
+import os
+import copy
+import json
+import hashlib
+import tempfile
+
+from .rules import Alphabet
+from .container import Container, ContainerWriter
+
+# default size limit
+MAXBYTES = 1 << 30
+# version of the cached iterations (part of the keys)
+CACHEVERSION = 1
+
+
+def Defaultfolder():
+    """ $LSEX_CACHE or ~/.cache/lsex """
+    folder = os.environ.get('LSEX_CACHE')
+    if folder:
+        return folder
+    return os.path.join(os.path.expanduser('~'), '.cache', 'lsex')
+
+
+class Cache(object):
+    """ Content addressed cache of iterations with LRU size limit """
+
+    def __init__(self, folder=None, maxbytes=MAXBYTES):
+        self.folder = folder or Defaultfolder()
+        self.maxbytes = maxbytes
+        self.hits = 0
+        self.misses = 0
+        try:
+            os.makedirs(self.folder)
+        except OSError:
+            if not os.path.isdir(self.folder):
+                raise
+
+    @classmethod
+    def Open(cls, cache):
+        """ Cache from a cfg.cache value: Cache, folder or True (default) """
+        if isinstance(cache, Cache):
+            return cache
+        if cache is True:
+            return cls()
+        return cls(cache)
+
+    def Grammar(self, rule, start, replacetype=None):
+        """ Key prefix of a grammar (the depth is added by Key) """
+        if max(len(s) for s in rule[0]) == 1:
+            # classic rules: the replacement type is not used
+            replacetype = None
+        h = hashlib.sha1(json.dumps([CACHEVERSION, rule, replacetype]).encode('utf-8'))
+        h.update(start.encode('utf-8') if not isinstance(start, bytes) else start)
+        return h.hexdigest()
+
+    def Key(self, grammar, depth):
+        return hashlib.sha1(('%s:%d' % (grammar, depth)).encode('utf-8')).hexdigest()
+
+    def _Path(self, key):
+        return os.path.join(self.folder, key + '.lsx')
+
+    def Deepest(self, grammar, depth):
+        """ Deepest cached depth <= depth (0 if none is cached) """
+        for d in range(depth, 0, -1):
+            if os.path.exists(self._Path(self.Key(grammar, d))):
+                return d
+        return 0
+
+    def Load(self, grammar, depth):
+        """ Cached iteration, None if it is not cached """
+        path = self._Path(self.Key(grammar, depth))
+        try:
+            c = Container(path)
+        except (IOError, OSError):
+            self.misses += 1
+            return None
+        try:
+            ag = c.Load(0)
+        finally:
+            c.Close()
+        self._Touch(path)
+        self.hits += 1
+        return ag
+
+    def Store(self, grammar, depth, ag, rule, alphabet):
+        """ Add an iteration, old ones are evicted to make room for it.
+        Iterations larger than the cache are not stored. """
+        path = self._Path(self.Key(grammar, depth))
+        fd, tmp = tempfile.mkstemp(suffix='.tmp', dir=self.folder)
+        os.close(fd)
+        try:
+            w = ContainerWriter(tmp, rule, alphabet)
+            w.Write(ag)
+            w.EndIteration()
+            w.Close()
+            size = os.path.getsize(tmp)
+            if size > self.maxbytes:
+                os.remove(tmp)
+                return
+            self.Evict(self.maxbytes - size)
+            # atomic, concurrent runs never see partial files
+            if hasattr(os, 'replace'):
+                os.replace(tmp, path)
+            else:
+                os.rename(tmp, path)
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def _Touch(self, path):
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    def Entries(self):
+        """ (last use, size, path) of all cached iterations """
+        entries = []
+        for name in os.listdir(self.folder):
+            if not name.endswith('.lsx'):
+                continue
+            path = os.path.join(self.folder, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def Size(self):
+        return sum(size for used, size, path in self.Entries())
+
+    def Evict(self, maxbytes=None):
+        """ Remove the least recently used iterations until the cache is
+        at most maxbytes (default: the limit of the cache) """
+        if maxbytes is None:
+            maxbytes = self.maxbytes
+        entries = sorted(self.Entries())
+        total = sum(size for used, size, path in entries)
+        for used, size, path in entries:
+            if total <= maxbytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def Clear(self):
+        self.Evict(0)
+
+
+def Iterate_cached(iterate, cfg, probe=None):
+    """ Yield the iterations 0..cfg.recs of cfg, using the cache cfg.cache.
+    iterate(cfg) generates the iterations of a config without cache.
+    probe (events.Probe, optional) emits the events of the whole run:
+    the loaded iterations (without matches), and the generated ones
+    through the probe of iterate (cfg.probe, see Probe.Continue). """
+    cache = Cache.Open(cfg.cache)
+    replacetype = getattr(cfg, 'replacetype', None)
+    grammar = cache.Grammar(cfg.rule, cfg.start, replacetype)
+
+    depth = cache.Deepest(grammar, cfg.recs)
+    ag = cfg.start
+    if probe is not None:
+        probe.Start(ag)
+    yield ag
+    for d in range(1, depth + 1):
+        if probe is not None:
+            probe.Begin(d, ag)
+        cached = cache.Load(grammar, d)
+        if cached is None:
+            # evicted by another process meanwhile: generate from here
+            depth = d - 1
+            break
+        ag = cached
+        if probe is not None:
+            probe.End(ag)
+        yield ag
+
+    if depth >= cfg.recs:
+        if probe is not None:
+            probe.Finish()
+        return
+
+    rest = copy.copy(cfg)
+    rest.start = ag
+    rest.recs = cfg.recs - depth
+    rest.cache = None
+    # iteration number of rest.start (reported cycles)
+    rest.first = depth
+    rest.probe = probe
+    alphabet = Alphabet(cfg.rule, cfg.start)
+    for rr, ag in enumerate(iterate(rest)):
+        if rr == 0:
+            continue
+        cache.Store(grammar, depth + rr, ag, cfg.rule, alphabet)
+        yield ag
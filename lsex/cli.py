@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Command line interface of pyLSEx (no display needed).
+
+Generate a grammar (like the Lindenmayer System Generator):
+
+    python -m lsex -r 0=1 -r 1=01 -s 0 -n 20 -o out -p fib
+    python -m lsex --system "Koch curve" -s 1 -n 6 -f txt -f lsx
+
+Modify a saved grammar (like the Lindenmayer System Modifier), here
+with iteration 12 of a container as start string:
+
+    python -m lsex -r 01=10 -r 10=0110 -t cont --startfile fib.lsx \\
+        --startiteration 12 -n 5 -p mod_output
+
+Extend a saved grammar (container, grammar text file or .dat) in place
+up to iteration 30:
+
+    python -m lsex --extend out/fib_grammar_2017-01-01_12-00-00.lsx -n 30
+
+Generate iterations larger than the memory with a budget of 2 GB (the
+out-of-core files are written to /scratch):
+
+    python -m lsex -r 0=1 -r 1=01 -s 0 -n 45 -f lsx --keeplast \\
+        --memory 2048 --spillpath /scratch
+
+Run a job file (see sweep.py) on 4 processes:
+
+    python -m lsex --jobs sweep.json --workers 4
+
+Write symbol and transition (2-gram) counts of every iteration next to
+the length file, without reading the grammar files afterwards:
+
+    python -m lsex -r 0=1 -r 1=01 -s 0 -n 30 -f txt --stats 2
+
+Estimate lengths, memory and output size of every iteration without
+generating anything:
+
+    python -m lsex -r 0=1 -r 1=01 -s 0 -n 45 --plan
+
+Rules are given as LHS=RHS (an empty RHS deletes LHS). The created files
+are printed, one per line. The estimate of a run (see plan.py) is
+printed to stderr before it starts, runs exceeding the available memory
+are generated out-of-core, and runs whose output does not fit on the
+disk are refused.
+"""
+
+import sys
+import argparse
+
+from .functions import LSEXfunctions, LSEXconfig
+from .rules import SAMPLES, Sample, Checkrules
+from .sweep import Sweep, Loadstart
+from .output import Makedirs
+from .cache import Cache, MAXBYTES
+from .memo import Blockmemo, BLOCKSIZE
+from .stats import ORDER
+from .plan import Size
+from .cycles import Describe
+
+FORMATS = ('txt', 'lsx', 'dat')
+
+
+def _Rule(text):
+    if '=' not in text:
+        raise argparse.ArgumentTypeError("rules are given as LHS=RHS: %r" % text)
+    return tuple(text.split('=', 1))
+
+
+def Parser():
+    parser = argparse.ArgumentParser(
+        prog='lsex', description='Lindenmayer System Explorer (pyLSEx) without GUI')
+
+    rules = parser.add_argument_group('rules')
+    rules.add_argument('-r', '--rule', type=_Rule, action='append', default=[],
+                       metavar='LHS=RHS', help='replacement rule (repeat for every rule)')
+    rules.add_argument('--system', choices=[name for name, rule in SAMPLES], metavar='NAME',
+                       help='predefined system instead of --rule (see --list-systems)')
+    rules.add_argument('-t', '--replacetype', choices=('segm', 'cont', 'cont_n'),
+                       help='replacement type of multi character rules')
+
+    start = parser.add_argument_group('start string')
+    start.add_argument('-s', '--start', help='start string')
+    start.add_argument('--startfile', help='start from an iteration of a saved grammar (.lsx/.dat)')
+    start.add_argument('--startiteration', type=int, default=-1,
+                       help='iteration of --startfile, 0-based: 0 is the start string '
+                            '(the GUI counts from 1), -1 the last (default)')
+
+    parser.add_argument('-n', '--recs', type=int, help='number of iterations')
+
+    output = parser.add_argument_group('output')
+    output.add_argument('-o', '--outputpath', default='.', help='output folder (default: .)')
+    output.add_argument('-p', '--prefix', default='output', help='output file prefix (default: output)')
+    output.add_argument('-f', '--format', choices=FORMATS, action='append',
+                        help='output format, repeat for several (default: txt)')
+    output.add_argument('--keeplast', action='store_true',
+                        help='write only the last iteration (lengths of all), classic '
+                             'rules jump directly to it')
+
+    parser.add_argument('--extend', metavar='FILE',
+                        help='append iterations up to --recs to a saved grammar (.lsx/.txt/.dat)')
+    parser.add_argument('--plan', action='store_true',
+                        help='only print the estimated length and memory of every iteration')
+    parser.add_argument('--jobs', metavar='FILE', help='json job file (parameter sweep)')
+    parser.add_argument('--cache', metavar='DIR', nargs='?', const=True,
+                        help='reuse iterations of earlier runs (default DIR: ~/.cache/lsex)')
+    parser.add_argument('--cachesize', type=float, default=MAXBYTES / 2.0 ** 20, metavar='MB',
+                        help='size limit of the cache in MB (default: %(default)d)')
+    parser.add_argument('--memory', type=float, metavar='MB',
+                        help='memory budget, larger iterations are generated out-of-core')
+    parser.add_argument('--spillpath', metavar='DIR',
+                        help='folder of the out-of-core files (default: output folder)')
+    parser.add_argument('--memo', type=int, metavar='BLOCKSIZE', nargs='?', const=BLOCKSIZE,
+                        help='copy repeated blocks of extended iterations from a memo '
+                             '(default BLOCKSIZE: %d), the hit rate is printed' % BLOCKSIZE)
+    parser.add_argument('--stats', type=int, metavar='ORDER', nargs='?', const=ORDER,
+                        help='write the n-gram counts of every iteration up to ORDER '
+                             '(default: %d) to a _grammar_stats_ file' % ORDER)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='processes for large classic iterations or job files (default: 1)')
+    parser.add_argument('--list-systems', action='store_true', help='list the predefined systems')
+    return parser
+
+
+def main(argv=None):
+    parser = Parser()
+    args = parser.parse_args(argv)
+
+    if args.list_systems:
+        for name, rule in SAMPLES:
+            print('%-20s %s' % (name, '  '.join('%s=%s' % r for r in zip(*rule))))
+        return 0
+
+    if args.jobs is not None:
+        sweep = Sweep.Load(args.jobs)
+        results = sweep.Run(workers=args.workers)
+        for result in results:
+            for f in sorted(result['files']):
+                print(f)
+        print(sweep.manifest)
+        failed = [r for r in results if r['error'] is not None]
+        for r in failed:
+            sys.stderr.write('job %s: %s\n' % (r['id'], r['error']))
+        return 1 if failed else 0
+
+    if args.system is not None:
+        if args.rule:
+            parser.error('use either --rule or --system')
+        rule = Sample(args.system)
+    elif args.rule:
+        rule = [[r[0] for r in args.rule], [r[1] for r in args.rule]]
+    else:
+        rule = None
+    if args.recs is None:
+        parser.error('the number of iterations (--recs) is required')
+
+    if args.extend is not None:
+        try:
+            files = LSEXfunctions().Extend(args.extend, args.recs, rule, args.replacetype)
+        except ValueError as e:
+            parser.error(str(e))
+        for f in files:
+            print(f)
+        return 0
+
+    if rule is None:
+        parser.error('no rules given (--rule or --system)')
+    if (args.start is None) == (args.startfile is None):
+        parser.error('give either --start or --startfile')
+    try:
+        Checkrules(rule, args.replacetype)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.startfile is not None:
+        try:
+            start = Loadstart(args.startfile, args.startiteration)
+        except IndexError as e:
+            parser.error(str(e))
+    else:
+        start = args.start
+
+    formats = args.format or ['txt']
+    cfg = LSEXconfig(rule, start, args.recs, args.replacetype,
+                     args.outputpath, args.prefix,
+                     txtout='txt' in formats, pickout='dat' in formats,
+                     lsxout='lsx' in formats,
+                     workers=args.workers, spillpath=args.spillpath)
+    if args.memory is not None:
+        cfg.memory = int(args.memory * 2 ** 20)
+    if args.memo is not None:
+        cfg.memo = Blockmemo(args.memo)
+    if args.stats is not None:
+        cfg.stats = args.stats
+    if args.cache is not None:
+        folder = None if args.cache is True else args.cache
+        cfg.cache = Cache(folder, int(args.cachesize * 2 ** 20))
+
+    L = LSEXfunctions()
+    if not L.Isclassic(cfg) and cfg.replacetype is None:
+        parser.error('multi character rules need a replacement type (--replacetype)')
+
+    plan = L.Plan(cfg, keeplast=args.keeplast)
+    if args.plan:
+        for rr, length, nbytes in plan.Rows():
+            print('%5d %22d %12s' % (rr, length, Size(nbytes)))
+        print(plan.Message())
+        return 0
+    sys.stderr.write(plan.Message() + '\n')
+    if plan.engine == 'refuse':
+        return 1
+    plan.Apply(cfg)
+
+    Makedirs(cfg.outputpath)
+    for f in L.Stream(cfg, keeplast=args.keeplast):
+        print(f)
+    if L.cycle is not None:
+        sys.stderr.write('cycle: %s\n' % Describe(*L.cycle))
+    if args.memo is not None:
+        sys.stderr.write('memo: %(hits)d hits, %(misses)d misses (%(hitrate).1f%%), '
+                         'block size %(blocksize)d\n'
+                         % dict(cfg.memo.Stats(), hitrate=100 * cfg.memo.Hitrate()))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
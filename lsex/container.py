@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+Indexed container files (.lsx) for generated grammars.
+
+A container holds all iterations of a grammar together with the
+information needed to use them (rules, replacement type, alphabet). The
+index stores where each iteration is, so a single iteration can be read
+(or memory mapped) without deserializing the others.
+
+File layout (version 1):
+
+    header   32 bytes: b'LSEXCONT', version (uint32), reserved (uint32),
+             offset and size of the index (uint64 each), little endian
+    data     the iterations, one after another, each either utf-8 text
+             ('utf-8') or packed bits ('bits', two single byte symbols)
+    index    json: encoding, alphabet, rule, replacetype, and for every
+             iteration [offset, size in bytes, length in symbols];
+             optionally cycle: {start, period} of a run that repeats
+             itself (the repeated iterations point to the data of the
+             first occurrence)
+
+The index is written after the data and the header is updated when the
+writer is closed, so containers can be written while generating.
+Legacy .dat pickles are converted with Convertlegacy.
+"""
+
+import json
+import mmap
+import pickle
+import struct
+
+from .rules import Alphabet
+from . import arrays
+
+MAGIC = b'LSEXCONT'
+VERSION = 1
+HEADER = struct.Struct('<8sIIQQ')
+
+
+def Encoding(alphabet):
+    """ Default encoding of the iterations: 'bits' for at most two single
+    byte (latin-1) symbols if numpy is installed, else 'utf-8' """
+    if (arrays.Available() and len(alphabet) <= 2
+            and all(ord(c) < 256 for c in alphabet)):
+        return 'bits'
+    return 'utf-8'
+
+
+class _Utf8Encoder(object):
+    def Encode(self, chunk):
+        return chunk if isinstance(chunk, bytes) else chunk.encode('utf-8')
+
+    def Flush(self):
+        return b''
+
+
+class ContainerWriter(object):
+    """ Streaming writer for .lsx containers """
+
+    def __init__(self, filename, rule, alphabet, replacetype=None, encoding=None):
+        self.filename = filename
+        if encoding is None:
+            encoding = Encoding(alphabet)
+        if encoding == 'bits':
+            from .bits import BitEncoder
+            self.encoder = BitEncoder(alphabet)
+        elif encoding == 'utf-8':
+            self.encoder = _Utf8Encoder()
+        else:
+            raise ValueError("Unknown container encoding: %r" % encoding)
+
+        self.index = {"encoding": encoding,
+                      "alphabet": list(alphabet),
+                      "rule": rule,
+                      "replacetype": replacetype,
+                      "iterations": []}
+
+        self.file = open(filename, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+        self._Begin()
+
+    @classmethod
+    def Reopen(cls, filename, rule=None, replacetype=None):
+        """ Writer appending iterations to the container filename. The new
+        data is written behind the old index, so the container stays
+        valid until the header is updated by Close. rule and replacetype
+        are stored if the container has none. """
+        c = Container(filename)
+        index = c.index
+        c.Close()
+
+        self = cls.__new__(cls)
+        self.filename = filename
+        if index["encoding"] == 'bits':
+            from .bits import BitEncoder
+            self.encoder = BitEncoder(index["alphabet"])
+        else:
+            self.encoder = _Utf8Encoder()
+        if rule is not None and not index["rule"][0]:
+            index["rule"] = rule
+        if replacetype is not None and index["replacetype"] is None:
+            index["replacetype"] = replacetype
+        self.index = index
+
+        self.file = open(filename, 'r+b')
+        self.file.seek(0, 2)
+        self._Begin()
+        return self
+
+    def _Begin(self):
+        self.pos = self.file.tell()
+        self.length = 0
+
+    def Write(self, chunk):
+        """ Write a chunk (string) of the current iteration """
+        self.file.write(self.encoder.Encode(chunk))
+        self.length += len(chunk)
+
+    def EndIteration(self):
+        self.file.write(self.encoder.Flush())
+        end = self.file.tell()
+        self.index["iterations"].append([self.pos, end - self.pos, self.length])
+        self._Begin()
+
+    def Add(self, item):
+        """ Write a complete iteration (string) """
+        self.Write(item)
+        self.EndIteration()
+
+    def Reference(self, n):
+        """ Add iteration n again, pointing to its data (no copy) """
+        self.index["iterations"].append(list(self.index["iterations"][n]))
+
+    def Cycle(self, start, period):
+        """ Store that the grammar repeats with period from start on """
+        self.index["cycle"] = {"start": start, "period": period}
+
+    def Close(self, Grammar_length=None):
+        """ Write the index and the header. Returns the list of created
+        files. """
+        data = json.dumps(self.index).encode('utf-8')
+        pos = self.file.tell()
+        self.file.write(data)
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, 0, pos, len(data)))
+        self.file.close()
+        return [self.filename]
+
+
+def _Str(s):
+    """ json text as str (python 2: unicode if it is not ascii) """
+    try:
+        return str(s)
+    except UnicodeEncodeError:
+        return s
+
+
+class Container(object):
+    """ Reads single iterations of a .lsx container """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.file = open(filename, 'rb')
+        magic, version, reserved, pos, size = HEADER.unpack(self.file.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError("Not a pyLSEx container: %s" % filename)
+        if version > VERSION:
+            raise ValueError("Container version %d is not supported" % version)
+        self.file.seek(pos)
+        index = json.loads(self.file.read(size).decode('utf-8'))
+
+        self.encoding = index["encoding"]
+        self.alphabet = [_Str(c) for c in index["alphabet"]]
+        self.rule = [[_Str(c) for c in side] for side in index["rule"]]
+        self.replacetype = index["replacetype"]
+        self.iterations = index["iterations"]
+        self.cycle = index.get("cycle")
+        self.index = index
+        self._map = None
+
+    def __len__(self):
+        """ Number of iterations """
+        return len(self.iterations)
+
+    def Length(self, n):
+        """ Length (symbols) of iteration n """
+        return self.iterations[n][2]
+
+    def Lengths(self):
+        """ Lengths of all iterations (Grammar_length) """
+        return [it[2] for it in self.iterations]
+
+    def _Map(self):
+        if self._map is None:
+            self._map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def View(self, n):
+        """ Raw data of iteration n as memoryview into the memory mapped
+        file (no copy) """
+        offset, size, length = self.iterations[n]
+        return memoryview(self._Map())[offset:offset + size]
+
+    def Load(self, n):
+        """ Iteration n as string """
+        if self.encoding == 'bits':
+            return self.Loadbits(n).Tostring()
+        offset, size, length = self.iterations[n]
+        return self._Map()[offset:offset + size].decode('utf-8')
+
+    def Loadbits(self, n):
+        """ Iteration n of a 'bits' container as BitGrammar (memory mapped) """
+        import numpy
+        from .bits import BitGrammar
+        if self.encoding != 'bits':
+            raise ValueError("Container is not bit packed")
+        offset, size, length = self.iterations[n]
+        data = numpy.frombuffer(self._Map(), dtype=numpy.uint8, count=size, offset=offset)
+        return BitGrammar(data, length, self.alphabet)
+
+    def Close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self.file.close()
+
+
+def Convertlegacy(datfile, lsxfile, rule=None, replacetype=None, encoding=None):
+    """ Convert a legacy .dat pickle (list of iterations) into a .lsx
+    container. The rules are not stored in .dat files and can be given.
+    Returns the list of created files. """
+    with open(datfile, 'rb') as f:
+        Grammar = pickle.load(f)
+
+    if rule is None:
+        rule = [[], []]
+    symbols = set()
+    for item in Grammar:
+        symbols.update(item)
+    alphabet = Alphabet(rule, ''.join(symbols))
+
+    w = ContainerWriter(lsxfile, rule, alphabet, replacetype, encoding)
+    for item in Grammar:
+        w.Add(item)
+    return w.Close()
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Fixed point and cycle detection of extended runs.
+
+Modifier runs often converge (no rule matches any more) or fall into a
+short cycle. Cycles keeps the length and a sha1 hash (computed chunk by
+chunk) of every iteration. When an iteration n equals an earlier
+iteration m, the run is periodic from m on with period p = n - m (a
+fixed point if p = 1). The iterations m+p..m+2p-1 are kept (strings, or
+the spill files of the out-of-core generation), all later ones are these
+iterations again and are not generated any more. Only MAXSYMBOLS symbols
+are kept besides the current iteration; if the iterations of a period
+are longer, the run goes on without short-circuit (the cycle is still
+reported).
+
+The writers store repeated iterations as references where the format
+allows it (.lsx containers) and the period as metadata (container index,
+<prefix>_grammar_cycle_<date>.txt).
+"""
+
+import hashlib
+
+# symbols hashed at once
+BLOCK = 1 << 20
+# symbols of the kept iterations of a cycle (besides the current one)
+MAXSYMBOLS = 1 << 26
+
+
+class Hasher(object):
+    """ Key of an iteration given in chunks """
+
+    def __init__(self):
+        self.h = hashlib.sha1()
+        self.length = 0
+
+    def Update(self, chunk):
+        self.h.update(chunk if isinstance(chunk, bytes) else chunk.encode('utf-8'))
+        self.length += len(chunk)
+
+    def Key(self):
+        """ (length, sha1) of the iteration """
+        return self.length, self.h.digest()
+
+
+def Key(ag):
+    """ (length, sha1) of an iteration """
+    h = Hasher()
+    for xx in range(0, len(ag), BLOCK):
+        h.Update(ag[xx:xx+BLOCK])
+    return h.Key()
+
+
+def Reference(cycle, n):
+    """ Earlier iteration which iteration n repeats (None if it does not
+    repeat one), cycle is (start, period) or None """
+    if cycle is None:
+        return None
+    start, period = cycle
+    if n < start + period:
+        return None
+    return start + (n - start) % period
+
+
+def Describe(start, period):
+    """ Text of a cycle """
+    if period == 1:
+        return "fixed point from iteration %d" % start
+    return "period %d from iteration %d" % (period, start)
+
+
+class Cycles(object):
+    """ Detects the first repeated iteration of a run. first is the
+    iteration number of the first added iteration. """
+
+    def __init__(self, first=0, maxsymbols=MAXSYMBOLS):
+        self.first = first
+        self.maxsymbols = maxsymbols
+        self.seen = {}
+        self.start = None
+        self.period = None
+        self.ring = []
+        self.symbols = 0
+
+    def Add(self, n, ag, counts=None):
+        """ Add iteration n (with the match counts that produced it) """
+        if self.period is None or self.Keeping():
+            self.Addkey(n, Key(ag), ag, len(ag), counts)
+
+    def Addkey(self, n, key, item, length, counts=None):
+        """ Add iteration n of length symbols by its key (see Hasher), item
+        is returned by Get for the repetitions of n """
+        if self.period is None:
+            if key not in self.seen:
+                self.seen[key] = n
+                return
+            self.start = self.seen[key]
+            self.period = n - self.start
+            self.seen = {}
+        if not self.Keeping():
+            return
+        if self.symbols + length > self.maxsymbols:
+            # too long to be kept, the run is generated to the end
+            self.ring = None
+            return
+        self.ring.append((item, counts))
+        self.symbols += length
+
+    def Keeping(self):
+        """ True if the next iteration is kept for the cycle """
+        return self.ring is not None and self.period is not None \
+            and len(self.ring) < self.period
+
+    def Kept(self, item):
+        """ True if item is kept for the cycle """
+        return self.ring is not None and any(item is x for x, counts in self.ring)
+
+    def Items(self):
+        """ Kept iterations """
+        return [x for x, counts in self.ring or []]
+
+    def Complete(self):
+        """ True if all iterations of the cycle are known """
+        return self.ring is not None and self.period is not None \
+            and len(self.ring) == self.period
+
+    def Get(self, n):
+        """ (iteration, counts) of iteration n of a complete cycle """
+        return self.ring[(n - self.start - self.period) % self.period]
+
+    def Cycle(self):
+        """ (start, period) with start as absolute iteration number, None
+        if no iteration repeated """
+        if self.period is None:
+            return None
+        return self.start + self.first, self.period
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentation events of the generation loops.
+
+Callbacks subscribed with LSEXfunctions.Subscribe are called as
+callback(event, info) with the events
+
+    run_start       : rule, nrules, replacetype, engine, recs, start_length
+    iteration_start : iteration, input_length
+    iteration_end   : iteration, seconds, input_length, output_length,
+                      bytes (memory of the new iteration, of its largest
+                      chunk if it is generated in chunks), matches
+                      (number of replacements of every rule, None for
+                      iterations loaded from the cache)
+    run_end         : seconds, lengths (all iterations)
+
+A Probe is only created if there are subscribers, the loops without
+subscribers are not instrumented at all.
+
+Progress is a subscriber keeping the iteration, the number of symbols
+produced and the estimated remaining time of a run (e.g. for a progress
+dialog). A run can be stopped with LSEXfunctions.Stream(cfg,
+cancel=event), which raises Cancelled.
+"""
+
+import sys
+import time
+
+
+def Nbytes(g):
+    """ Memory of an iteration (string, ArrayGrammar or BitGrammar) """
+    for name in ('codes', 'data'):
+        if hasattr(g, name):
+            return int(getattr(g, name).nbytes)
+    return sys.getsizeof(g)
+
+
+def Classiccounts(rule):
+    """ Function returning the number of replacements of every classic
+    rule in an iteration (string, ArrayGrammar or BitGrammar, or its
+    symbol counts as dict). As in the expansion only the last rule of a
+    symbol counts. """
+    last = dict((lhs, ii) for ii, lhs in enumerate(rule[0]))
+
+    def Count(g):
+        if isinstance(g, dict):
+            symbols = g
+        elif hasattr(g, 'Counts'):
+            symbols = g.Counts()
+        else:
+            symbols = dict((c, g.count(c)) for c in last)
+        counts = [0] * len(rule[0])
+        for lhs, ii in last.items():
+            counts[ii] = symbols.get(lhs, 0)
+        return counts
+
+    return Count
+
+
+class Probe(object):
+    """ Emits the events of one generation run """
+
+    def __init__(self, callbacks, cfg, engine, Count=None):
+        self.callbacks = list(callbacks)
+        self.cfg = cfg
+        self.engine = engine
+        self.Count = Count
+        self.nrules = len(cfg.rule[0])
+        self.lengths = []
+        self.t0 = time.time()
+        # iterations loaded from the cache before the generated ones
+        self.first = 0
+        self.continued = False
+
+    def Continue(self, Count=None):
+        """ Continue a run started by cache.Iterate_cached in the generator
+        of the iterations after the cached ones: Start emits nothing and
+        the iterations are numbered from the last cached one on. """
+        self.Count = Count
+        self.first = len(self.lengths) - 1
+        self.continued = True
+        return self
+
+    def Emit(self, event, info):
+        for callback in self.callbacks:
+            callback(event, info)
+
+    def Start(self, ag):
+        if self.continued:
+            return
+        self.lengths.append(len(ag))
+        self.Emit('run_start', {'rule': self.cfg.rule, 'nrules': self.nrules,
+                                'replacetype': getattr(self.cfg, 'replacetype', None),
+                                'engine': self.engine, 'recs': self.cfg.recs,
+                                'start_length': len(ag)})
+
+    def Begin(self, iteration, ag):
+        """ Before iteration is generated from ag. counts collects the
+        replacements of every rule. """
+        self.iteration = iteration + self.first
+        self.input_length = len(ag)
+        if self.Count is not None:
+            self.counts = self.Count(ag)
+        else:
+            self.counts = [0] * self.nrules
+        self.Emit('iteration_start', {'iteration': self.iteration, 'input_length': len(ag)})
+        self.seconds = 0.0
+        self.t1 = time.time()
+
+    def Pause(self):
+        """ Stop the clock of the iteration (e.g. while a chunk is used) """
+        self.seconds += time.time() - self.t1
+
+    def Resume(self):
+        self.t1 = time.time()
+
+    def End(self, ng, length=None, nbytes=None):
+        """ After the iteration ng was generated. For iterations generated
+        in chunks (Pause/Resume) ng is None and length is given. """
+        if ng is not None:
+            self.seconds += time.time() - self.t1
+            length = len(ng)
+            nbytes = Nbytes(ng)
+        self.lengths.append(length)
+        self.Emit('iteration_end', {'iteration': self.iteration, 'seconds': self.seconds,
+                                    'input_length': self.input_length,
+                                    'output_length': length, 'bytes': nbytes,
+                                    'matches': self.counts})
+
+    def Finish(self):
+        self.Emit('run_end', {'seconds': time.time() - self.t0, 'lengths': self.lengths})
+
+
+class Cancelled(Exception):
+    """ A run was cancelled """
+
+
+class Progress(object):
+    """ Subscriber keeping the progress of a run. lengths (if known, e.g.
+    LSEXfunctions.Lengths_classic) are the lengths of all iterations,
+    else the remaining lengths are extrapolated from the last growth. """
+
+    def __init__(self, cfg, lengths=None):
+        self.recs = cfg.recs
+        self.lengths = lengths
+        self.iteration = 0
+        self.symbols = 0
+        self.growth = (0, 0)
+        self.t0 = time.time()
+
+    def __call__(self, event, info):
+        if event == 'run_start':
+            self.t0 = time.time()
+            self.symbols = info['start_length']
+            self.growth = (info['start_length'], info['start_length'])
+        elif event == 'iteration_end':
+            self.iteration = info['iteration']
+            self.symbols += info['output_length']
+            self.growth = (info['input_length'], info['output_length'])
+
+    def Remaining(self):
+        """ Estimated number of symbols still to be produced """
+        if self.lengths is not None:
+            return sum(self.lengths[self.iteration + 1:self.recs + 1])
+        before, after = self.growth
+        ratio = float(after) / before if before > 0 else 1.0
+        remaining = 0.0
+        length = float(after)
+        for rr in range(self.iteration, self.recs):
+            length *= ratio
+            remaining += length
+        return remaining
+
+    def Eta(self):
+        """ Estimated remaining seconds (None before the first iteration) """
+        if self.iteration == 0 or self.symbols == 0:
+            return None
+        return (time.time() - self.t0) / self.symbols * self.Remaining()
+
+    def Message(self):
+        eta = self.Eta()
+        if eta is None:
+            remaining = 'unknown'
+        elif eta < 60:
+            remaining = '%d s' % eta
+        elif eta < 3600:
+            remaining = '%d min %d s' % divmod(int(eta), 60)
+        else:
+            remaining = '%d h %d min' % divmod(int(eta) // 60, 60)
+        return 'Iteration %d of %d\n%d symbols produced\nRemaining time: %s' % (
+            self.iteration, self.recs, self.symbols, remaining)
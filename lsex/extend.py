@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Saved grammars that can be extended in place.
+
+Savedgrammar reads what is needed to continue a saved grammar: its last
+iteration, the lengths of all iterations, and the rules and replacement
+type (as far as the file stores them). Writer returns a writer which
+appends new iterations to the same files (see LSEXfunctions.Extend):
+
+    .lsx  container: rules, replacement type and lengths are in the index
+    .txt  grammar text file (<prefix>_grammar_<date>.txt): rules from the
+          rule file, lengths from the length file; the replacement type
+          of multi character rules has to be given
+    .dat  legacy pickle: the rules (and replacement type) have to be given
+"""
+
+import os
+import pickle
+
+from .container import Container, ContainerWriter
+from .output import TextWriter, PickleWriter, Textfiles, Readlengthfile, Readrulefile
+
+BLOCK = 1 << 16
+
+
+def Lastline(filename):
+    """ Last line of a text file (without reading the whole file) """
+    f = open(filename, 'rb')
+    try:
+        f.seek(0, 2)
+        end = f.tell()
+        # skip the newline ending the last line
+        for c in (b'\n', b'\r'):
+            if end > 0:
+                f.seek(end - 1)
+                if f.read(1) == c:
+                    end -= 1
+        pos = end
+        tail = b''
+        while pos > 0:
+            step = min(BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            tail = f.read(step) + tail
+            if tail.rfind(b'\n') >= 0:
+                break
+        return tail[tail.rfind(b'\n') + 1:].decode('utf-8')
+    finally:
+        f.close()
+
+
+class Savedgrammar(object):
+    """ Last iteration, lengths, rules and replacement type of a saved
+    grammar """
+
+    def __init__(self, filename, rule=None, replacetype=None):
+        self.filename = filename
+        ext = os.path.splitext(filename)[1].lower()
+
+        if ext == '.lsx':
+            self.kind = 'lsx'
+            c = Container(filename)
+            try:
+                self.last = c.Load(len(c) - 1)
+                self.lengths = c.Lengths()
+                if c.rule[0]:
+                    rule = self._Same(rule, c.rule, 'rules')
+                if c.replacetype is not None:
+                    replacetype = self._Same(replacetype, c.replacetype, 'replacement type')
+            finally:
+                c.Close()
+        elif ext == '.txt':
+            self.kind = 'txt'
+            lengthfile, rulefile = Textfiles(filename)
+            self.last = Lastline(filename)
+            self.lengths = Readlengthfile(lengthfile)
+            if os.path.exists(rulefile):
+                rule = self._Same(rule, Readrulefile(rulefile), 'rules')
+        elif ext == '.dat':
+            self.kind = 'dat'
+            f = open(filename, 'rb')
+            try:
+                Grammar = pickle.load(f)
+            finally:
+                f.close()
+            self.last = Grammar[-1]
+            self.lengths = [len(item) for item in Grammar]
+        else:
+            raise ValueError("Unknown grammar file type: %s" % filename)
+
+        if rule is None:
+            raise ValueError("The rules of %s are not stored and have to be given" % filename)
+        if max(len(s) for s in rule[0]) > 1 and replacetype is None:
+            raise ValueError("The replacement type of %s is not stored and has to be given"
+                             % filename)
+        if len(self.last) != self.lengths[-1]:
+            raise ValueError("Last iteration and lengths of %s do not match" % filename)
+        self.rule = rule
+        self.replacetype = replacetype
+
+    def _Same(self, given, stored, what):
+        """ The stored value, a different given one is an error """
+        if given is not None and given != stored:
+            raise ValueError("The %s differ from the ones stored in %s" % (what, self.filename))
+        return stored
+
+    def Recs(self):
+        """ Number of the last saved iteration """
+        return len(self.lengths) - 1
+
+    def Writer(self):
+        """ Writer appending to the saved files """
+        if self.kind == 'lsx':
+            return ContainerWriter.Reopen(self.filename, self.rule, self.replacetype)
+        if self.kind == 'txt':
+            return TextWriter.Reopen(self.filename, self.rule)
+        return PickleWriter.Reopen(self.filename)
@@ -0,0 +1,933 @@
+# -*- coding: utf-8 -*-
+"""
+Grammar generation and output functions of pyLSEx.
+
+All functions work on a configuration object (cfg) with the attributes
+
+    rule        : [[lhs1, lhs2, ...], [rhs1, rhs2, ...]]
+    start       : initial string
+    recs        : number of iterations
+    replacetype : 'segm', 'cont' or 'cont_n' (extended rules only)
+    outputpath  : output folder
+    prefix      : output file prefix
+    txtout      : save text files (True/False)
+    pickout     : save pickle files (True/False)
+    lsxout      : save a .lsx container (True/False, optional)
+    workers     : number of processes for classic iterations (optional,
+                  default 1)
+    parallel_min: iterations shorter than this are expanded in a single
+                  process (optional, default PARALLEL_MIN)
+    cache       : cache.Cache, cache folder or True (default folder) to
+                  reuse iterations of earlier runs (optional, default None)
+    memory      : memory budget in bytes of Iterate_chunks/Stream, larger
+                  iterations are generated out-of-core (optional, default
+                  None: no limit, see spill.py)
+    spillpath   : folder of the out-of-core files (optional, default the
+                  output folder)
+    memo        : memo.Blockmemo, block size or True (default) to copy
+                  repeated blocks of extended iterations from a memo
+                  (optional, default None)
+    stats       : highest n-gram order of the statistics file
+                  <prefix>_grammar_stats_<date>.txt (optional, default
+                  None: no statistics, see stats.py)
+
+Any object with these attributes can be used, e.g. LSEXconfig below or
+the cfg objects built by the GUI.
+
+Generate_classic/Generate_extended keep all iterations in memory and
+return them. Iterate_classic/Iterate_extended/Iterate_chunks yield the
+iterations one after another, and Stream writes them to the output
+files while they are generated. Iterate_arrays/Iterate_bits yield classic
+iterations as ArrayGrammar (numpy, one byte per symbol) or BitGrammar
+(two symbols, one bit per symbol). Extend continues a saved grammar and
+appends the new iterations to its files. Direct_classic (and Stream with
+keeplast=True) builds only the last classic iteration, by composing the
+rules with themselves (jump.py). Plan estimates lengths, memory and
+output size of a run before it is started and picks the engine (plan.py).
+Statistics gives the n-gram counts of all iterations, for classic rules
+without building them (stats.py).
+
+Callbacks subscribed with Subscribe receive the start/end events of the
+runs and iterations with times, lengths and match counts (events.py).
+"""
+
+import os
+
+from .rules import ClassicRules, Alphabet
+from .matcher import Matcher
+from .segments import Segmenter
+from . import arrays
+from .arrays import ArrayRules
+from .bits import BitRules
+from .container import ContainerWriter
+from .output import TextWriter, PickleWriter, Outputname, Timestamp, Writelengthfile
+from .growth import Growth, Maxlength
+from .index import Index
+from .slp import SLP
+from .jump import Jump
+from .plan import Plan
+from .parallel import ParallelExpander, PARALLEL_MIN
+from .cache import Iterate_cached
+from .memo import Blockmemo, Memosegm, Memocont, Aligned
+from .spill import Spillfile, Replacer, Symbolbytes
+from .extend import Savedgrammar
+from .events import Probe, Classiccounts, Nbytes, Cancelled
+from .cycles import Cycles, Hasher, Reference
+from .stats import Classicstats, Streamstats, StatsWriter, Propagates, ORDER
+
+CHUNKSIZE = 1 << 20
+
+
+class LSEXconfig(object):
+    """ Plain configuration object for the LSEXfunctions """
+
+    def __init__(self, rule, start, recs, replacetype=None, outputpath='.',
+                 prefix='output', txtout=False, pickout=False, lsxout=False,
+                 workers=1, parallel_min=PARALLEL_MIN, cache=None,
+                 memory=None, spillpath=None, memo=None, stats=None):
+        self.rule = rule
+        self.start = start
+        self.recs = recs
+        self.replacetype = replacetype
+        self.outputpath = outputpath
+        self.prefix = prefix
+        self.txtout = txtout
+        self.pickout = pickout
+        self.lsxout = lsxout
+        self.workers = workers
+        self.parallel_min = parallel_min
+        self.cache = cache
+        self.memory = memory
+        self.spillpath = spillpath
+        self.memo = memo
+        self.stats = stats
+
+
+class LSEXfunctions(object):
+    """ Class with main grammar functions"""
+
+    def __init__(self):
+        self.callbacks = []
+        self.memo = None
+        self.cycle = None
+
+
+    # #####################################################################
+    # instrumentation
+
+    def Subscribe(self, callback):
+        """ Call callback(event, info) at the start and end of every run and
+        iteration of the generators (see events.py). """
+        self.callbacks.append(callback)
+
+
+    def Unsubscribe(self, callback):
+        self.callbacks.remove(callback)
+
+
+    def _Probe(self, cfg, engine, Count=None):
+        """ Probe emitting the events of a run, None without subscribers """
+        if getattr(cfg, 'probe', None) is not None:
+            # run started by Iterate_cached
+            return cfg.probe.Continue(Count)
+        if not self.callbacks:
+            return None
+        return Probe(self.callbacks, cfg, engine, Count)
+
+
+    def Generate_classic(self, cfg):
+        """ Generate cfg.recs iterations with single character rules.
+        Symbols without a rule are kept. Returns the list of all
+        iterations (Grammar). """
+
+        Grammar = list(self.Iterate_classic(cfg))
+
+        self.Save(cfg, Grammar)
+
+        return Grammar
+
+
+    def Generate_extended(self, cfg):
+        """ Generate cfg.recs iterations with multi character rules using
+        the replacement type cfg.replacetype (single character rules are
+        classic rules, see Iterate_extended). Returns the list of all
+        iterations (Grammar). """
+
+        Grammar = list(self.Iterate_extended(cfg))
+
+        self.Save(cfg, Grammar)
+
+        return Grammar
+
+
+    # #####################################################################
+    # iteration generators
+
+    def Isclassic(self, cfg):
+        """ True if all rules replace single characters """
+        return max(len(s) for s in cfg.rule[0]) == 1
+
+
+    def Iterate(self, cfg):
+        """ Yield the iterations 0..cfg.recs of the classic or extended
+        grammar defined by cfg. """
+        if self.Isclassic(cfg):
+            return self.Iterate_classic(cfg)
+        return self.Iterate_extended(cfg)
+
+
+    def Iterate_classic(self, cfg):
+        """ Yield the iterations 0..cfg.recs with single character rules.
+        Only the current iteration is kept. With cfg.workers > 1 large
+        iterations are expanded on a process pool. """
+
+        if getattr(cfg, 'cache', None) is not None:
+            probe = self._Probe(cfg, 'strings', lambda ag: None)
+            for ag in Iterate_cached(self.Iterate_classic, cfg, probe):
+                yield ag
+            return
+
+        workers = getattr(cfg, 'workers', 1)
+        if workers > 1:
+            rules = ParallelExpander(cfg.rule, workers,
+                                     getattr(cfg, 'parallel_min', PARALLEL_MIN))
+        else:
+            rules = ClassicRules(cfg.rule)
+
+        probe = self._Probe(cfg, 'strings', Classiccounts(cfg.rule))
+        try:
+            ag = cfg.start
+            if probe is not None:
+                probe.Start(ag)
+            yield ag
+
+            for rr in range(0, cfg.recs):
+                if probe is not None:
+                    probe.Begin(rr + 1, ag)
+                ag = rules.Expand(ag)
+                if probe is not None:
+                    probe.End(ag)
+                yield ag
+            if probe is not None:
+                probe.Finish()
+        finally:
+            if workers > 1:
+                rules.Close()
+
+
+    def Iterate_extended(self, cfg):
+        """ Yield the iterations 0..cfg.recs with multi character rules.
+        Only the current iteration is kept. Once an iteration repeats an
+        earlier one, the rest of the run repeats the cycle and is not
+        generated any more; the cycle (start, period) is kept in
+        self.cycle (see cycles.py). Single character rules are generated
+        as classic rules whatever cfg.replacetype is, as by Iterate,
+        Iterate_chunks and Stream. """
+
+        self.cycle = None
+        if self.Isclassic(cfg):
+            for ag in self.Iterate_classic(cfg):
+                yield ag
+            return
+
+        if getattr(cfg, 'cache', None) is not None:
+            probe = self._Probe(cfg, cfg.replacetype, lambda ag: None)
+            for ag in Iterate_cached(self.Iterate_extended, cfg, probe):
+                yield ag
+            return
+
+        memo = self._Memo(cfg)
+        if cfg.replacetype == "segm": # segmentwise replacement
+            segmenter = Segmenter(cfg.rule)
+            Replace = segmenter.Replace_segm
+            if memo is not None:
+                Replace = Memosegm(segmenter, memo).Replace_segm
+        elif cfg.replacetype == "cont":  # continuous replacement
+            matcher = Matcher(cfg.rule)
+            Replace = matcher.Replace_cont
+            if memo is not None:
+                Replace = Memocont(matcher, memo).Replace
+        elif cfg.replacetype == "cont_n":   # continuous replacement (skip last n)
+            matcher = Matcher(cfg.rule)
+            Replace = matcher.Replace_cont_n
+            if memo is not None:
+                Replace = Memocont(matcher, memo, skip=True).Replace
+        else:
+            raise ValueError("Unknown replacement type: %r" % cfg.replacetype)
+
+        probe = self._Probe(cfg, cfg.replacetype)
+        cycles = Cycles(getattr(cfg, 'first', 0))
+        ag = cfg.start
+        cycles.Add(0, ag)
+        if probe is not None:
+            probe.Start(ag)
+        yield ag
+        for rr in range(0, cfg.recs):
+            if probe is not None:
+                probe.Begin(rr + 1, ag)
+            if cycles.Complete():
+                # the rest of the run repeats the cycle
+                ag, counts = cycles.Get(rr + 1)
+                if probe is not None:
+                    probe.counts = list(counts)
+            elif probe is None:
+                ag = Replace(ag)
+                cycles.Add(rr + 1, ag)
+            else:
+                ag = Replace(ag, probe.counts)
+                cycles.Add(rr + 1, ag, probe.counts)
+            if probe is not None:
+                probe.End(ag)
+            self.cycle = cycles.Cycle()
+            yield ag
+        if probe is not None:
+            probe.Finish()
+
+
+    def _Memo(self, cfg):
+        """ Block memo of cfg.memo (None without), kept in self.memo for
+        its statistics """
+        if getattr(cfg, 'memo', None) is None:
+            return None
+        self.memo = Blockmemo.Open(cfg.memo)
+        self.memo.Bind(cfg.rule, cfg.replacetype)
+        return self.memo
+
+
+    def Iterate_arrays(self, cfg):
+        """ Yield the iterations 0..cfg.recs with single character rules
+        as ArrayGrammar (one byte per symbol, requires numpy). """
+
+        rules = ArrayRules(cfg.rule, cfg.start)
+        probe = self._Probe(cfg, 'arrays', Classiccounts(cfg.rule))
+
+        ag = rules.start
+        if probe is not None:
+            probe.Start(ag)
+        yield ag
+
+        for rr in range(0, cfg.recs):
+            if probe is not None:
+                probe.Begin(rr + 1, ag)
+            ag = rules.Expand(ag)
+            if probe is not None:
+                probe.End(ag)
+            yield ag
+        if probe is not None:
+            probe.Finish()
+
+
+    def Iterate_bits(self, cfg):
+        """ Yield the iterations 0..cfg.recs with single character rules
+        of a two symbol alphabet as BitGrammar (one bit per symbol,
+        requires numpy). """
+
+        rules = BitRules(cfg.rule, cfg.start)
+        probe = self._Probe(cfg, 'bits', Classiccounts(cfg.rule))
+
+        ag = rules.start
+        if probe is not None:
+            probe.Start(ag)
+        yield ag
+
+        for rr in range(0, cfg.recs):
+            if probe is not None:
+                probe.Begin(rr + 1, ag)
+            ag = rules.Expand(ag)
+            if probe is not None:
+                probe.End(ag)
+            yield ag
+        if probe is not None:
+            probe.Finish()
+
+
+    def Iterate_chunks(self, cfg, chunksize=CHUNKSIZE):
+        """ Yield (iteration number, chunk) for all iterations in chunks of
+        at most chunksize characters. An iteration ends with the last
+        chunk of its number. For classic rules the last iteration is
+        expanded chunk by chunk and never built as a whole, so memory is
+        bounded by the second to last iteration plus one chunk. If numpy
+        is installed, classic iterations are kept as BitGrammar (two
+        symbols) or ArrayGrammar, unless cfg.workers > 1. With cfg.cache
+        all iterations are built as a whole (and cached). With cfg.memory
+        iterations exceeding the budget are generated out-of-core (the
+        cache is not used then). """
+
+        if getattr(cfg, 'memory', None) is not None:
+            for item in self._Iterate_spilled(cfg, chunksize):
+                yield item
+            return
+
+        if self.Isclassic(cfg) and cfg.recs > 0 and getattr(cfg, 'cache', None) is None:
+            rules = self._Classicrules(cfg)
+            strings = isinstance(rules, (ClassicRules, ParallelExpander))
+            if strings:
+                ag = cfg.start
+                Chunks = self._Chunks
+            else:
+                ag = rules.start
+                Chunks = type(ag).Chunks
+
+            probe = self._Probe(cfg, 'chunks', Classiccounts(cfg.rule))
+            try:
+                if probe is not None:
+                    probe.Start(ag)
+                for rr in range(0, cfg.recs):
+                    for chunk in Chunks(ag, chunksize):
+                        yield rr, chunk
+                    if rr < cfg.recs - 1:
+                        if probe is not None:
+                            probe.Begin(rr + 1, ag)
+                        ag = rules.Expand(ag)
+                        if probe is not None:
+                            probe.End(ag)
+
+                # last iteration: expand the previous one chunk by chunk
+                if strings:
+                    blocks = (rules.Expand(chunk) for chunk in self._Chunks(ag, chunksize))
+                else:
+                    blocks = (block.Tostring() for block in rules.Expand_chunks(ag, chunksize))
+                if probe is None:
+                    for block in blocks:
+                        yield cfg.recs, block
+                else:
+                    probe.Begin(cfg.recs, ag)
+                    length = nbytes = 0
+                    for block in blocks:
+                        probe.Pause()
+                        length += len(block)
+                        nbytes = max(nbytes, Nbytes(block))
+                        yield cfg.recs, block
+                        probe.Resume()
+                    probe.Pause()
+                    probe.End(None, length, nbytes)
+                    probe.Finish()
+            finally:
+                if isinstance(rules, ParallelExpander):
+                    rules.Close()
+            return
+
+        for rr, ag in enumerate(self.Iterate(cfg)):
+            for chunk in self._Chunks(ag, chunksize):
+                yield rr, chunk
+
+
+    def _Iterate_spilled(self, cfg, chunksize):
+        """ Iterate_chunks within the memory budget cfg.memory: iterations
+        are kept as strings while an iteration and the next one fit, then
+        every iteration is expanded from the spill file of the previous
+        one (see spill.py). Cycles of extended rules are detected as in
+        Iterate_extended, the spill files of a cycle are kept and read
+        again for its repetitions. """
+
+        replacer = Replacer(cfg)
+        alphabet = Alphabet(cfg.rule, cfg.start)
+        width = Symbolbytes(alphabet)
+        if replacer.classic:
+            lengths = self.Lengths_classic(cfg)
+            Count = Classiccounts(cfg.rule)
+        else:
+            Count = None
+        # chunks are cut at segment boundaries (segm)
+        chunksize = max(chunksize - chunksize % replacer.step, replacer.step)
+        folder = getattr(cfg, 'spillpath', None) or cfg.outputpath
+
+        probe = self._Probe(cfg, 'spill', Count)
+        cycles = None
+        self.cycle = None
+        if not replacer.classic:
+            cycles = Cycles(getattr(cfg, 'first', 0))
+        ag = cfg.start
+        if probe is not None:
+            probe.Start(ag)
+        if cycles is not None:
+            cycles.Add(0, ag)
+        for chunk in self._Chunks(ag, chunksize):
+            yield 0, chunk
+
+        # in memory
+        rr = 0
+        while rr < cfg.recs:
+            if cycles is not None and cycles.Complete():
+                break
+            if replacer.classic:
+                nextlength = lengths[rr + 1]
+            else:
+                nextlength = Maxlength(cfg.rule, cfg.replacetype, len(ag))
+            if (len(ag) + nextlength) * width > cfg.memory:
+                break
+            rr += 1
+            if probe is None:
+                ag = replacer.Replace(ag)
+            else:
+                probe.Begin(rr, ag)
+                ag = replacer.Replace(ag, probe.counts)
+                probe.End(ag)
+            if cycles is not None:
+                cycles.Add(rr, ag, probe.counts if probe is not None else None)
+                self.cycle = cycles.Cycle()
+            for chunk in self._Chunks(ag, chunksize):
+                yield rr, chunk
+
+        # out-of-core
+        src = dst = None
+        try:
+            if rr < cfg.recs and not (cycles is not None and cycles.Complete()):
+                src = Spillfile(folder, alphabet)
+                src.Write(ag)
+                src.Close()
+                ag = None
+            while rr < cfg.recs:
+                rr += 1
+                if cycles is not None and cycles.Complete():
+                    # the rest of the run repeats the cycle
+                    item, counts = cycles.Get(rr)
+                    if probe is not None:
+                        probe.Begin(rr, item)
+                        probe.counts = list(counts)
+                    for chunk in self._Kept(item, chunksize):
+                        if probe is not None:
+                            probe.Pause()
+                        yield rr, chunk
+                        if probe is not None:
+                            probe.Resume()
+                    if probe is not None:
+                        probe.Pause()
+                        probe.End(None, len(item), None)
+                    continue
+                # the last iteration is only yielded
+                if rr < cfg.recs:
+                    dst = Spillfile(folder, alphabet)
+                counts = None
+                if probe is not None:
+                    probe.Begin(rr, src)
+                    counts = probe.counts
+                hasher = Hasher()
+                length = nbytes = 0
+                for block in replacer.Replace_chunks(src.Chunks(chunksize), len(src), counts):
+                    if dst is not None:
+                        dst.Write(block)
+                    if probe is not None:
+                        probe.Pause()
+                    if cycles is not None:
+                        hasher.Update(block)
+                    length += len(block)
+                    nbytes = max(nbytes, Nbytes(block))
+                    yield rr, block
+                    if probe is not None:
+                        probe.Resume()
+                if probe is not None:
+                    probe.Pause()
+                    probe.End(None, length, nbytes)
+                if cycles is not None:
+                    if dst is not None:
+                        dst.Close()
+                    kept = cycles.Items()
+                    cycles.Addkey(rr, hasher.Key(), dst, length, counts)
+                    for f in kept:
+                        # the cycle is too long to be kept
+                        if isinstance(f, Spillfile) and f is not src \
+                                and not cycles.Kept(f):
+                            f.Remove()
+                    self.cycle = cycles.Cycle()
+                if cycles is None or not cycles.Kept(src):
+                    src.Remove()
+                src, dst = dst, None
+        finally:
+            for f in (src, dst):
+                if f is not None:
+                    f.Remove()
+            if cycles is not None:
+                for f in cycles.Items():
+                    if isinstance(f, Spillfile):
+                        f.Remove()
+        if probe is not None:
+            probe.Finish()
+
+
+    def _Kept(self, item, chunksize):
+        """ Chunks of an iteration kept for a cycle (string or spill file) """
+        if isinstance(item, Spillfile):
+            return item.Chunks(chunksize)
+        return self._Chunks(item, chunksize)
+
+
+    def _Isdirect(self, cfg):
+        """ True if the last iteration of cfg can be expanded directly
+        (classic rules, or aligned segm rules with memo, and no cache,
+        memory budget or process pool) """
+        if (cfg.recs == 0 or getattr(cfg, 'cache', None) is not None
+                or getattr(cfg, 'memory', None) is not None
+                or getattr(cfg, 'workers', 1) > 1):
+            return False
+        if self.Isclassic(cfg):
+            return True
+        return (cfg.replacetype == 'segm' and getattr(cfg, 'memo', None) is not None
+                and Aligned(cfg.rule))
+
+
+    def _Iterate_direct(self, cfg, chunksize):
+        """ Yield (cfg.recs, chunk) for the last iteration of classic
+        rules only, expanded from the start string through the composed
+        rules (see jump.py). The events report a single iteration. """
+
+        jump = Jump(cfg.rule, cfg.start)
+        if not self.callbacks:
+            for chunk in jump.Chunks(cfg.recs, chunksize):
+                yield cfg.recs, chunk
+            return
+
+        # replacements of the rules in the last iteration
+        previous = Growth(cfg.rule, cfg.start).Counts(cfg.recs - 1)
+        Count = Classiccounts(cfg.rule)
+        probe = self._Probe(cfg, 'direct', lambda ag: Count(previous))
+        probe.Start(cfg.start)
+        probe.Begin(cfg.recs, cfg.start)
+        length = nbytes = 0
+        for chunk in jump.Chunks(cfg.recs, chunksize):
+            probe.Pause()
+            length += len(chunk)
+            nbytes = max(nbytes, Nbytes(chunk))
+            yield cfg.recs, chunk
+            probe.Resume()
+        probe.Pause()
+        probe.End(None, length, nbytes)
+        probe.Finish()
+
+
+    def _Classicrules(self, cfg):
+        """ Most compact engine for the classic rules of cfg: BitRules for
+        two symbols, ArrayRules for up to 256 symbols (both need numpy),
+        ClassicRules (strings) otherwise. With cfg.workers > 1 the strings
+        are expanded on a process pool (ParallelExpander). """
+        workers = getattr(cfg, 'workers', 1)
+        if workers > 1:
+            return ParallelExpander(cfg.rule, workers,
+                                    getattr(cfg, 'parallel_min', PARALLEL_MIN))
+        if arrays.Available():
+            symbols = len(Alphabet(cfg.rule, cfg.start))
+            if symbols <= 2:
+                return BitRules(cfg.rule, cfg.start)
+            if symbols <= 256:
+                return ArrayRules(cfg.rule, cfg.start)
+        return ClassicRules(cfg.rule)
+
+
+    def _Chunks(self, ag, chunksize):
+        if len(ag) == 0:
+            yield ag
+        for xx in range(0, len(ag), chunksize):
+            yield ag[xx:xx+chunksize]
+
+
+    # #####################################################################
+    # output
+
+    def Writers(self, cfg):
+        """ Open the writers for the output formats selected in cfg """
+        writers = []
+        if cfg.txtout == True:
+            writers.append(TextWriter(cfg))
+        if cfg.pickout == True:
+            writers.append(PickleWriter(cfg))
+        if getattr(cfg, 'lsxout', False) == True:
+            writers.append(self._Containerwriter(cfg))
+        if getattr(cfg, 'stats', None) is not None:
+            writers.append(StatsWriter(cfg, cfg.stats))
+        return writers
+
+
+    def _Containerwriter(self, cfg):
+        filename = Outputname(cfg, "_grammar_", Timestamp(), ".lsx")
+        return ContainerWriter(filename, cfg.rule, Alphabet(cfg.rule, cfg.start),
+                               getattr(cfg, 'replacetype', None))
+
+
+    def Stream(self, cfg, keeplast=False, chunksize=CHUNKSIZE, cancel=None):
+        """ Generate the grammar defined by cfg and write each iteration
+        (in chunks) to the selected outputs as soon as it is produced.
+        With keeplast=True only the last iteration is written to the
+        grammar files (the length file still lists all iterations), for
+        classic rules it is expanded directly (see Direct_classic).
+        Returns the list of created files, the lengths of the iterations
+        are kept in self.Grammar_length.
+
+        cancel (e.g. a threading.Event) is checked before every chunk.
+        If it is set, the files written so far are removed and Cancelled
+        is raised.
+
+        Iterations repeating an earlier one (self.cycle, extended rules)
+        are stored as references where the output format allows it, and
+        the cycle is added to the metadata. """
+
+        writers = self.Writers(cfg)
+        self.cycle = None
+
+        if keeplast and self._Isdirect(cfg) and self.Isclassic(cfg):
+            Grammar_length = self.Lengths_classic(cfg)[:-1]
+            iterations = self._Iterate_direct(cfg, chunksize)
+        elif keeplast and self._Isdirect(cfg):
+            last = self.Direct_extended(cfg)
+            Grammar_length = self.Grammar_length[:-1]
+            iterations = ((cfg.recs, chunk) for chunk in self._Chunks(last, chunksize))
+        else:
+            Grammar_length = []
+            iterations = self.Iterate_chunks(cfg, chunksize)
+        current = -1
+        try:
+            for rr, chunk in iterations:
+                if cancel is not None and cancel.is_set():
+                    raise Cancelled()
+                if rr != current:
+                    if current >= 0 and (not keeplast):
+                        for w in writers:
+                            self._Enditeration(w, current)
+                    Grammar_length.append(0)
+                    current = rr
+                Grammar_length[rr] += len(chunk)
+                if keeplast and rr < cfg.recs:
+                    continue
+                for w in writers:
+                    if keeplast or self._Reference(w, rr) is None:
+                        w.Write(chunk)
+        except Cancelled:
+            iterations.close()
+            for w in writers:
+                for f in w.Close(Grammar_length):
+                    os.remove(f)
+            raise
+
+        files = []
+        for w in writers:
+            if keeplast:
+                w.EndIteration()
+            else:
+                self._Enditeration(w, current)
+            if self.cycle is not None and hasattr(w, 'Cycle'):
+                w.Cycle(*self.cycle)
+            files.extend(w.Close(Grammar_length))
+
+        self.Grammar_length = Grammar_length
+        return files
+
+
+    def _Reference(self, w, rr):
+        """ Earlier iteration repeated by iteration rr, if the writer w
+        stores references """
+        if not hasattr(w, 'Reference'):
+            return None
+        return Reference(self.cycle, rr)
+
+
+    def _Enditeration(self, w, rr):
+        ref = self._Reference(w, rr)
+        if ref is None:
+            w.EndIteration()
+        else:
+            w.Reference(ref)
+
+
+    def Extend(self, filename, recs, rule=None, replacetype=None, chunksize=CHUNKSIZE):
+        """ Continue a saved grammar (.lsx container, grammar text file or
+        .dat pickle, see extend.py) from its last iteration up to
+        iteration recs, and append the new iterations to the same files.
+        Rules and replacement type are taken from the file if it stores
+        them. Returns the list of updated files, the lengths of all
+        iterations are kept in self.Grammar_length. """
+
+        saved = Savedgrammar(filename, rule, replacetype)
+        done = saved.Recs()
+        Grammar_length = list(saved.lengths)
+        if recs <= done:
+            self.Grammar_length = Grammar_length
+            return []
+
+        cfg = LSEXconfig(saved.rule, saved.last, recs - done, saved.replacetype)
+        cfg.first = done
+        writer = saved.Writer()
+
+        current = 0
+        for rr, chunk in self.Iterate_chunks(cfg, chunksize):
+            if rr == 0:
+                continue
+            if rr != current:
+                if current > 0:
+                    writer.EndIteration()
+                Grammar_length.append(0)
+                current = rr
+            Grammar_length[-1] += len(chunk)
+            writer.Write(chunk)
+        writer.EndIteration()
+
+        self.Grammar_length = Grammar_length
+        return writer.Close(Grammar_length)
+
+
+    def Plan(self, cfg, keeplast=False):
+        """ Pre-flight estimate of the run cfg (see plan.Plan): lengths,
+        memory, output size and engine. plan.Apply(cfg) sets the memory
+        budget if the run has to be generated out-of-core. """
+        return Plan(cfg, keeplast, self._Isdirect(cfg))
+
+
+    def Lengths_classic(self, cfg):
+        """ Lengths of the iterations 0..cfg.recs for single character
+        rules, computed from the substitution matrix without building
+        the iterations. """
+        return Growth(cfg.rule, cfg.start).Lengths(cfg.recs)
+
+
+    def Direct_classic(self, cfg):
+        """ Iteration cfg.recs for single character rules, expanded from
+        the start string through the rules composed with themselves
+        (see jump.Jump), without building the intermediate iterations. """
+        return Jump(cfg.rule, cfg.start).Expand(cfg.recs)
+
+
+    def Direct_extended(self, cfg):
+        """ Iteration cfg.recs of segm rules whose right hand sides are a
+        multiple of the segment length long. The blocks of the memo
+        cfg.memo (default: a new Blockmemo) are replaced memo.lookahead
+        iterations at once (see memo.py), skipping the iterations in
+        between. The lengths of all iterations are kept in
+        self.Grammar_length. No events are emitted. """
+        if cfg.replacetype != 'segm' or not Aligned(cfg.rule):
+            raise ValueError("Direct expansion needs segm rules with right hand sides "
+                             "of a multiple of the segment length")
+        if getattr(cfg, 'memo', None) is None:
+            self.memo = Blockmemo()
+            self.memo.Bind(cfg.rule, cfg.replacetype)
+        else:
+            self._Memo(cfg)
+        segm = Memosegm(Segmenter(cfg.rule), self.memo)
+
+        ag = cfg.start
+        Grammar_length = [len(ag)]
+        while len(Grammar_length) <= cfg.recs:
+            depth = min(self.memo.lookahead, cfg.recs + 1 - len(Grammar_length))
+            ag, lengths = segm.Advance(ag, depth)
+            Grammar_length.extend(lengths)
+
+        self.Grammar_length = Grammar_length
+        return ag
+
+
+    def Slice_classic(self, cfg, a, b):
+        """ Characters a..b-1 of iteration cfg.recs for single character
+        rules, without building the iteration (see index.Index). """
+        return Index(cfg.rule, cfg.start).Slice(cfg.recs, a, b)
+
+
+    def Compress_classic(self, cfg):
+        """ Iteration cfg.recs for single character rules as straight line
+        program (see slp.SLP), without building the iteration. """
+        return SLP.Fromclassic(cfg.rule, cfg.start, cfg.recs)
+
+
+    def Statistics(self, cfg, order=ORDER):
+        """ n-gram counts of the iterations 0..cfg.recs, for every
+        iteration the list of the counts of the 1-grams, 2-grams, ...
+        up to order as dicts n-gram -> count. For classic rules the
+        counts are derived from the counts of the previous iteration
+        without building the iterations, else the iterations are counted
+        in a single pass while they are generated (see stats.py). """
+        if self.Isclassic(cfg) and Propagates(cfg.rule):
+            return list(Classicstats(cfg.rule, cfg.start, order).Iterations(cfg.recs))
+
+        self.cycle = None
+        stats = Streamstats(order)
+        current = 0
+        for rr, chunk in self.Iterate_chunks(cfg):
+            if rr != current:
+                self._Enditeration(stats, current)
+                current = rr
+            if Reference(self.cycle, rr) is None:
+                stats.Write(chunk)
+        self._Enditeration(stats, current)
+        return stats.iterations
+
+
+    def Savelengthfile(self, cfg):
+        """ Write only the _grammar_length_ file of a classic grammar
+        (see Lengths_classic). Returns the list of created files. """
+        filename = Outputname(cfg, "_grammar_length_", Timestamp(), ".txt")
+        Writelengthfile(filename, self.Lengths_classic(cfg))
+        return [filename]
+
+
+    def Save(self, cfg, Grammar):
+        """ Save Grammar in the output formats selected in cfg. Returns the
+        list of created files. """
+
+        Grammar_length = list(map(len, Grammar))
+        cycle = self._Savedcycle(Grammar)
+
+        files = []
+        if cfg.txtout == True:
+            files.extend(self.Savetextfile(cfg, Grammar, Grammar_length, cycle))
+
+        if cfg.pickout == True:
+            files.extend(self.Savepicklefile(cfg, Grammar, Grammar_length))
+
+        if getattr(cfg, 'lsxout', False) == True:
+            files.extend(self.Savecontainerfile(cfg, Grammar, Grammar_length, cycle))
+
+        if getattr(cfg, 'stats', None) is not None:
+            files.extend(self.Savestatsfile(cfg, Grammar, Grammar_length, cycle))
+
+        return files
+
+
+    def _Savedcycle(self, Grammar):
+        """ self.cycle if Grammar repeats itself as self.cycle says (i.e.
+        Grammar was just generated), else None """
+        if self.cycle is None or len(Grammar) <= sum(self.cycle):
+            return None
+        for rr in range(sum(self.cycle), len(Grammar)):
+            if Grammar[rr] != Grammar[Reference(self.cycle, rr)]:
+                return None
+        return self.cycle
+
+
+    def Savetextfile(self, cfg, Grammar, Grammar_length, cycle=None):
+
+        w = TextWriter(cfg)
+        for item in Grammar:
+            w.Add(item)
+        if cycle is not None:
+            w.Cycle(*cycle)
+        return w.Close(Grammar_length)
+
+
+    def Savepicklefile(self, cfg, Grammar, Grammar_length):
+
+        w = PickleWriter(cfg)
+        for item in Grammar:
+            w.Add(item)
+        return w.Close(Grammar_length)
+
+
+    def Savestatsfile(self, cfg, Grammar, Grammar_length, cycle=None):
+
+        w = StatsWriter(cfg, cfg.stats)
+        for rr, item in enumerate(Grammar):
+            ref = Reference(cycle, rr)
+            if ref is None:
+                w.Add(item)
+            else:
+                w.Reference(ref)
+        return w.Close(Grammar_length)
+
+
+    def Savecontainerfile(self, cfg, Grammar, Grammar_length, cycle=None):
+
+        w = self._Containerwriter(cfg)
+        for rr, item in enumerate(Grammar):
+            ref = Reference(cycle, rr)
+            if ref is None:
+                w.Add(item)
+            else:
+                w.Reference(ref)
+        if cycle is not None:
+            w.Cycle(*cycle)
+        return w.Close(Grammar_length)
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Exact iteration lengths and symbol counts of classic grammars.
+
+For single character rules the number of each symbol in iteration n
+(the Parikh vector) is M^n * v0, where M is the substitution matrix of
+the rules (M[i][j] = number of symbol i in the replacement of symbol j)
+and v0 the symbol counts of the start string. Using python integers and
+matrix powers by repeated squaring, lengths and counts of iteration n
+are computed in O(log n) matrix products without building any string.
+
+Extended rules have no such matrix, Maxlength bounds the length of the
+next iteration instead.
+"""
+
+from .rules import ClassicRules, Alphabet
+
+
+def Matmul(A, B):
+    """ Product of two integer matrices (lists of rows) """
+    Bt = list(zip(*B))
+    return [[sum(a*b for a, b in zip(row, col)) for col in Bt] for row in A]
+
+
+def Matvec(A, v):
+    return [sum(a*b for a, b in zip(row, v)) for row in A]
+
+
+def Matpow(A, n):
+    """ A^n by repeated squaring """
+    R = [[int(ii == jj) for jj in range(len(A))] for ii in range(len(A))]
+    while n > 0:
+        if n & 1:
+            R = Matmul(R, A)
+        n >>= 1
+        if n:
+            A = Matmul(A, A)
+    return R
+
+
+def Maxlength(rule, replacetype, length):
+    """ Upper bound of the length of the iteration following one of length
+    symbols with extended rules: every position (cont, cont_n) or segment
+    (segm) replaced by the longest right hand side """
+    longest = max(len(s) for s in rule[1])
+    if replacetype == 'segm':
+        steps = max(len(s) for s in rule[0])
+        return -(-length // steps) * max(longest, steps)
+    return length * max(longest, 1)
+
+
+class Growth(object):
+    """ Substitution matrix of classic rules and a start string """
+
+    def __init__(self, rule, start):
+        self.rules = ClassicRules(rule)
+        table = self.rules.table
+
+        self.alphabet = Alphabet(rule, start)
+        index = dict((s, ii) for ii, s in enumerate(self.alphabet))
+
+        k = len(self.alphabet)
+        self.matrix = [[0]*k for ii in range(k)]
+        for jj, s in enumerate(self.alphabet):
+            for c in table[s]:
+                self.matrix[index[c]][jj] += 1
+
+        self.start = [0]*k
+        for c in start:
+            self.start[index[c]] += 1
+
+    def Vector(self, n):
+        """ Symbol counts of iteration n as list (order of self.alphabet) """
+        return Matvec(Matpow(self.matrix, n), self.start)
+
+    def Counts(self, n):
+        """ Symbol counts of iteration n as dict symbol -> count """
+        return dict(zip(self.alphabet, self.Vector(n)))
+
+    def Length(self, n):
+        """ Length of iteration n """
+        return sum(self.Vector(n))
+
+    def Vectors(self, recs):
+        """ Yield the symbol counts of the iterations 0..recs """
+        v = self.start
+        yield v
+        for rr in range(0, recs):
+            v = Matvec(self.matrix, v)
+            yield v
+
+    def Lengths(self, recs):
+        """ Lengths of the iterations 0..recs (Grammar_length) """
+        return [sum(v) for v in self.Vectors(recs)]
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Random access into iterations of classic grammars.
+
+Index stores for every depth d and symbol s the length of s after d
+iterations. With these lengths single characters (Char_at) or windows
+(Slice) of iteration n are found by descending the derivation tree from
+the start string, without expanding the iteration. A lookup costs
+O(n * longest replacement) steps plus the length of the window.
+"""
+
+from .rules import ClassicRules, Alphabet
+
+
+class Index(object):
+    """ Expansion length index of classic rules and a start string """
+
+    def __init__(self, rule, start):
+        self.rules = ClassicRules(rule)
+        self.table = self.rules.table
+        self.start = start
+
+        self.lengths = [dict((s, 1) for s in Alphabet(rule, start))]
+
+    def _Extend(self, n):
+        """ make sure the symbol lengths up to depth n are known """
+        table = self.table
+        while len(self.lengths) <= n:
+            last = self.lengths[-1]
+            self.lengths.append(dict((s, sum(last[c] for c in table[s]))
+                                     for s in last))
+
+    def Length(self, n):
+        """ Length of iteration n """
+        self._Extend(n)
+        lengths = self.lengths[n]
+        return sum(lengths[c] for c in self.start)
+
+    def _Descend(self, n, k):
+        """ Path from the start string to character k of iteration n as
+        stack of (string, position, depth) """
+        stack = []
+        s = self.start
+        d = n
+        while True:
+            lengths = self.lengths[d]
+            for ii, c in enumerate(s):
+                l = lengths[c]
+                if k < l:
+                    break
+                k -= l
+            stack.append((s, ii, d))
+            if d == 0:
+                return stack
+            s = self.table[c]
+            d = d - 1
+
+    def _Walk(self, path, count):
+        """ Collect count characters starting at the end of the path """
+        table = self.table
+        lengths = self.lengths
+        # continue after the descended characters on the upper levels
+        stack = [(s, ii + 1, d) for s, ii, d in path[:-1]]
+        stack.append(path[-1])
+        out = []
+        while stack and len(out) < count:
+            s, ii, d = stack.pop()
+            if ii >= len(s):
+                continue
+            stack.append((s, ii + 1, d))
+            c = s[ii]
+            if d == 0 or table[c] == c:
+                out.append(c)
+            elif lengths[d][c] > 0:
+                stack.append((table[c], 0, d - 1))
+        return ''.join(out)
+
+    def Char_at(self, n, k):
+        """ Character k of iteration n """
+        length = self.Length(n)
+        if k < 0:
+            k = k + length
+        if k < 0 or k >= length:
+            raise IndexError("Index %d out of range (iteration %d has length %d)"
+                             % (k, n, length))
+        s, ii, d = self._Descend(n, k)[-1]
+        return s[ii]
+
+    def Slice(self, n, a, b):
+        """ Characters a..b-1 of iteration n (like Grammar[n][a:b]) """
+        a, b, step = slice(a, b).indices(self.Length(n))
+        if a >= b:
+            return ''
+        return self._Walk(self._Descend(n, a), b - a)
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Direct expansion of a classic iteration by repeated squaring of the rules.
+
+Classic rules map every symbol to a string (a morphism of the alphabet).
+Applied 2^k times they map symbol s to the image tables[k][s], and
+tables[k+1][s] is tables[k] applied to tables[k][s]. Iteration n is the
+start string expanded through the tables of the binary digits of n,
+i.e. in O(log n) passes instead of building all n - 1 intermediate
+iterations. The smaller powers are applied first, so the intermediate
+strings stay short, and the last pass can be streamed chunk by chunk.
+
+Tables are squared while their longest image has at most TABLE_MAX
+symbols, larger powers apply the last table repeatedly.
+"""
+
+from .rules import ClassicRules, Alphabet
+
+# longest image of a composed table
+TABLE_MAX = 1 << 16
+
+
+class Jump(object):
+    """ Composed classic rules of a start string """
+
+    def __init__(self, rule, start, tablemax=TABLE_MAX):
+        self.start = start
+        self.tablemax = tablemax
+        self.alphabet = Alphabet(rule, start)
+
+        rules = ClassicRules(rule)
+        self.tables = [rules]
+        self.lengths = [dict((s, len(rules.table[s])) for s in self.alphabet)]
+
+    def _Square(self):
+        """ add the table of the next power of two, False if its longest
+        image would exceed tablemax """
+        last = self.tables[-1]
+        lengths = self.lengths[-1]
+        squared = dict((s, sum(lengths[c] for c in last.table[s])) for s in self.alphabet)
+        if max(squared.values()) > self.tablemax:
+            return False
+        images = [last.Expand(last.table[s]) for s in self.alphabet]
+        self.tables.append(ClassicRules([list(self.alphabet), images]))
+        self.lengths.append(squared)
+        return True
+
+    def Steps(self, n):
+        """ Indexes k of the tables (2^k iterations each) to apply for
+        iteration n, smallest first """
+        while (1 << len(self.tables)) <= n and self._Square():
+            pass
+        top = 0
+        while top + 1 < len(self.tables) and (1 << top + 1) <= n:
+            top += 1
+        q, r = divmod(n, 1 << top)
+        return [k for k in range(0, top) if (r >> k) & 1] + [top] * q
+
+    def Expand(self, n):
+        """ Iteration n as string """
+        ag = self.start
+        for k in self.Steps(n):
+            ag = self.tables[k].Expand(ag)
+        return ag
+
+    def Chunks(self, n, chunksize=1 << 20):
+        """ Yield iteration n in chunks of about chunksize symbols. Only
+        the string before the last pass is built as a whole. """
+        steps = self.Steps(n)
+        if not steps:
+            steps = [None]
+        ag = self.start
+        for k in steps[:-1]:
+            ag = self.tables[k].Expand(ag)
+
+        if steps[-1] is None:
+            rules = None
+            step = chunksize
+        else:
+            rules = self.tables[steps[-1]]
+            step = max(chunksize // max(max(self.lengths[steps[-1]].values()), 1), 1)
+        if len(ag) == 0:
+            yield ag
+        for xx in range(0, len(ag), step):
+            if rules is None:
+                yield ag[xx:xx+step]
+            else:
+                yield rules.Expand(ag[xx:xx+step])
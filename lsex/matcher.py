@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Multi-pattern matching of extended rules.
+
+Matcher compiles the left hand sides of the rules once into an
+Aho-Corasick automaton, so all rule matches of an iteration are found in
+a single linear scan. The matches are replaced in scan order while the
+iteration is scanned; if the left hand sides differ in length, only the
+positions of the longest left hand side are pending. The continuous
+replacement types give the same results as the original per position
+and per rule comparisons:
+
+cont:   every position xx is replaced by the right hand side of the last
+        rule whose left hand side starts at xx (matches may overlap).
+cont_n: as cont, but after a match the rest of the matched chain is
+        skipped (leftmost, non-overlapping matches).
+
+Unmatched characters are kept, except where the original implementation
+dropped them: if the shortest left hand side or the rest of the grammar
+(len(ag) - xx) is shorter than the number of rules.
+
+Unlike the original implementation the rules do not need to have the
+same length. If two rules have the same left hand side, the last one wins.
+
+Replace_stream gives the same results for a grammar read in consecutive
+chunks (e.g. from a file), carrying only the last symbols of a chunk
+that may start a match over to the next one.
+"""
+
+from itertools import islice
+
+
+class Matcher(object):
+    """ Aho-Corasick automaton of the left hand sides of rule """
+
+    def __init__(self, rule):
+        self.rule = rule
+        self.nrules = len(rule[0])
+        self.minlen = min(len(s) for s in rule[0])
+        self.maxlen = max(len(s) for s in rule[0])
+
+        # last rule index of every left hand side
+        last = {}
+        for ii in range(0, self.nrules):
+            last[rule[0][ii]] = ii
+        self.empty = last.pop("", -1)
+
+        # trie
+        self.goto = [{}]
+        self.out = [()]
+        for lhs, ii in last.items():
+            st = 0
+            for c in lhs:
+                if c not in self.goto[st]:
+                    self.goto.append({})
+                    self.out.append(())
+                    self.goto[st][c] = len(self.goto) - 1
+                st = self.goto[st][c]
+            self.out[st] = ((len(lhs), ii),)
+
+        # failure links (breadth first), outputs of suffix states
+        self.fail = [0]*len(self.goto)
+        queue = list(self.goto[0].values())
+        for st in queue:
+            for c, nxt in self.goto[st].items():
+                queue.append(nxt)
+                f = self.fail[st]
+                while f and c not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(c, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+        # complete transition table, filled per symbol on demand
+        self.delta = [dict(g) for g in self.goto]
+        self.symbols = set()
+
+        # positions a match covers (and skips in cont_n)
+        self.skips = [max(len(s), 1) for s in rule[0]]
+        self.window = max(self.maxlen, 1)
+        # all left hand sides of the same length: the rule of every final
+        # state (-1: none)
+        self.uniform = self.minlen == self.maxlen and self.empty < 0
+        self.final = [out[0][1] if out else -1 for out in self.out]
+
+    def _Addsymbols(self, symbols):
+        """ add the transitions of new symbols to the transition table """
+        new = set(symbols) - self.symbols
+        if not new:
+            return
+        for st in range(0, len(self.goto)):
+            row = self.delta[st]
+            for c in new:
+                if c in row:
+                    continue
+                f = st
+                while f and c not in self.goto[f]:
+                    f = self.fail[f]
+                row[c] = self.goto[f].get(c, 0)
+        self.symbols.update(new)
+
+    def Matches(self, ag, prev=0, skip=False, settled=None):
+        """ Yield (position, rule index) of the replacements of ag in scan
+        order: at every position the last rule whose left hand side
+        starts there. With skip=True (cont_n) the positions covered by a
+        replaced left hand side are skipped. Only positions from prev
+        up to settled - 1 (default: the end of ag) are replaced. """
+        self._Addsymbols(set(ag))
+        if settled is None:
+            settled = len(ag)
+        # matches starting before settled end before this
+        end = min(settled + self.window - 1, len(ag))
+
+        delta = self.delta
+        if self.uniform:
+            # one left hand side per final state, matches end in the
+            # order of their start positions
+            final = self.final
+            first = self.window - 1
+            st = 0
+            for xx, c in enumerate(islice(ag, prev, end), prev):
+                st = delta[st][c]
+                ii = final[st]
+                if ii >= 0:
+                    yield xx - first, ii
+                    if skip:
+                        st = 0
+            return
+
+        # left hand sides of different lengths: a position is complete
+        # when the longest left hand side starting there is scanned
+        out = self.out
+        window = self.window
+        empty = self.empty
+        skips = self.skips
+        pending = {}
+        st = 0
+        for xx in range(prev, end + window - 1):
+            if xx < end:
+                st = delta[st][ag[xx]]
+                for length, ii in out[st]:
+                    start = xx - length + 1
+                    if pending.get(start, -1) < ii:
+                        pending[start] = ii
+            start = xx - window + 1
+            if start < prev:
+                continue
+            if start >= settled:
+                break
+            ii = max(pending.pop(start, -1), empty)
+            if ii >= 0:
+                yield start, ii
+                if skip:
+                    prev = start + skips[ii]
+
+    def _Keepend(self, length):
+        """ unmatched characters at positions >= this are dropped """
+        if self.minlen < self.nrules:
+            return 0
+        return max(length - self.nrules + 1, 0)
+
+    def Replace_cont(self, ag, counts=None):
+        """ continuous replacement (one iteration). If counts is a list,
+        the number of replacements of every rule is added to it. """
+        return self.Replace_part(ag, len(ag), self._Keepend(len(ag)), counts=counts)[0]
+
+    def Replace_cont_n(self, ag, counts=None):
+        """ continuous replacement, skip last n (one iteration). If counts
+        is a list, the number of replacements of every rule is added
+        to it. """
+        return self.Replace_part(ag, len(ag), self._Keepend(len(ag)), skip=True,
+                                 counts=counts)[0]
+
+    def Replace_part(self, buf, settled, keepend, prev=0, skip=False, counts=None):
+        """ continuous replacement of the positions 0..settled-1 of buf
+        (matches may reach into the rest of buf). Unmatched symbols at
+        positions >= keepend are dropped, positions < prev are skipped.
+        Returns the replacement and the next position to be written. """
+        rhs = self.rule[1]
+        skips = self.skips
+
+        ng = []
+        append = ng.append
+        for xx, ii in self.Matches(buf, prev, skip, settled):
+            if counts is not None:
+                counts[ii] += 1
+            if prev < xx and prev < keepend:
+                append(buf[prev:min(xx, keepend)])
+            append(rhs[ii])
+            if skip:
+                prev = xx + skips[ii]
+            else:
+                prev = xx + 1
+        if prev < settled:
+            if prev < keepend:
+                append(buf[prev:min(settled, keepend)])
+            prev = settled
+        return ''.join(ng), prev
+
+    def Replace_stream(self, chunks, length, skip=False, counts=None):
+        """ continuous replacement (cont, with skip=True cont_n) of a
+        grammar of length symbols given as consecutive chunks. Yields the
+        replacement piece by piece (one per chunk), joined it equals
+        Replace_cont/Replace_cont_n of the whole grammar. If counts is a
+        list, the number of replacements of every rule is added to it. """
+        keepend = self._Keepend(length)
+        overlap = self.maxlen - 1
+
+        carry = ''
+        base = 0        # position of the first symbol of carry
+        prev = 0        # next position to be written
+        read = 0
+        for chunk in chunks:
+            read += len(chunk)
+            buf = carry + chunk
+            # matches starting before settled are complete
+            if read >= length:
+                settled = len(buf)
+            else:
+                settled = max(len(buf) - overlap, 0)
+            ng, prev = self.Replace_part(buf, settled, keepend - base, prev - base,
+                                         skip, counts)
+            prev += base
+            yield ng
+
+            carry = buf[settled:]
+            base += settled
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Memo of replaced blocks for the extended rules.
+
+Self-similar grammars repeat the same regions over and over. The memo
+replacers cut an iteration into blocks of about blocksize symbols and
+keep the replacement of every block in a bounded LRU cache (Blockmemo),
+so a repeated block is copied instead of matched again:
+
+    segm    blocks are whole segments and replaced independently
+    cont    the replacement of a block also depends on the next
+            maxlen - 1 symbols (matches starting in the block reach into
+            them), they are part of the key
+    cont_n  as cont, and the number of symbols of the block skipped by a
+            match of the previous block is part of the key
+
+The end of an iteration (where unmatched symbols may be dropped) is
+replaced without memo. The results are identical to the replacement
+without memo, hits and misses give the hit rate to tune the block size
+of a rule set.
+
+If the right hand sides of segm rules are a multiple of the segment
+length long (e.g. length preserving rules), segments stay aligned to the
+blocks, and Memosegm.Advance replaces a block several iterations ahead
+at once, without building the intermediate iterations.
+
+    cfg.memo = Blockmemo(blocksize=256)
+    Grammar = LSEXfunctions().Generate_extended(cfg)
+    print(cfg.memo.Stats())
+"""
+
+from collections import OrderedDict
+
+# symbols per block
+BLOCKSIZE = 64
+# cached symbols (keys and replacements)
+MAXSYMBOLS = 1 << 24
+# iterations replaced at once by Advance
+LOOKAHEAD = 4
+
+
+def Aligned(rule):
+    """ True if the right hand sides of segm rules are a multiple of the
+    segment length long """
+    steps = max(len(s) for s in rule[0])
+    return all(len(s) % steps == 0 for s in rule[1])
+
+
+class Blockmemo(object):
+    """ LRU cache block -> replacement, bounded to maxsymbols symbols """
+
+    def __init__(self, blocksize=BLOCKSIZE, maxsymbols=MAXSYMBOLS, lookahead=LOOKAHEAD):
+        self.blocksize = blocksize
+        self.maxsymbols = maxsymbols
+        self.lookahead = lookahead
+        self.entries = OrderedDict()
+        self.symbols = 0
+        self.hits = 0
+        self.misses = 0
+        self.rules = None
+
+    @classmethod
+    def Open(cls, memo):
+        """ Blockmemo from a cfg.memo value: Blockmemo, block size or True
+        (default) """
+        if isinstance(memo, Blockmemo):
+            return memo
+        if memo is True:
+            return cls()
+        return cls(int(memo))
+
+    def Bind(self, rule, replacetype):
+        """ Use the memo for rule, entries of other rules are removed """
+        if self.rules != (rule, replacetype):
+            self.Clear()
+            self.rules = (rule, replacetype)
+
+    def Get(self, key):
+        """ Cached value of key, None if it is not cached """
+        item = self.entries.pop(key, None)
+        if item is None:
+            self.misses += 1
+            return None
+        # most recently used last
+        self.entries[key] = item
+        self.hits += 1
+        return item[0]
+
+    def Put(self, key, value, size):
+        """ Add value (of size symbols) and remove the least recently used
+        entries if the memo is full """
+        if size > self.maxsymbols:
+            return
+        self.entries[key] = (value, size)
+        self.symbols += size
+        while self.symbols > self.maxsymbols:
+            old, item = self.entries.popitem(last=False)
+            self.symbols -= item[1]
+
+    def Clear(self):
+        self.entries.clear()
+        self.symbols = 0
+
+    def Hitrate(self):
+        """ Fraction of the blocks found in the memo """
+        total = self.hits + self.misses
+        return float(self.hits) / total if total else 0.0
+
+    def Stats(self):
+        return {'blocksize': self.blocksize, 'hits': self.hits, 'misses': self.misses,
+                'hitrate': self.Hitrate(), 'entries': len(self.entries),
+                'symbols': self.symbols}
+
+
+class Memosegm(object):
+    """ Segmentwise replacement (segments.Segmenter) with block memo """
+
+    def __init__(self, segmenter, memo):
+        self.segmenter = segmenter
+        self.memo = memo
+        self.nrules = len(segmenter.rule[0])
+        steps = segmenter.steps
+        # blocks of whole segments
+        self.block = max(memo.blocksize - memo.blocksize % steps, steps)
+
+    def Aligned(self):
+        """ True if the segments of the next iterations stay aligned to
+        the blocks (Advance can be used) """
+        return Aligned(self.segmenter.rule)
+
+    def _Block(self, b, depth):
+        """ (replacement, lengths, counts) of block b after depth iterations """
+        key = (b, depth)
+        value = self.memo.Get(key)
+        if value is None:
+            counts = [0] * self.nrules
+            lengths = []
+            ng = b
+            for dd in range(0, depth):
+                ng = self.segmenter.Replace_segm(ng, counts if dd == 0 else None)
+                lengths.append(len(ng))
+            value = (ng, tuple(lengths), counts)
+            self.memo.Put(key, value, len(b) + len(ng))
+        return value
+
+    def Replace_segm(self, ag, counts=None):
+        """ segmentwise replacement (one iteration), as
+        Segmenter.Replace_segm """
+        full = len(ag) - len(ag) % self.block
+        ng = []
+        for xx in range(0, full, self.block):
+            value = self._Block(ag[xx:xx+self.block], 1)
+            ng.append(value[0])
+            if counts is not None:
+                for ii, c in enumerate(value[2]):
+                    counts[ii] += c
+        ng.append(self.segmenter.Replace_segm(ag[full:], counts))
+        return ''.join(ng)
+
+    def Advance(self, ag, depth):
+        """ Iteration depth after ag (only if Aligned) and the lengths of
+        the iterations 1..depth """
+        full = len(ag) - len(ag) % self.block
+        ng = []
+        lengths = [0] * depth
+        for xx in range(0, full, self.block):
+            value = self._Block(ag[xx:xx+self.block], depth)
+            ng.append(value[0])
+            for dd, l in enumerate(value[1]):
+                lengths[dd] += l
+        rest = ag[full:]
+        for dd in range(0, depth):
+            rest = self.segmenter.Replace_segm(rest)
+            lengths[dd] += len(rest)
+        ng.append(rest)
+        return ''.join(ng), lengths
+
+
+class Memocont(object):
+    """ Continuous replacement (matcher.Matcher, cont or cont_n with
+    skip=True) with block memo """
+
+    def __init__(self, matcher, memo, skip=False):
+        self.matcher = matcher
+        self.memo = memo
+        self.skip = skip
+        self.nrules = matcher.nrules
+        self.block = max(memo.blocksize, 1)
+        self.overlap = matcher.maxlen - 1
+
+    def Replace(self, ag, counts=None):
+        """ continuous replacement (one iteration), as
+        Matcher.Replace_cont/Replace_cont_n """
+        matcher = self.matcher
+        block = self.block
+        keepend = matcher._Keepend(len(ag))
+        # unmatched symbols are dropped everywhere or at the end only
+        dropall = matcher.minlen < matcher.nrules
+        limit = len(ag) - self.overlap
+        if not dropall:
+            limit = min(limit, keepend)
+
+        ng = []
+        prev = 0
+        xx = 0
+        while xx + block <= limit:
+            key = (ag[xx:xx+block+self.overlap], prev - xx)
+            value = self.memo.Get(key)
+            if value is None:
+                c = [0] * self.nrules
+                out, nxt = matcher.Replace_part(key[0], block, 0 if dropall else block,
+                                                key[1], self.skip, c)
+                value = (out, nxt - block, c)
+                self.memo.Put(key, value, len(key[0]) + len(out))
+            ng.append(value[0])
+            if counts is not None:
+                for ii, c in enumerate(value[2]):
+                    counts[ii] += c
+            prev = xx + block + value[1]
+            xx += block
+
+        out, nxt = matcher.Replace_part(ag[xx:], len(ag) - xx, keepend - xx, prev - xx,
+                                        self.skip, counts)
+        ng.append(out)
+        return ''.join(ng)
+
@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming output writers.
+
+The writers take the iterations one after another (or in chunks), so a
+grammar can be written while it is generated and no iteration has to be
+kept after it has been written.
+
+    TextWriter   : <prefix>_grammar_<date>.txt (one iteration per line),
+                   <prefix>_grammar_length_<date>.txt,
+                   <prefix>_grammar_rule_<date>.txt and, if the grammar
+                   repeats itself, <prefix>_grammar_cycle_<date>.txt
+    PickleWriter : <prefix>_grammar_<date>.dat, the pickled list of
+                   iterations (legacy format, see container.py)
+"""
+
+import os
+import datetime
+import pickle
+import struct
+
+from .cycles import Describe
+
+
+def Outputname(cfg, name, dt, ext):
+    """ Output file name as used by all writers """
+    return ''.join([cfg.outputpath, os.sep, cfg.prefix, name, dt, ext])
+
+
+def Timestamp():
+    return datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+
+
+def Makedirs(path):
+    """ Create the output folder, also if another process just created it """
+    try:
+        os.makedirs(path)
+    except OSError:
+        if not os.path.isdir(path):
+            raise
+
+
+def Textfiles(filename):
+    """ Length and rule file of the grammar text file filename """
+    head, tail = filename.rsplit("_grammar_", 1)
+    return (''.join([head, "_grammar_length_", tail]),
+            ''.join([head, "_grammar_rule_", tail]))
+
+
+def Cyclefile(filename):
+    """ Cycle file of the grammar text file filename """
+    head, tail = filename.rsplit("_grammar_", 1)
+    return ''.join([head, "_grammar_cycle_", tail])
+
+
+def Readlengthfile(filename):
+    lengthfile = open(filename, 'r')
+    try:
+        return [int(line) for line in lengthfile if line.strip()]
+    finally:
+        lengthfile.close()
+
+
+def Readrulefile(filename):
+    """ Rule of a rule text file (lhs  -->  rhs per line) """
+    rule = [[], []]
+    rulefile = open(filename, 'r')
+    try:
+        for line in rulefile:
+            line = line.rstrip('\r\n')
+            if not line:
+                continue
+            lhs, rhs = line.split("  -->  ", 1)
+            rule[0].append(lhs)
+            rule[1].append(rhs)
+    finally:
+        rulefile.close()
+    return rule
+
+
+def Writelengthfile(filename, Grammar_length):
+    """ Write one length per line """
+    lengthfile = open(filename, 'w')
+    for item in Grammar_length:
+        lengthfile.write("%s\n" % item)
+    lengthfile.close()
+
+
+class TextWriter(object):
+    """ Streaming writer for the text output """
+
+    def __init__(self, cfg):
+        self.rule = cfg.rule
+        dt = Timestamp()
+
+        self.filename1 = Outputname(cfg, "_grammar_", dt, ".txt")
+        self.filename2 = Outputname(cfg, "_grammar_length_", dt, ".txt")
+        self.filename3 = Outputname(cfg, "_grammar_rule_", dt, ".txt")
+
+        self.grammarfile = open(self.filename1, 'w')
+        self.cycle = None
+
+    @classmethod
+    def Reopen(cls, filename, rule):
+        """ Writer appending iterations to the grammar text file filename
+        (the length and rule files are rewritten on Close) """
+        self = cls.__new__(cls)
+        self.rule = rule
+        self.filename1 = filename
+        self.filename2, self.filename3 = Textfiles(filename)
+        self.grammarfile = open(filename, 'a')
+        self.cycle = None
+        return self
+
+    def Write(self, chunk):
+        """ Write a chunk of the current iteration """
+        self.grammarfile.write(chunk)
+
+    def EndIteration(self):
+        self.grammarfile.write("\n")
+
+    def Add(self, item):
+        """ Write a complete iteration """
+        self.Write(item)
+        self.EndIteration()
+
+    def Cycle(self, start, period):
+        """ Write the cycle file on Close """
+        self.cycle = (start, period)
+
+    def Close(self, Grammar_length):
+        """ Finish the grammar file and write the length and rule files
+        (and the cycle file). Returns the list of created files. """
+        self.grammarfile.close()
+
+        Writelengthfile(self.filename2, Grammar_length)
+
+        rule = self.rule
+        rulefile = open(self.filename3, 'w')
+        for ii in range(0, len(rule[0])):
+            rulefile.write("%s\n" % ''.join([rule[0][ii], "  -->  ", rule[1][ii]]))
+        rulefile.close()
+
+        files = [self.filename1, self.filename2, self.filename3]
+        if self.cycle is not None:
+            cyclefile = open(Cyclefile(self.filename1), 'w')
+            cyclefile.write("%s\n" % Describe(*self.cycle))
+            cyclefile.close()
+            files.append(Cyclefile(self.filename1))
+        return files
+
+
+class PickleWriter(object):
+    """ Streaming writer for the pickle output.
+
+    The files contain the same pickled list as pickle.dump(Grammar, f),
+    but the list is written item by item (pickle APPEND opcodes), so
+    only the current iteration has to be in memory. """
+
+    protocol = 2
+
+    def __init__(self, cfg):
+        dt = Timestamp()
+
+        self.filename = Outputname(cfg, "_grammar_", dt, ".dat")
+
+        self.file = open(self.filename, 'wb')
+        self.chunks = []
+
+        self.file.write(pickle.PROTO + struct.pack('B', self.protocol) + pickle.EMPTY_LIST)
+
+    @classmethod
+    def Reopen(cls, filename):
+        """ Writer appending iterations to the pickled list in filename """
+        self = cls.__new__(cls)
+        self.filename = filename
+        f = open(filename, 'r+b')
+        f.seek(-1, 2)
+        if f.read(1) != pickle.STOP:
+            f.close()
+            raise ValueError("Not a pickled grammar: %s" % filename)
+        f.seek(-1, 2)
+        f.truncate()
+        self.file = f
+        self.chunks = []
+        return self
+
+    def Write(self, chunk):
+        """ Add a chunk of the current iteration """
+        self.chunks.append(chunk)
+
+    def EndIteration(self):
+        item = ''.join(self.chunks)
+        self.chunks = []
+        self.Add(item)
+
+    def Add(self, item):
+        """ Write a complete iteration """
+        # strip PROTO and STOP of the single item pickle
+        self.file.write(pickle.dumps(item, self.protocol)[2:-1])
+        self.file.write(pickle.APPEND)
+
+    def Close(self, Grammar_length):
+        """ Finish the pickle file. Returns the list of created files. """
+        self.file.write(pickle.STOP)
+        self.file.close()
+        return [self.filename]
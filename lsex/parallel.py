@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Multi-process expansion of large classic iterations.
+
+Classic rewriting is context free, so an iteration can be cut into
+chunks that are expanded independently. ParallelExpander shards each
+iteration over a process pool:
+
+    1. the iteration is copied once into shared memory,
+    2. the workers count the output length of their chunks,
+    3. the output is allocated in shared memory and every worker writes
+       its expansion at its offset,
+
+so no multi-GB strings are pickled between the processes. Iterations
+shorter than minsize (or with symbols outside latin-1) are expanded in
+the calling process. Without multiprocessing.shared_memory (python < 3.8)
+the chunks are sent to the workers as strings.
+"""
+
+from .rules import ClassicRules
+
+# iterations shorter than this are expanded without the pool
+PARALLEL_MIN = 1 << 22
+# chunks per worker
+SPLIT = 4
+
+_rules = None
+
+
+def _Sharedmemory():
+    """ multiprocessing.shared_memory (None before python 3.8), imported
+    on first use, so importing lsex does not load multiprocessing """
+    try:
+        from multiprocessing import shared_memory
+    except ImportError:
+        return None
+    return shared_memory
+
+
+def _Init(rule):
+    """ pool initializer: compile the rules once per worker """
+    global _rules
+    _rules = ClassicRules(rule)
+
+
+def _Count(args):
+    """ output length of the chunk a..b of the shared input """
+    name, a, b, lengths = args
+    shared_memory = _Sharedmemory()
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        data = shm.buf[a:b].tobytes()
+    finally:
+        shm.close()
+    size = len(data)
+    for c, l in lengths:
+        # symbols without a rule are kept (length 1)
+        size += data.count(c) * (l - 1)
+    return size
+
+
+def _Expandshared(args):
+    """ expand the chunk a..b of the shared input into the shared output """
+    inname, a, b, outname, offset = args
+    shared_memory = _Sharedmemory()
+    shm = shared_memory.SharedMemory(name=inname)
+    try:
+        data = shm.buf[a:b].tobytes().decode('latin-1')
+    finally:
+        shm.close()
+    out = _rules.Expand(data).encode('latin-1')
+    shm = shared_memory.SharedMemory(name=outname)
+    try:
+        shm.buf[offset:offset + len(out)] = out
+    finally:
+        shm.close()
+    return len(out)
+
+
+def _Expandchunk(chunk):
+    return _rules.Expand(chunk)
+
+
+class ParallelExpander(object):
+    """ Expands classic iterations on a process pool """
+
+    def __init__(self, rule, workers=None, minsize=PARALLEL_MIN):
+        import multiprocessing
+        self.rules = ClassicRules(rule)
+        self.workers = workers or multiprocessing.cpu_count()
+        self.minsize = minsize
+        self.pool = None
+
+        self.latin1 = all(ord(c) < 256 for c in ''.join(self.rules.rule[0] + self.rules.rule[1]))
+        self.lengths = [(c.encode('latin-1'), len(rhs))
+                        for c, rhs in self.rules.table.items()] if self.latin1 else []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.Close()
+
+    def Close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+    def _Pool(self):
+        if self.pool is None:
+            import multiprocessing
+            if _Sharedmemory() is not None:
+                from multiprocessing import resource_tracker
+                # the workers must share the tracker of this process, else
+                # each worker reports the blocks it attached as leaked
+                resource_tracker.ensure_running()
+            self.pool = multiprocessing.Pool(self.workers, _Init, (self.rules.rule,))
+        return self.pool
+
+    def _Bounds(self, n):
+        parts = self.workers * SPLIT
+        step = max((n + parts - 1) // parts, 1)
+        return [(a, min(a + step, n)) for a in range(0, n, step)]
+
+    def Expand(self, ag):
+        """ Apply the rules once to the string ag """
+        if self.workers <= 1 or len(ag) < self.minsize:
+            return self.rules.Expand(ag)
+
+        if _Sharedmemory() is None or not self.latin1 or isinstance(ag, bytes):
+            bounds = self._Bounds(len(ag))
+            return ''.join(self._Pool().map(_Expandchunk, [ag[a:b] for a, b in bounds]))
+
+        try:
+            data = ag.encode('latin-1')
+        except UnicodeEncodeError:
+            return self.rules.Expand(ag)
+        return self._Expandshared(data)
+
+    def _Expandshared(self, data):
+        pool = self._Pool()
+        bounds = self._Bounds(len(data))
+        shared_memory = _Sharedmemory()
+
+        shmin = shared_memory.SharedMemory(create=True, size=len(data))
+        shmout = None
+        try:
+            shmin.buf[:len(data)] = data
+            del data
+
+            sizes = pool.map(_Count, [(shmin.name, a, b, self.lengths) for a, b in bounds])
+            offsets = [0]
+            for size in sizes[:-1]:
+                offsets.append(offsets[-1] + size)
+            total = offsets[-1] + sizes[-1]
+
+            shmout = shared_memory.SharedMemory(create=True, size=max(total, 1))
+            pool.map(_Expandshared, [(shmin.name, a, b, shmout.name, off)
+                                     for (a, b), off in zip(bounds, offsets)])
+            return shmout.buf[:total].tobytes().decode('latin-1')
+        finally:
+            shmin.close()
+            shmin.unlink()
+            if shmout is not None:
+                shmout.close()
+                shmout.unlink()
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+"""
+Pre-flight estimate of a generation run.
+
+Plan estimates the length and memory of every iteration before anything
+is generated: exact for classic rules (substitution matrix, Growth) and
+an upper bound for extended rules (growth.Maxlength). From the memory
+needed to keep all iterations, to stream them (two iterations at a
+time), the size of the output files and the available memory and disk
+space (including the copies of the iterations written to cfg.cache) it
+picks the engine:
+
+    memory       all iterations fit into memory (Generate_classic /
+                 Generate_extended)
+    streaming    Stream, which keeps only the current iterations
+    direct       Stream with keeplast, the last iteration is expanded
+                 directly (Direct_classic / Direct_extended)
+    out-of-core  Stream with a memory budget (spill.py), Apply sets
+                 cfg.memory
+    refuse       the output (exactly known) does not fit on the disk
+
+The memory budget is cfg.memory, else MEMORY_FRACTION of the available
+memory (psutil if installed, else /proc/meminfo or sysconf).
+"""
+
+import os
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from .rules import Alphabet
+from .growth import Growth, Maxlength
+from .spill import Symbolbytes
+from .cache import Cache, MAXBYTES
+from .container import Encoding
+
+# fraction of the available memory used as budget
+MEMORY_FRACTION = 0.75
+# runs writing more than this are confirmed in the GUI
+CONFIRM_BYTES = 1 << 30
+
+
+def Availablememory():
+    """ Available memory in bytes (None if unknown) """
+    if psutil is not None:
+        return int(psutil.virtual_memory().available)
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (IOError, OSError, ValueError):
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def Freedisk(path):
+    """ Free disk space in bytes of the folder path (or of its first
+    existing parent, None if unknown) """
+    path = os.path.abspath(path)
+    while not os.path.isdir(path) and os.path.dirname(path) != path:
+        path = os.path.dirname(path)
+    if psutil is not None:
+        return int(psutil.disk_usage(path).free)
+    try:
+        st = os.statvfs(path)
+    except (AttributeError, OSError):
+        return None
+    return st.f_bavail * st.f_frsize
+
+
+def Size(nbytes):
+    """ Human readable size """
+    if nbytes is None:
+        return 'unknown'
+    size = float(nbytes)
+    for unit in ('bytes', 'KB', 'MB', 'GB', 'TB', 'PB'):
+        if size < 1024 or unit == 'PB':
+            break
+        size /= 1024
+    if unit == 'bytes':
+        return '%d bytes' % nbytes
+    return '%.1f %s' % (size, unit)
+
+
+class Plan(object):
+    """ Estimated lengths, memory, output size and engine of the run cfg.
+    keeplast as in LSEXfunctions.Stream, direct if the last iteration
+    can be expanded directly (LSEXfunctions._Isdirect). """
+
+    def __init__(self, cfg, keeplast=False, direct=False, memory=None, disk=None):
+        self.cfg = cfg
+        self.keeplast = keeplast
+        alphabet = Alphabet(cfg.rule, cfg.start)
+        self.exact = max(len(s) for s in cfg.rule[0]) == 1
+
+        if self.exact:
+            self.lengths = Growth(cfg.rule, cfg.start).Lengths(cfg.recs)
+        else:
+            self.lengths = [len(cfg.start)]
+            for rr in range(0, cfg.recs):
+                self.lengths.append(Maxlength(cfg.rule, cfg.replacetype, self.lengths[-1]))
+
+        # bytes per symbol in memory and in utf-8 files
+        self.width = Symbolbytes(alphabet)
+        utf8 = max(len(c.encode('utf-8')) if not isinstance(c, bytes) else 1
+                   for c in alphabet)
+
+        lengths = self.lengths
+        largest = max(lengths)
+        self.memory_all = sum(lengths) * self.width
+        pairs = [lengths[rr] + lengths[rr + 1] for rr in range(0, cfg.recs)]
+        self.memory_stream = max(pairs or [lengths[0]]) * self.width
+        if cfg.pickout:
+            # pickled iterations are joined before they are written
+            self.memory_stream += largest * self.width
+
+        packed = Encoding(alphabet) == 'bits'
+
+        def Lsxbytes(symbols):
+            # .lsx containers: packed bits for two single byte symbols, else utf-8
+            return symbols // 8 if packed else symbols * utf8
+
+        written = lengths[-1:] if keeplast else lengths
+        self.output = 0
+        if cfg.txtout:
+            self.output += sum(l + 1 for l in written) * utf8
+        if cfg.pickout:
+            self.output += sum(written) * utf8
+        if getattr(cfg, 'lsxout', False):
+            self.output += Lsxbytes(sum(written))
+        # two spill files (latin-1 or utf-32)
+        self.spill = 2 * largest * (1 if self.width == 1 else 4)
+        # copies of the iterations in cfg.cache (up to its size limit)
+        self.cache = 0
+        if getattr(cfg, 'cache', None) is not None:
+            maxbytes = cfg.cache.maxbytes if isinstance(cfg.cache, Cache) else MAXBYTES
+            self.cache = min(Lsxbytes(sum(lengths[1:])), maxbytes)
+
+        if memory is None:
+            memory = getattr(cfg, 'memory', None)
+        if memory is None:
+            available = Availablememory()
+            if available is not None:
+                memory = int(available * MEMORY_FRACTION)
+        self.budget = memory
+        self.disk = disk if disk is not None else Freedisk(cfg.outputpath)
+
+        self.engine = self._Engine(direct)
+
+    def _Engine(self, direct):
+        budget = self.budget
+        if self.keeplast and direct:
+            engine = 'direct'
+        elif budget is None or self.memory_all <= budget:
+            engine = 'memory'
+        elif self.memory_stream <= budget:
+            engine = 'streaming'
+        else:
+            engine = 'out-of-core'
+
+        disk = self.output + self.cache
+        if engine == 'out-of-core':
+            disk += self.spill
+        if self.exact and self.disk is not None and disk > self.disk:
+            engine = 'refuse'
+        return engine
+
+    def Apply(self, cfg):
+        """ Set the memory budget of cfg for the out-of-core engine """
+        if self.engine == 'out-of-core' and getattr(cfg, 'memory', None) is None:
+            cfg.memory = self.budget
+
+    def Confirm(self):
+        """ True if the run is large enough to be confirmed """
+        return self.engine in ('out-of-core', 'refuse') or self.output > CONFIRM_BYTES
+
+    def Rows(self):
+        """ (iteration, length, memory in bytes) of all iterations """
+        return [(rr, l, l * self.width) for rr, l in enumerate(self.lengths)]
+
+    def Message(self):
+        """ Summary for the user """
+        if self.exact:
+            length = 'Iteration %d: %d symbols' % (self.cfg.recs, self.lengths[-1])
+        else:
+            length = 'Iteration %d: at most %d symbols (upper bound)' % (self.cfg.recs,
+                                                                       self.lengths[-1])
+        lines = [length,
+                 'Memory: %s streaming, %s keeping all iterations (budget %s)'
+                 % (Size(self.memory_stream), Size(self.memory_all), Size(self.budget)),
+                 'Output: %s (free disk space %s)' % (Size(self.output), Size(self.disk))]
+        if self.cache:
+            lines.append('Cache: up to %s' % Size(self.cache))
+        if self.engine == 'out-of-core':
+            lines.append('Out-of-core files: up to %s' % Size(self.spill))
+        if self.engine == 'refuse':
+            lines.append('Engine: refused, the output does not fit on the disk')
+        else:
+            lines.append('Engine: %s' % self.engine)
+        return '\n'.join(lines)
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Compiled replacement rules.
+
+The rules of a grammar ([[lhs1, lhs2, ...], [rhs1, rhs2, ...]]) are
+compiled once per run into lookup tables, so that each iteration can be
+rewritten in a single pass over the string.
+"""
+
+
+# predefined systems of the Lindenmayer System Generator
+SAMPLES = [("Fibonacci", [["0", "1"], ["1", "01"]]),
+           ("Algea", [["0", "1"], ["01", "0"]]),
+           ("Thue-Morse", [["0", "1"], ["01", "10"]]),
+           ("Feigenbaum", [["0", "1"], ["11", "01"]]),
+           ("Cantor dust", [["0", "1"], ["010", "111"]]),
+           ("Pythagoras tree", [["0", "1"], ["1[0]1", "11"]]),
+           ("Koch curve", [["1"], ["1+1-1-1+1"]]),
+           ("Sierpinksi triangle", [["0", "1"], ["+1-0-1+", "-0+1+0-"]])]
+
+
+def Sample(name):
+    """ Rule of the predefined system name """
+    for sample, rule in SAMPLES:
+        if sample == name:
+            return rule
+    raise KeyError("Unknown system: %r" % name)
+
+
+def Checkrules(rule, replacetype=None):
+    """ Raise ValueError for rules the generator can not use """
+    if min(len(s) for s in rule[0]) == 0:
+        raise ValueError("Replacement rules must not be empty!")
+    if replacetype == 'segm' and len(set(len(s) for s in rule[0])) > 1:
+        raise ValueError("For segmentwise replacement all rules must have the same length!")
+
+
+def Alphabet(rule, start):
+    """ Sorted list of all symbols of the start string and the rules """
+    symbols = set(start)
+    for ii in range(0, len(rule[0])):
+        symbols.update(rule[0][ii])
+        symbols.update(rule[1][ii])
+    return sorted(symbols)
+
+
+class _SymbolTable(dict):
+    """ symbol -> replacement table, symbols without a rule are kept """
+
+    def __missing__(self, key):
+        return key
+
+
+class ClassicRules(object):
+    """ Compiled single character (classic) rules.
+
+    table holds the replacement of every symbol with a rule. If a symbol
+    appears in several rules, the last rule wins (as in the original
+    rule-by-rule replacement). Symbols without a rule are kept. """
+
+    def __init__(self, rule):
+        self.rule = rule
+        self.table = _SymbolTable()
+        for ii in range(0, len(rule[0])):
+            if len(rule[0][ii]) != 1:
+                raise ValueError("Classic rules must replace single characters: %r"
+                                 % rule[0][ii])
+            self.table[rule[0][ii]] = rule[1][ii]
+
+        try:
+            self._trans = str.maketrans(dict(self.table))
+        except AttributeError:
+            # python 2.7: str.translate only maps single bytes
+            self._trans = None
+
+    def Expand(self, s):
+        """ Apply the rules once to the string s """
+        if self._trans is not None:
+            return s.translate(self._trans)
+        return ''.join(map(self.table.__getitem__, s))
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+Segmentwise (segm) replacement.
+
+The grammar is cut into segments of the length of the longest rule
+(steps). Every segment equal to a left hand side is replaced by the
+right hand side of the last such rule, other segments are kept. A
+shorter segment at the end is replaced if it equals a rule and dropped
+otherwise (as in the original implementation).
+
+If numpy is installed, long grammars of single byte symbols (rules
+included) are replaced vectorized: the grammar is reshaped to (segments, steps), the segments
+are packed into integer keys and looked up in a table of the rule keys.
+Every segment then becomes a row of its right hand side (or of itself),
+padded to the longest replacement, and the padding is removed with one
+boolean mask. Otherwise a dict lookup per segment is used. Both give
+identical results.
+"""
+
+from .arrays import Numpy
+
+# grammars shorter than this are replaced without numpy
+NUMPY_MIN = 4096
+# number of segments replaced at once (bounds the temporary tables)
+NUMPY_BLOCK = 1 << 20
+
+
+def _Singlebyte(s):
+    """ True if every symbol of s fits into one byte (latin-1) """
+    return isinstance(s, bytes) or all(ord(c) < 256 for c in s)
+
+
+class Segmenter(object):
+    """ Compiled segmentwise rules """
+
+    def __init__(self, rule, usenumpy=True):
+        self.rule = rule
+        self.steps = max(len(s) for s in rule[0])
+
+        self.table = {}
+        self.index = {}
+        for ii in range(0, len(rule[0])):
+            self.table[rule[0][ii]] = rule[1][ii]
+            self.index[rule[0][ii]] = ii
+
+        # the numpy tables hold the rules as latin-1 bytes
+        self.usenumpy = (usenumpy and 0 < self.steps <= 8 and
+                         all(_Singlebyte(s) for side in rule for s in side))
+        self._np = None
+
+    def Replace_segm(self, ag, counts=None):
+        """ segmentwise replacement (one iteration). If counts is a list,
+        the number of replacements of every rule is added to it. """
+        steps = self.steps
+        full = len(ag) - len(ag) % steps
+
+        if self.usenumpy and full >= NUMPY_MIN:
+            ng = self._Replace_numpy(ag[:full], counts)
+        else:
+            ng = None
+        if ng is None:
+            get = self.table.get
+            ng = ''.join([get(ag[xx:xx+steps], ag[xx:xx+steps])
+                          for xx in range(0, full, steps)])
+            if counts is not None:
+                self._Count(ag, full, counts)
+
+        # shorter segment at the end
+        if counts is not None and ag[full:] in self.index:
+            counts[self.index[ag[full:]]] += 1
+        return ng + self.table.get(ag[full:], '')
+
+    def _Count(self, ag, full, counts):
+        index = self.index
+        steps = self.steps
+        for xx in range(0, full, steps):
+            ii = index.get(ag[xx:xx+steps])
+            if ii is not None:
+                counts[ii] += 1
+
+    # #####################################################################
+    # numpy engine
+
+    def _Compile_numpy(self, binary):
+        """ rule keys (sorted) and the padded table of right hand sides.
+        Row R (number of full length rules) of the tables stands for
+        unmatched segments, which are copied from the grammar. rules
+        holds the rule index of every row. """
+        numpy = Numpy()
+        steps = self.steps
+        items = sorted((self._Key(lhs, binary), rhs, self.index[lhs])
+                       for lhs, rhs in self.table.items() if len(lhs) == steps)
+        R = len(items)
+
+        keys = numpy.array([k for k, r, ii in items], dtype=numpy.uint64)
+        rhs = [bytearray(self._Encode(r, binary)) for k, r, ii in items]
+        rules = [ii for k, r, ii in items]
+
+        width = max([steps] + [len(r) for r in rhs])
+        tab = numpy.zeros((R + 1, width), dtype=numpy.uint8)
+        lengths = numpy.zeros(R + 1, dtype=numpy.int64)
+        for ii, r in enumerate(rhs):
+            tab[ii, :len(r)] = r
+            lengths[ii] = len(r)
+        lengths[R] = steps
+        keep = numpy.arange(width) < lengths[:, None]
+
+        lut = None
+        if steps <= 2:
+            lut = numpy.full(1 << (8*steps), R, dtype=numpy.intp)
+            lut[keys.astype(numpy.intp)] = numpy.arange(R)
+        return keys, lut, tab, keep, rules
+
+    def _Encode(self, s, binary):
+        if binary:
+            return s
+        return s.encode('latin-1')
+
+    def _Key(self, s, binary):
+        """ segment packed into an integer (first symbol in the lowest byte) """
+        b = bytearray(self._Encode(s, binary))
+        return sum(c << (8*jj) for jj, c in enumerate(b))
+
+    def _Replace_numpy(self, ag, counts=None):
+        """ replace the full segments of ag, None if ag is not single byte
+        or numpy is not installed """
+        numpy = Numpy()
+        if numpy is None:
+            return None
+        binary = isinstance(ag, bytes)
+        try:
+            data = self._Encode(ag, binary)
+        except UnicodeEncodeError:
+            return None
+
+        if self._np is None or self._np[0] != binary:
+            self._np = (binary, self._Compile_numpy(binary))
+        tables = self._np[1]
+
+        steps = self.steps
+        arr = numpy.frombuffer(data, dtype=numpy.uint8)
+        out = []
+        block = NUMPY_BLOCK * steps
+        for bb in range(0, len(arr), block):
+            seg = arr[bb:bb+block].reshape(-1, steps)
+            out.append(self._Gather(seg, counts, *tables))
+        ng = b''.join(out)
+
+        if binary:
+            return ng
+        return ng.decode('latin-1')
+
+    def _Gather(self, seg, counts, keys, lut, tab, keep, rules):
+        numpy = Numpy()
+        steps = self.steps
+        R = len(keys)
+
+        if steps in (1, 2, 4, 8):
+            # segments of 1, 2, 4 or 8 bytes are little endian integers
+            key = seg.reshape(-1).view('<u%d' % steps)
+        else:
+            key = numpy.zeros(seg.shape[0], dtype=numpy.uint64)
+            for jj in range(0, steps):
+                key |= seg[:, jj].astype(numpy.uint64) << numpy.uint64(8*jj)
+
+        # rule row of every segment (R: no rule)
+        if lut is not None:
+            code = lut[key]
+        elif R:
+            key = key.astype(numpy.uint64)
+            code = numpy.searchsorted(keys, key)
+            code[code == R] = 0
+            code[keys[code] != key] = R
+        else:
+            code = numpy.full(seg.shape[0], R, dtype=numpy.intp)
+
+        if counts is not None:
+            rows = numpy.bincount(code, minlength=R + 1)
+            for row in range(0, R):
+                counts[rules[row]] += int(rows[row])
+
+        # padded output rows, unmatched segments are copied, padding removed
+        out = numpy.take(tab, code, axis=0)
+        numpy.copyto(out[:, :steps], seg, where=(code == R)[:, None])
+        return out[numpy.take(keep, code, axis=0)].tobytes()
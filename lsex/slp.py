@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""
+Grammar compressed iterations (straight line programs).
+
+Every iteration of a classic system is the concatenation of the
+expansions of the symbols of the previous iteration. SLP stores this
+directly: node (s, d), symbol s expanded d times, is the sequence of the
+nodes (c, d-1) of the symbols c in the replacement of s, and iteration n
+is the sequence of the nodes (c, n) of the start string. Identical nodes
+are shared, so iteration n needs O(n * alphabet) nodes, while its length
+grows exponentially (Fibonacci iteration 80 has ~3.8e16 symbols but less
+than 100 nodes).
+
+An SLP supports the length, slicing, streaming decompression (Chunks,
+Writetext), a polynomial hash of the expanded string and saving/loading
+as a small json file.
+"""
+
+import json
+
+from .rules import ClassicRules, Alphabet
+
+# expansions of nodes up to this length are cached as strings
+CACHE_LENGTH = 1 << 12
+
+HASH_MOD = (1 << 61) - 1
+HASH_BASE = 1000003
+
+
+class SLP(object):
+    """ Straight line program: nodes[i] is either a terminal (a string of
+    one symbol) or a tuple of node ids smaller than i. The last node is
+    the root (the whole string). """
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.root = len(nodes) - 1
+        self.lengths = []
+        self.hashes = []
+        self.powers = []
+        for node in nodes:
+            self._Measure(node)
+        self._cache = {}
+
+    def _Measure(self, node):
+        """ length and hash of a new node (children are known) """
+        if not isinstance(node, tuple):
+            self.lengths.append(1)
+            self.hashes.append(ord(node))
+            self.powers.append(HASH_BASE)
+            return
+        length = 0
+        h = 0
+        p = 1
+        for c in node:
+            length += self.lengths[c]
+            h = (h * self.powers[c] + self.hashes[c]) % HASH_MOD
+            p = (p * self.powers[c]) % HASH_MOD
+        self.lengths.append(length)
+        self.hashes.append(h)
+        self.powers.append(p)
+
+    @classmethod
+    def Fromclassic(cls, rule, start, n):
+        """ SLP of iteration n of the classic rules from start """
+        table = ClassicRules(rule).table
+        nodes = []
+        ids = {}
+
+        def Add(node):
+            if node not in ids:
+                ids[node] = len(nodes)
+                nodes.append(node)
+            return ids[node]
+
+        current = dict((s, Add(s)) for s in Alphabet(rule, start))
+        empty = set()
+        for d in range(0, n):
+            nxt = {}
+            for s in current:
+                children = tuple(current[c] for c in table[s]
+                                 if current[c] not in empty)
+                if len(children) == 1:
+                    nxt[s] = children[0]
+                else:
+                    nxt[s] = Add(children)
+                    if not children:
+                        empty.add(nxt[s])
+            current = nxt
+
+        # the root is always a new last node
+        nodes.append(tuple(current[c] for c in start if current[c] not in empty))
+        return cls(nodes)
+
+    def __len__(self):
+        return self.lengths[self.root]
+
+    def Length(self):
+        """ Length of the expanded string (python int, no size limit) """
+        return self.lengths[self.root]
+
+    def __hash__(self):
+        return hash((self.lengths[self.root], self.hashes[self.root]))
+
+    def Hash(self):
+        """ Polynomial hash (mod 2^61-1) of the expanded string """
+        return self.hashes[self.root]
+
+    def __eq__(self, other):
+        """ Equal expansions (by length and hash) """
+        return (self.Length() == other.Length() and self.Hash() == other.Hash())
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def _Expand(self, node):
+        """ expansion of a short node (cached) """
+        if node in self._cache:
+            return self._cache[node]
+        out = []
+        stack = [node]
+        while stack:
+            nd = stack.pop()
+            if nd in self._cache:
+                out.append(self._cache[nd])
+            elif isinstance(self.nodes[nd], tuple):
+                stack.extend(reversed(self.nodes[nd]))
+            else:
+                out.append(self.nodes[nd])
+        s = ''.join(out)
+        self._cache[node] = s
+        return s
+
+    def _Pieces(self, a, b):
+        """ yield the expansion of [a, b) in pieces of cached strings """
+        stack = [(self.root, a, b)]
+        while stack:
+            node, a, b = stack.pop()
+            if a >= b:
+                continue
+            if self.lengths[node] <= CACHE_LENGTH:
+                yield self._Expand(node)[a:b]
+                continue
+            items = []
+            pos = 0
+            for c in self.nodes[node]:
+                l = self.lengths[c]
+                if pos + l > a:
+                    items.append((c, max(a - pos, 0), min(b - pos, l)))
+                pos += l
+                if pos >= b:
+                    break
+            stack.extend(reversed(items))
+
+    def Slice(self, a, b):
+        """ Symbols a..b-1 of the expanded string """
+        a, b, step = slice(a, b).indices(self.Length())
+        return ''.join(self._Pieces(a, b))
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return self.Slice(k.start, k.stop)
+        if k < 0:
+            k = k + self.Length()
+        if k < 0 or k >= self.Length():
+            raise IndexError("SLP index out of range")
+        return self.Slice(k, k + 1)
+
+    def Chunks(self, chunksize=1 << 20):
+        """ Yield the expanded string in chunks of about chunksize symbols
+        (streaming decompression) """
+        buf = []
+        size = 0
+        for piece in self._Pieces(0, self.Length()):
+            buf.append(piece)
+            size += len(piece)
+            if size >= chunksize:
+                yield ''.join(buf)
+                buf = []
+                size = 0
+        if buf or not self.Length():
+            yield ''.join(buf)
+
+    def __iter__(self):
+        for chunk in self.Chunks():
+            for c in chunk:
+                yield c
+
+    def Writetext(self, writer, chunksize=1 << 20):
+        """ Write the expanded string as one iteration to a writer of
+        output.py (e.g. TextWriter) """
+        for chunk in self.Chunks(chunksize):
+            writer.Write(chunk)
+        writer.EndIteration()
+
+    def Save(self, filename):
+        """ Save the nodes as json """
+        with open(filename, 'w') as f:
+            json.dump({"nodes": self.nodes}, f)
+
+    @classmethod
+    def Load(cls, filename):
+        with open(filename, 'r') as f:
+            nodes = json.load(f)["nodes"]
+        return cls([tuple(n) if isinstance(n, list) else str(n) for n in nodes])
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+Out-of-core generation with a memory budget.
+
+With cfg.memory (bytes) set, Iterate_chunks keeps the iterations in
+memory as long as an iteration and the next one fit into the budget.
+The length of the next iteration is exact for classic rules (Growth) and
+an upper bound for extended rules (growth.Maxlength). Once it does not
+fit, the current iteration is written to a spill file, and every further
+iteration is generated chunk by chunk from the memory-mapped file of the
+previous one into a new spill file. Memory is then bounded by a few
+chunks, and the depth is limited by the disk instead of the memory.
+
+Spill files are written to cfg.spillpath (default: the output folder)
+and removed when the run ends. Symbols are stored with a fixed width
+(latin-1 or utf-32), so a file can be cut into chunks at any symbol.
+"""
+
+import os
+import mmap
+import tempfile
+
+from .rules import ClassicRules
+from .matcher import Matcher
+from .segments import Segmenter
+
+# symbols read at once by Spillfile.Counts
+BLOCK = 1 << 20
+
+
+def Symbolbytes(alphabet):
+    """ Memory per symbol of a string of alphabet """
+    if not alphabet or isinstance(alphabet[0], bytes):
+        return 1
+    top = max(ord(c) for c in alphabet)
+    if top < 256:
+        return 1
+    if top < 65536:
+        return 2
+    return 4
+
+
+class Spillfile(object):
+    """ Iteration written to a temporary file and read back memory-mapped """
+
+    def __init__(self, folder, alphabet):
+        self.binary = bool(alphabet) and isinstance(alphabet[0], bytes)
+        if self.binary or all(ord(c) < 256 for c in alphabet):
+            self.encoding, self.width = 'latin-1', 1
+        else:
+            self.encoding, self.width = 'utf-32-le', 4
+        fd, self.filename = tempfile.mkstemp(prefix='lsex_spill_', suffix='.tmp',
+                                             dir=folder)
+        self.f = os.fdopen(fd, 'wb')
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def Write(self, s):
+        self.f.write(s if self.binary else s.encode(self.encoding))
+        self.length += len(s)
+
+    def Close(self):
+        """ End writing """
+        if not self.f.closed:
+            self.f.close()
+
+    def _Decode(self, data):
+        if self.binary:
+            return data
+        return data.decode(self.encoding)
+
+    def Chunks(self, chunksize):
+        """ Yield the iteration as strings of at most chunksize symbols """
+        self.Close()
+        if self.length == 0:
+            yield self._Decode(b'')
+            return
+        f = open(self.filename, 'rb')
+        try:
+            m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                step = chunksize * self.width
+                for xx in range(0, len(m), step):
+                    yield self._Decode(m[xx:xx+step])
+            finally:
+                m.close()
+        finally:
+            f.close()
+
+    def Counts(self):
+        """ Symbol counts as dict symbol -> count """
+        counts = {}
+        for chunk in self.Chunks(BLOCK):
+            for c in set(chunk):
+                counts[c] = counts.get(c, 0) + chunk.count(c)
+        return counts
+
+    def Remove(self):
+        self.Close()
+        if os.path.exists(self.filename):
+            os.remove(self.filename)
+
+
+class Replacer(object):
+    """ One iteration of the rules of cfg, applied to a whole string
+    (Replace) or to a grammar given in chunks (Replace_chunks). Chunks
+    must be a multiple of step symbols long (except the last one). """
+
+    def __init__(self, cfg):
+        self.classic = max(len(s) for s in cfg.rule[0]) == 1
+        self.replacetype = getattr(cfg, 'replacetype', None)
+        self.step = 1
+        if self.classic:
+            self.rules = ClassicRules(cfg.rule)
+        elif self.replacetype == 'segm':
+            self.segmenter = Segmenter(cfg.rule)
+            self.step = self.segmenter.steps
+        elif self.replacetype in ('cont', 'cont_n'):
+            self.matcher = Matcher(cfg.rule)
+        else:
+            raise ValueError("Unknown replacement type: %r" % self.replacetype)
+
+    def Replace(self, ag, counts=None):
+        """ Next iteration of the string ag. If counts is a list, the
+        replacements of every extended rule are added to it. """
+        if self.classic:
+            return self.rules.Expand(ag)
+        if self.replacetype == 'segm':
+            return self.segmenter.Replace_segm(ag, counts)
+        if self.replacetype == 'cont':
+            return self.matcher.Replace_cont(ag, counts)
+        return self.matcher.Replace_cont_n(ag, counts)
+
+    def Replace_chunks(self, chunks, length, counts=None):
+        """ Yield the next iteration of a grammar of length symbols given
+        as chunks, one piece per chunk """
+        if self.classic:
+            return (self.rules.Expand(chunk) for chunk in chunks)
+        if self.replacetype == 'segm':
+            # chunks are cut at segment boundaries
+            return (self.segmenter.Replace_segm(chunk, counts) for chunk in chunks)
+        return self.matcher.Replace_stream(chunks, length, self.replacetype == 'cont_n',
+                                           counts)
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+Symbol and n-gram statistics of the iterations.
+
+For every iteration the counts of all n-grams (substrings of n symbols)
+up to order are kept, as dicts n-gram -> count: the symbol frequencies
+(n = 1) and the transition counts (n = 2, see Transitions).
+
+Classic rules map every symbol c to an image s(c). If no image is empty,
+every n-gram of the next iteration starts in the image of one symbol c
+and is contained in the image of the n-gram starting at c, or it starts
+in the images of the last n - 1 symbols (the tail). Classicstats derives
+the counts of the next iteration from the counts of the current one and
+its tail, without building any iteration:
+
+    next[v] = sum over n-grams w of count[w] * (number of n-grams v of
+              s(w) starting in s(w[0])) + n-grams v of s(tail)
+
+The contributions of an n-gram are computed once. Erasing rules and
+extended rules are counted in a single pass over the iterations given
+in chunks (Streamstats).
+
+StatsWriter takes the iterations like the output writers and writes
+<prefix>_grammar_stats_<date>.txt (iteration, n-gram and count per line)
+next to the _grammar_length_ file.
+"""
+
+from collections import Counter
+
+from .rules import ClassicRules
+from .output import Outputname, Timestamp
+
+# highest n-gram order
+ORDER = 2
+
+
+def Ngrams(s, n, counts=None):
+    """ Add the n-grams of the string s to the dict counts """
+    if counts is None:
+        counts = {}
+    if n == 1:
+        grams = dict((c, s.count(c)) for c in set(s))
+    else:
+        grams = Counter(s[ii:ii+n] for ii in range(0, len(s) - n + 1))
+    for g, c in grams.items():
+        counts[g] = counts.get(g, 0) + c
+    return counts
+
+
+def Tail(s, n):
+    """ Last n symbols of s (all if s is shorter) """
+    return s[max(len(s) - n, 0):]
+
+
+def Propagates(rule):
+    """ True if the counts of classic rules can be derived from the
+    counts of the previous iteration (no empty right hand side) """
+    return min(len(s) for s in rule[1]) > 0
+
+
+def Transitions(bigrams, alphabet):
+    """ Transition counts of the 2-grams, rows: symbol, columns: next
+    symbol (order of alphabet) """
+    return [[bigrams.get(a + b, 0) for b in alphabet] for a in alphabet]
+
+
+class Classicstats(object):
+    """ n-gram counts (1..order) of the iterations of classic rules
+    without empty right hand side """
+
+    def __init__(self, rule, start, order=ORDER):
+        if not Propagates(rule):
+            raise ValueError("Counts of erasing rules can not be derived, use Streamstats")
+        self.rules = ClassicRules(rule)
+        self.order = order
+        self.images = {}
+        self.counts = [Ngrams(start, n) for n in range(1, order + 1)]
+        self.tail = Tail(start, order - 1)
+
+    def _Image(self, w):
+        """ n-grams of the image of w starting in the image of w[0] """
+        counts = self.images.get(w)
+        if counts is None:
+            s = self.rules.Expand(w)
+            first = len(self.rules.Expand(w[0]))
+            counts = Ngrams(s[:first + len(w) - 1], len(w))
+            self.images[w] = counts
+        return counts
+
+    def Next(self):
+        """ Counts of the next iteration """
+        counts = []
+        for n, current in enumerate(self.counts, 1):
+            nxt = {}
+            for w, c in current.items():
+                for v, d in self._Image(w).items():
+                    nxt[v] = nxt.get(v, 0) + c * d
+            Ngrams(self.rules.Expand(Tail(self.tail, n - 1)), n, nxt)
+            counts.append(nxt)
+        self.counts = counts
+        self.tail = Tail(self.rules.Expand(self.tail), self.order - 1)
+        return counts
+
+    def Iterations(self, recs):
+        """ Yield the counts of the iterations 0..recs """
+        yield self.counts
+        for rr in range(0, recs):
+            yield self.Next()
+
+
+class Streamstats(object):
+    """ n-gram counts (1..order) of iterations given in chunks. The
+    counts of every ended iteration are appended to self.iterations. """
+
+    def __init__(self, order=ORDER):
+        self.order = order
+        self.iterations = []
+        self._Begin()
+
+    def _Begin(self):
+        self.counts = [{} for n in range(0, self.order)]
+        self.tail = ''
+
+    def Write(self, chunk):
+        """ Count a chunk of the current iteration """
+        for n, counts in enumerate(self.counts, 1):
+            # n-grams reaching back into the previous chunks
+            Ngrams(Tail(self.tail, n - 1) + chunk, n, counts)
+        self.tail = Tail(self.tail + chunk, self.order - 1)
+
+    def EndIteration(self):
+        self.iterations.append(self.counts)
+        self._Begin()
+
+    def Add(self, item):
+        """ Count a complete iteration (string) """
+        self.Write(item)
+        self.EndIteration()
+
+    def Reference(self, n):
+        """ The current iteration repeats iteration n """
+        self.iterations.append(self.iterations[n])
+        self._Begin()
+
+
+def Writestatsfile(filename, iterations, first=0):
+    """ Write the counts of the iterations first, first + 1, ... as lines
+    iteration<TAB>n-gram<TAB>count (by order, then n-gram) """
+    statsfile = open(filename, 'w')
+    for rr, counts in enumerate(iterations, first):
+        for grams in counts:
+            for g in sorted(grams):
+                statsfile.write("%d\t%s\t%d\n" % (rr, g, grams[g]))
+    statsfile.close()
+
+
+def Readstatsfile(filename):
+    """ dict iteration -> counts (as Classicstats/Streamstats) of a
+    stats file """
+    iterations = {}
+    statsfile = open(filename, 'r')
+    try:
+        for line in statsfile:
+            line = line.rstrip('\r\n')
+            if not line:
+                continue
+            rr, g, c = line.split("\t")
+            counts = iterations.setdefault(int(rr), [])
+            while len(counts) < len(g):
+                counts.append({})
+            counts[len(g) - 1][g] = int(c)
+    finally:
+        statsfile.close()
+    return iterations
+
+
+class StatsWriter(object):
+    """ Streaming writer for the statistics of the written iterations
+    (the last ones if only those are written, as in Stream with
+    keeplast). Counts of classic rules are derived on Close, the
+    iterations are not read. """
+
+    def __init__(self, cfg, order=ORDER):
+        self.rule = cfg.rule
+        self.start = cfg.start
+        self.order = order
+        self.filename = Outputname(cfg, "_grammar_stats_", Timestamp(), ".txt")
+        classic = max(len(s) for s in cfg.rule[0]) == 1
+        self.stream = None
+        if not (classic and Propagates(cfg.rule)):
+            self.stream = Streamstats(order)
+        self.ended = 0
+
+    def Write(self, chunk):
+        """ Count a chunk of the current iteration """
+        if self.stream is not None:
+            self.stream.Write(chunk)
+
+    def EndIteration(self):
+        if self.stream is not None:
+            self.stream.EndIteration()
+        self.ended += 1
+
+    def Add(self, item):
+        """ Write a complete iteration """
+        self.Write(item)
+        self.EndIteration()
+
+    def Reference(self, n):
+        """ The current iteration repeats iteration n """
+        if self.stream is not None:
+            self.stream.Reference(n)
+        self.ended += 1
+
+    def Close(self, Grammar_length):
+        """ Write the stats file. Returns the list of created files. """
+        first = len(Grammar_length) - self.ended
+        if self.stream is None:
+            iterations = Classicstats(self.rule, self.start, self.order).Iterations(
+                len(Grammar_length) - 1)
+            iterations = [counts for rr, counts in enumerate(iterations) if rr >= first]
+        else:
+            iterations = self.stream.iterations
+        Writestatsfile(self.filename, iterations, first)
+        return [self.filename]
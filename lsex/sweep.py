@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Parameter sweeps over rule sets, start strings, depths and replacement
+types.
+
+A sweep is declared as a dict (or a json file with the same content):
+
+    {"outputpath": "out", "prefix": "sweep", "txtout": true,
+     "jobs": [{"rule": "all", "start": ["0", "1"], "recs": [10, 15]},
+              {"rule": [["ab", "ba"], ["abba", "b"]], "start": "abab",
+               "recs": 8, "replacetype": ["segm", "cont", "cont_n"]},
+              {"rule": [["01"], ["10"]], "startfile": "out/x.lsx",
+               "startiteration": 12, "recs": 5, "replacetype": "cont"}]}
+
+Keys outside "jobs" are defaults for all jobs. A job key given as a list
+is swept, i.e. a job is run for every combination of the listed rule,
+start, recs and replacetype values. rule is a rule ([[lhs...], [rhs...]]),
+the name of a predefined system (rules.SAMPLES), "all" for all predefined
+systems, or a list of these. Jobs with startfile start from an iteration
+of a saved grammar (.lsx or .dat) like the Lindenmayer System Modifier
+(startiteration is 0-based, -1 for the last iteration).
+With "cache" (a folder) the iterations are reused across jobs and runs
+(see cache.py).
+
+Identical jobs (the replacement type is ignored for classic rules) are
+run once. Every job writes to its own prefix <prefix>_<job id>, and
+Sweep.Run writes a manifest <prefix>_sweep_<date>.json with the
+parameters, run time, lengths and output files of all jobs.
+"""
+
+import os
+import json
+import time
+import hashlib
+import itertools
+import pickle
+import multiprocessing
+
+from .functions import LSEXfunctions, LSEXconfig
+from .rules import SAMPLES, Sample, Checkrules
+from .output import Timestamp, Makedirs
+from .container import Container
+
+# job keys and their defaults
+DEFAULTS = {'rule': None,
+            'start': None,
+            'startfile': None,
+            'startiteration': -1,
+            'recs': None,
+            'replacetype': None,
+            'outputpath': '.',
+            'prefix': 'sweep',
+            'txtout': True,
+            'pickout': False,
+            'lsxout': False,
+            'keeplast': False,
+            'cache': None}
+
+
+def _Isrule(rule):
+    """ True if rule is a single rule [[lhs, ...], [rhs, ...]] """
+    return (isinstance(rule, (list, tuple)) and len(rule) == 2 and
+            all(isinstance(side, (list, tuple)) for side in rule) and
+            all(not isinstance(s, (list, tuple)) for side in rule for s in side))
+
+
+def _Rules(value):
+    """ List of (system name, rule) for the rule value of a job """
+    if _Isrule(value):
+        return [(None, [list(value[0]), list(value[1])])]
+    if isinstance(value, (list, tuple)):
+        return [r for v in value for r in _Rules(v)]
+    if value == "all":
+        return list(SAMPLES)
+    return [(value, Sample(value))]
+
+
+def _Values(value):
+    if isinstance(value, (list, tuple)):
+        return list(value)
+    return [value]
+
+
+def _Iteration(iteration, n):
+    """ Index of iteration (0-based, -1 for the last) in a grammar of n
+    iterations """
+    if iteration == -1:
+        iteration = n - 1
+    if not 0 <= iteration < n:
+        raise IndexError("Iteration %d of a grammar with %d iterations (0..%d)"
+                         % (iteration, n, n - 1))
+    return iteration
+
+
+def Loadstart(filename, iteration=-1):
+    """ Iteration of a saved grammar (.lsx container or pickled .dat).
+    iteration is 0-based (0 is the start string, -1 the last iteration),
+    unlike the 1-based iteration asked for by the GUI modifier. """
+    if filename.endswith('.lsx'):
+        G = Container(filename)
+        try:
+            return G.Load(_Iteration(iteration, len(G)))
+        finally:
+            G.Close()
+    f = open(filename, 'rb')
+    try:
+        G = pickle.load(f)
+    finally:
+        f.close()
+    return G[_Iteration(iteration, len(G))]
+
+
+class Sweep(object):
+    """ Declarative list of generation jobs, run on a process pool """
+
+    def __init__(self, spec):
+        if not isinstance(spec, dict):
+            spec = {'jobs': spec}
+        self.defaults = dict(DEFAULTS)
+        self.defaults.update((k, v) for k, v in spec.items() if k != 'jobs')
+
+        self.jobs = []
+        self.duplicates = 0
+        seen = set()
+        for job in spec.get('jobs', [{}]):
+            for expanded in self._Expand(job):
+                if expanded['id'] in seen:
+                    self.duplicates += 1
+                    continue
+                seen.add(expanded['id'])
+                self.jobs.append(expanded)
+
+    @classmethod
+    def Load(cls, filename):
+        """ Sweep from a json job file """
+        f = open(filename, 'r')
+        try:
+            return cls(json.load(f))
+        finally:
+            f.close()
+
+    def _Expand(self, job):
+        """ All combinations of the swept keys of job, normalized """
+        job = dict(self.defaults, **job)
+        for key in job:
+            if key not in DEFAULTS:
+                raise ValueError("Unknown job key: %r" % key)
+        if job['rule'] is None or job['recs'] is None:
+            raise ValueError("Jobs need a rule and recs")
+        if job['start'] is None and job['startfile'] is None:
+            raise ValueError("Jobs need a start or a startfile")
+
+        for (name, rule), start, recs, replacetype in itertools.product(
+                _Rules(job['rule']), _Values(job['start']),
+                _Values(job['recs']), _Values(job['replacetype'])):
+            expanded = dict(job, rule=rule, start=start, recs=int(recs),
+                            replacetype=replacetype, system=name)
+            if max(len(s) for s in rule[0]) == 1:
+                # classic rules: the replacement type is not used
+                expanded['replacetype'] = None
+            if expanded['startfile'] is not None:
+                expanded['start'] = None
+            else:
+                expanded['startiteration'] = None
+            expanded['id'] = self._Id(expanded)
+            expanded['prefix'] = '%s_%s' % (job['prefix'], expanded['id'])
+            yield expanded
+
+    def _Id(self, job):
+        key = json.dumps([job[k] for k in sorted(DEFAULTS) if k not in ('prefix', 'cache')],
+                         sort_keys=True)
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()[:10]
+
+    def Run(self, workers=None, manifest=True):
+        """ Run all jobs on workers processes (all cores by default, one
+        runs in this process) and return the results in job order. With
+        manifest=True the manifest is written to the output folder. """
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+
+        if workers <= 1 or len(self.jobs) <= 1:
+            results = [Runjob(job) for job in self.jobs]
+        else:
+            # one job per worker process, so memory is returned after each job
+            pool = multiprocessing.Pool(min(workers, len(self.jobs)), maxtasksperchild=1)
+            try:
+                results = pool.map(Runjob, self.jobs, chunksize=1)
+            finally:
+                pool.close()
+                pool.join()
+
+        if manifest:
+            self.manifest = self.Savemanifest(results)
+        return results
+
+    def Savemanifest(self, results):
+        """ Write the results as json manifest, returns the file name """
+        Makedirs(self.defaults['outputpath'])
+        filename = ''.join([self.defaults['outputpath'], os.sep,
+                            self.defaults['prefix'], "_sweep_", Timestamp(), ".json"])
+        f = open(filename, 'w')
+        try:
+            json.dump({'duplicates': self.duplicates,
+                       'seconds': sum(r['seconds'] for r in results),
+                       'jobs': results}, f, indent=1, sort_keys=True)
+        finally:
+            f.close()
+        return filename
+
+
+def Runjob(job):
+    """ Run one expanded job, returns its manifest entry. Errors are
+    reported in the entry and do not stop the sweep. """
+    result = dict(job)
+    result.update(seconds=0.0, lengths=[], files={}, error=None)
+
+    t0 = time.time()
+    try:
+        start = job['start']
+        if start is None:
+            start = Loadstart(job['startfile'], job['startiteration'])
+
+        rule = job['rule']
+        Checkrules(rule, job['replacetype'])
+
+        Makedirs(job['outputpath'])
+
+        cfg = LSEXconfig(rule, start, job['recs'], job['replacetype'],
+                         job['outputpath'], job['prefix'], job['txtout'],
+                         job['pickout'], job['lsxout'],
+                         cache=job['cache'])
+        L = LSEXfunctions()
+        files = L.Stream(cfg, keeplast=job['keeplast'])
+        result['lengths'] = L.Grammar_length
+        result['files'] = dict((f, os.path.getsize(f)) for f in files)
+    except Exception as e:
+        result['error'] = '%s: %s' % (type(e).__name__, e)
+    result['seconds'] = time.time() - t0
+    return result
+
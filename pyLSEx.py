@@ -25,6 +25,9 @@ Dependencies:
 		datetime
 		pickle
 
+    The grammar functions are in the lsex package next to this file,
+    which does not need wx (see lsex/__init__.py for headless usage).
+
 
 For help and support feel free to contact: l-s-ex@gmx.co.uk
 
@@ -49,8 +52,13 @@ import os
 import sys
 import datetime
 import pickle
+import threading
+
+from lsex import LSEXfunctions, Container, SAMPLES, Progress, Cancelled, Cache
 
 ver = '1.0'
+# progress dialog update interval of the generation (ms)
+POLL_MS = 200
 
 
 class LSEX(wx.Frame):
@@ -223,16 +231,8 @@ class LSEXgen(wx.Frame):
         # Rule selection
         # -----------------------------
         self.userdefined = False
-        self.samplelist = ["Fibonacci", "Algea", "Thue-Morse", "Feigenbaum", "Cantor dust", "Pythagoras tree", "Koch curve", "Sierpinksi triangle", "User defined"]
-        self.rulelist = [[["0", "1"], ["1", "01"]],
-                  [["0", "1"], ["01", "0"]], 
-                  [["0", "1"], ["01", "10"]], 
-                  [["0", "1"], ["11", "01"]], 
-                  [["0", "1"], ["010", "111"]], 
-                  [["0", "1"], ["1[0]1", "11"]], 
-                  [["1"], ["1+1-1-1+1"]], 
-                  [["0", "1"], ["+1-0-1+", "-0+1+0-"]], 
-                  [["", ""], ["", ""]]]
+        self.samplelist = [name for name, rule in SAMPLES] + ["User defined"]
+        self.rulelist = [rule for name, rule in SAMPLES] + [[["", ""], ["", ""]]]
         
         cb = wx.ComboBox(self, -1, "Select System", 
                          (-1, -1), (-1, -1), self.samplelist, wx.CB_DROPDOWN)
@@ -276,8 +276,12 @@ class LSEXgen(wx.Frame):
                                   (-1, -1), (-1, -1), wx.ALIGN_LEFT)
         stattext8 = wx.StaticText(self, -1, 'Select output type : ', 
                                   (-1, -1), (-1, -1), wx.ALIGN_LEFT)
-        stattext9 = wx.StaticText(self, -1, 'Pickle (.dat) :', 
+        stattext9 = wx.StaticText(self, -1, 'Container (.lsx) :', 
                                   (-1, -1), (-1, -1), wx.ALIGN_LEFT)
+        stattext10 = wx.StaticText(self, -1, '                              ', 
+                                   (-1, -1), (-1, -1), wx.ALIGN_LEFT)
+        stattext11 = wx.StaticText(self, -1, 'Reuse iterations (cache) :', 
+                                   (-1, -1), (-1, -1), wx.ALIGN_LEFT)
         stattext01 = wx.StaticText(self, -1, '      -->  ', 
                                    (-1, -1), (-1, -1), wx.ALIGN_LEFT)
         stattext02 = wx.StaticText(self, -1, '      -->  ', 
@@ -315,6 +319,8 @@ class LSEXgen(wx.Frame):
         self.checkbox1.SetValue(True)
         self.checkbox2 = wx.CheckBox(self, wx.NewId(), '')
         self.checkbox2.SetValue(True)
+        self.checkbox3 = wx.CheckBox(self, wx.NewId(), '')
+        self.checkbox3.SetValue(False)
         
         # lines
         # -----------------------------
@@ -386,6 +392,13 @@ class LSEXgen(wx.Frame):
         hsizer3d.Add(stattext7, 0, wx.RIGHT, b)
         hsizer3d.SetItemMinSize(stattext7, (100, -1))
         
+        hsizer3f = wx.BoxSizer(wx.HORIZONTAL)
+        hsizer3f.Add(stattext10, 0, wx.RIGHT, b)
+        hsizer3f.SetItemMinSize(stattext10, (200, -1))
+        hsizer3f.Add(self.checkbox3, 0, wx.RIGHT, b)
+        hsizer3f.Add(stattext11, 0, wx.RIGHT, b)
+        hsizer3f.SetItemMinSize(stattext11, (100, -1))
+        
         hsizer4 = wx.BoxSizer(wx.HORIZONTAL)
         hsizer4.Add(self.button2, 0, wx.RIGHT, 10)
         hsizer4.SetItemMinSize(self.button2, (400, 50))
@@ -412,6 +425,7 @@ class LSEXgen(wx.Frame):
         vsizer1.Add(hsizer3c, 0, wx.EXPAND | wx.ALL, b)
         vsizer1.Add(hsizer3e, 0, wx.EXPAND | wx.ALL, b)
         vsizer1.Add(hsizer3d, 0, wx.EXPAND | wx.ALL, b)
+        vsizer1.Add(hsizer3f, 0, wx.EXPAND | wx.ALL, b)
         vsizer1.Add(staline3, 0, wx.EXPAND | wx.ALL, b)
         
         vsizer1.Add(hsizer4, 0, wx.EXPAND | wx.ALL, b)
@@ -492,9 +506,9 @@ class LSEXgen(wx.Frame):
         for ii in range(0, len(cfg.rule[0])):
             rl.append(int(len(cfg.rule[0][ii])))
             
-        if min(rl) != max(rl):
+        if min(rl) == 0:
             # error message
-            wx.MessageBox("""All replacement rules must have the same length!""",
+            wx.MessageBox("""Replacement rules must not be empty!""",
                           "INPUT ERROR", wx.OK)
         
         else:
@@ -503,12 +517,12 @@ class LSEXgen(wx.Frame):
             cfg.outputpath = str(self.txt_field3.GetValue())
             cfg.prefix = str(self.txt_field4.GetValue())
             cfg.txtout = self.checkbox1.GetValue()
-            cfg.pickout = self.checkbox2.GetValue()
+            cfg.pickout = False
+            cfg.lsxout = self.checkbox2.GetValue()
+            cfg.cache = Cache() if self.checkbox3.GetValue() else None
         
-            L = LSEXfunctions()
-            
             if max(rl) == 1:
-                L.Generate_classic(cfg)
+                StartGeneration(self, cfg)
             elif max(rl) > 1:
             
                 Typedlg = TypeDialog(self, 'Replacement type', cfg)
@@ -539,7 +553,9 @@ class LSEXmod(wx.Frame):
         stattext6 = wx.StaticText(self, -1, '                              ', (-1, -1), (-1, -1), wx.ALIGN_LEFT)
         stattext7 = wx.StaticText(self, -1, 'Text (.txt) :', (-1, -1), (-1, -1), wx.ALIGN_LEFT)
         stattext8 = wx.StaticText(self, -1, 'Select output type : ', (-1, -1), (-1, -1), wx.ALIGN_LEFT)
-        stattext9 = wx.StaticText(self, -1, 'Pickle (.dat) :', (-1, -1), (-1, -1), wx.ALIGN_LEFT)
+        stattext9 = wx.StaticText(self, -1, 'Container (.lsx) :', (-1, -1), (-1, -1), wx.ALIGN_LEFT)
+        stattext10 = wx.StaticText(self, -1, '                              ', (-1, -1), (-1, -1), wx.ALIGN_LEFT)
+        stattext11 = wx.StaticText(self, -1, 'Reuse iterations (cache) :', (-1, -1), (-1, -1), wx.ALIGN_LEFT)
         stattextx = wx.StaticText(self, -1, 'Lindenmayer generator v0.94 by Michael Lindner and Doug Saddy, University of Reading', (-1, -1), (-1, -1), wx.ALIGN_LEFT)
         font = wx.Font(8, wx.DECORATIVE, wx.NORMAL, wx.NORMAL)
         stattextx.SetFont(font)
@@ -559,7 +575,7 @@ class LSEXmod(wx.Frame):
         self.txt_field3 = wx.TextCtrl(self, -1, self.outpath, (-1, -1), (-1, -1))
         self.txt_field4 = wx.TextCtrl(self, -1, 'mod_output', (-1, -1), (-1, -1))
 
-        self.button1 = wx.Button(self, wx.NewId(), '&Load L-system (grammar) from .dat file', (-1, -1), wx.DefaultSize)
+        self.button1 = wx.Button(self, wx.NewId(), '&Load L-system (grammar) from .lsx or .dat file', (-1, -1), wx.DefaultSize)
         self.button2 = wx.Button(self, wx.NewId(), '&Define rules', (-1, -1), wx.DefaultSize)
         self.button3 = wx.Button(self, wx.NewId(), '&Browse', (-1, -1), wx.DefaultSize)
         self.button4 = wx.Button(self, wx.NewId(), '&Generate grammar', (-1, -1), wx.DefaultSize)
@@ -573,6 +589,8 @@ class LSEXmod(wx.Frame):
         self.checkbox1.SetValue(True)
         self.checkbox2 = wx.CheckBox(self, wx.NewId(), '')
         self.checkbox2.SetValue(False)
+        self.checkbox3 = wx.CheckBox(self, wx.NewId(), '')
+        self.checkbox3.SetValue(False)
         
         staline1 = wx.StaticLine(self, wx.NewId(), (-1, -1), (-1, 2), wx.LI_HORIZONTAL)
         staline2 = wx.StaticLine(self, wx.NewId(), (-1, -1), (-1, 2), wx.LI_HORIZONTAL)
@@ -637,6 +655,13 @@ class LSEXmod(wx.Frame):
         hsizer3d.Add(stattext7, 0, wx.RIGHT, b)
         hsizer3d.SetItemMinSize(stattext7, (100, -1))
         
+        hsizer3f = wx.BoxSizer(wx.HORIZONTAL)
+        hsizer3f.Add(stattext10, 0, wx.RIGHT, b)
+        hsizer3f.SetItemMinSize(stattext10, (200, -1))
+        hsizer3f.Add(self.checkbox3, 0, wx.RIGHT, b)
+        hsizer3f.Add(stattext11, 0, wx.RIGHT, b)
+        hsizer3f.SetItemMinSize(stattext11, (100, -1))
+        
         hsizer4 = wx.BoxSizer(wx.HORIZONTAL)
         hsizer4.Add(self.button4, 0, wx.RIGHT, 10)
         hsizer4.SetItemMinSize(self.button4, (440, 50))
@@ -664,6 +689,7 @@ class LSEXmod(wx.Frame):
         vsizer1.Add(hsizer3c, 0, wx.EXPAND | wx.ALL, b)
         vsizer1.Add(hsizer3e, 0, wx.EXPAND | wx.ALL, b)
         vsizer1.Add(hsizer3d, 0, wx.EXPAND | wx.ALL, b)
+        vsizer1.Add(hsizer3f, 0, wx.EXPAND | wx.ALL, b)
         
         vsizer1.Add(staline3, 0, wx.EXPAND | wx.ALL, b)
         
@@ -691,10 +717,15 @@ class LSEXmod(wx.Frame):
         sys.exit()
         
     def OnLoad(self, event):    
-        dialog = wx.FileDialog(None, "Choose a file", os.getcwd(), "", "*.dat", wx.OPEN)
+        dialog = wx.FileDialog(None, "Choose a file", os.getcwd(), "", 
+                               "Grammar files (*.lsx;*.dat)|*.lsx;*.dat", wx.OPEN)
         if dialog.ShowModal() == wx.ID_OK:
             loadname = dialog.GetPath()
-            G = pickle.load( open(loadname , "rb" ) )
+            if loadname.endswith('.lsx'):
+                # container: only the selected iteration is read
+                G = Container(loadname)
+            else:
+                G = pickle.load( open(loadname , "rb" ) )
         
         dlg = TextEntryDialog(None, 'Input', 'Iteration of L-System you want to use? max:')
         dlg.Center()
@@ -703,7 +734,11 @@ class LSEXmod(wx.Frame):
             Grec = int(dlg.GetValue())
         dlg.Destroy()
         
-        self.Grammar = G[Grec-1]
+        if isinstance(G, Container):
+            self.Grammar = G.Load(Grec-1)
+            G.Close()
+        else:
+            self.Grammar = G[Grec-1]
         
         self.Settext1(loadname)
         
@@ -761,9 +796,14 @@ class LSEXmod(wx.Frame):
         for ii in range(0, len(cfg.rule[0])):
             rl.append(int(len(cfg.rule[0][ii])))
             
-        if min(rl) != max(rl):
+        if min(rl) == 0:
             # error message
-            wx.MessageBox("""All replacement rules must have the same length!""",
+            wx.MessageBox("""Replacement rules must not be empty!""",
+                          "INPUT ERROR", wx.OK)
+        
+        elif min(rl) != max(rl) and self.replace == 'segm':
+            # error message
+            wx.MessageBox("""For segmentwise replacement all rules must have the same length!""",
                           "INPUT ERROR", wx.OK)
         
         else:
@@ -772,17 +812,12 @@ class LSEXmod(wx.Frame):
             cfg.outputpath = str(self.txt_field3.GetValue())
             cfg.prefix = str(self.txt_field4.GetValue())
             cfg.txtout = self.checkbox1.GetValue()
-            cfg.pickout = self.checkbox2.GetValue()
+            cfg.pickout = False
+            cfg.lsxout = self.checkbox2.GetValue()
+            cfg.cache = Cache() if self.checkbox3.GetValue() else None
             cfg.replacetype = self.replace
             
-            print(cfg.replacetype)
-            
-            L = LSEXfunctions()
-            
-            if max(rl) == 1:
-                L.Generate_classic(cfg)
-            elif max(rl) > 1:
-                L.Generate_extended(cfg)
+            StartGeneration(self, cfg)
 
         
 """
@@ -818,7 +853,6 @@ class TypeDialog(wx.Frame):
         self.parent = parent
         panel = wx.Panel(self, -1)
         self.cfg = cfg
-        self.L = LSEXfunctions()
         
         self.rb1 = wx.RadioButton(panel, -1, 'segmentwise', (10, 10), style=wx.RB_GROUP)
         self.rb2 = wx.RadioButton(panel, -1, 'continuous', (10, 30))
@@ -847,9 +881,15 @@ class TypeDialog(wx.Frame):
         
     def OnOK(self, e):
         cfg = self.cfg
-        print(cfg.replacetype)
         
-        self.L.Generate_extended(cfg)
+        rl = [len(r) for r in cfg.rule[0]]
+        if min(rl) != max(rl) and cfg.replacetype == 'segm':
+            # error message
+            wx.MessageBox("""For segmentwise replacement all rules must have the same length!""",
+                          "INPUT ERROR", wx.OK)
+            return
+        
+        StartGeneration(self.parent, cfg)
         self.OnQuit(self)
 
     def OnQuit(self, e):
@@ -948,194 +988,102 @@ class RuleDialog(wx.Frame):
 """
 ##############################################################################
 
-    function class
+    functions
     
 ##############################################################################    
 """    
 
-class LSEXfunctions():    
-    """ Class with main grammar functions"""
+def ShowSaved(cfg):
+    """ Inform the user about the saved output files """
+    if cfg.txtout == True:
+        wx.MessageBox("""Grammar text files created and saved!""",
+                          "Done", wx.OK)
     
-    def Generate_classic(self, cfg):
-        
-        Grammar = ["nan"]*(cfg.recs+1)
-        Grammar[0] = cfg.start
-        
-        for rr in range(0, cfg.recs):
-            ag = list(Grammar[rr])
-            ng = ["nan"]*len(ag)
-            for ss in range(0, len(cfg.rule[1])):
-                indexes = [i for i, x in enumerate(ag) if x == cfg.rule[0][ss]]
-                for ii in indexes:
-                    ng[ii] = cfg.rule[1][ss]
-            Grammar[rr+1] = ''.join(ng)
-            del ag 
-            del ng
+    if cfg.pickout == True or getattr(cfg, 'lsxout', False) == True:
+        wx.MessageBox("""Grammar file saved!""",
+                          "Done", wx.OK)
 
-        Grammar_length = map(len, Grammar)              
-        
-        if cfg.txtout == True:
-            self.Savetextfile(cfg, Grammar, Grammar_length)
-        
-        if cfg.pickout == True:
-            self.Savepicklefile(cfg, Grammar, Grammar_length)
-            
-            
-    def Generate_extended(self, cfg):
-        
-        Grammar = ["nan"]*(cfg.recs+1)
-        Grammar[0] = cfg.start
-        
-        print( len(cfg.rule[0]))
-        print( cfg.rule[0][0])
-        print( cfg.rule[1][0])
-        
-        # #################################################################
-        if cfg.replacetype == "segm": # segmentwise replacement
-            
-            steps=max(len(s) for s in cfg.rule[0])
-            
-            for rr in range(0, cfg.recs):
-    
-                ag = Grammar[rr]
-                ng = [""]*len(ag) # create empty new grammar
-                
-                for xx in range(0, len(ag), steps):
-        
-                    tag = ag[xx:xx+steps]
-                    
-                    re=1
-                    for ii in range(0, len(cfg.rule[0])):
-            
-                        if  tag == cfg.rule[0][ii]:
-                            ng[xx] = cfg.rule[1][ii]
-                            re=0
-                        elif len(tag) < steps:
-                            re=0
-            
-                    if re == 1:
-                        ng[xx]=ag[xx:xx+steps]
-    
-                Grammar[rr+1] = ''.join(ng)    
-            
-        
-        elif cfg.replacetype == "cont":  # continuous replacement
-           
-            for rr in range(0, cfg.recs):
-    
-                ag = Grammar[rr]
-                ng = [""]*len(ag) # create empty new grammar
-    
-                for xx in range(0, len(ag)):
-        
-                    re=1
-                    for ii in range(0, len(cfg.rule[0])):
-                        
-                        tag = ag[xx:xx+len(cfg.rule[0][ii])]
-                        print(len(tag))
-                        
-                        if  tag == cfg.rule[0][ii]:
-                            ng[xx] = cfg.rule[1][ii]
-                            re=0
-                        elif len(tag) < len(cfg.rule[0]):
-                            re=0
-                            
-                    if re == 1:
-                        ng[xx]=ag[xx]
-        
-                Grammar[rr+1] = ''.join(ng)    
 
- 
-        elif cfg.replacetype == "cont_n":   # continuous replacement (skip last n)
-            
-            
-            for rr in range(0, cfg.recs):
+def StartGeneration(parent, cfg):
+    """ Estimate the size of the grammar (lsex.plan), let the user confirm
+    large runs and generate the grammar in the background """
+    plan = LSEXfunctions().Plan(cfg)
+    if plan.engine == 'refuse':
+        wx.MessageBox(plan.Message(), "Grammar too large", wx.OK | wx.ICON_ERROR)
+        return
     
-                ag = Grammar[rr]
-                ng = [""]*len(ag) 
+    if plan.Confirm():
+        dlg = wx.MessageDialog(parent, ''.join([plan.Message(), "\n\nGenerate the grammar?"]),
+                               "Estimated size", wx.YES_NO | wx.ICON_QUESTION)
+        answer = dlg.ShowModal()
+        dlg.Destroy()
+        if answer != wx.ID_YES:
+            return
     
-                xxflag = 0
-                xx = -1
-                while xxflag == 0:
-                    xx = xx + 1
-                    if xx > len(ag) - 1:
-                        break
-        
-                    tag = ag[xx:xx+len(cfg.rule[0][0])]
-                    re=1
-                    
-                    for ii in range(0, len(cfg.rule[0])):
-            
-                        if  tag == cfg.rule[0][ii]:
-                            ng[xx] = cfg.rule[1][ii]
-                            xx = xx + len(cfg.rule[0][0])-1
-                            re=0
-                        elif len(tag) < len(cfg.rule[0]):
-                            re=0
-                            
-                    if re == 1:
-                        ng[xx]=ag[xx]
-        
-                Grammar[rr+1] = ''.join(ng)    
-        
-        # #################################################################
-        
-        Grammar_length = map(len, Grammar) 
-        
-        if cfg.txtout == True:
-            self.Savetextfile(cfg, Grammar, Grammar_length)
-        
-        if cfg.pickout == True:
-            self.Savepicklefile(cfg, Grammar, Grammar_length)
-
+    # out-of-core generation if the iterations do not fit into memory
+    plan.Apply(cfg)
+    GenerateWorker(parent, cfg).start()
 
 
-    def Savetextfile(self, cfg, Grammar, Grammar_length):
+class GenerateWorker(threading.Thread):
+    """ Generates and saves the grammar of cfg in a background thread.
+    Progress is shown in a progress dialog, polled every POLL_MS ms,
+    whose cancel button stops the generation before the next chunk of
+    an iteration. """
     
-        dt=datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-         
-        filename1 = ''.join([cfg.outputpath, os.sep, cfg.prefix, "_grammar_", dt, ".txt"])
-        filename2 = ''.join([cfg.outputpath, os.sep, cfg.prefix, "_grammar_length_", dt, ".txt"])
-        filename3 = ''.join([cfg.outputpath, os.sep, cfg.prefix, "_grammar_rule_", dt, ".txt"])
-        
-        
-        grammarfile = open(filename1, 'w')
-        for item in Grammar:
-            grammarfile.write("%s\n" % item)
-        grammarfile.close()
-
-        lengthfile = open(filename2, 'w')
-        for item in Grammar_length:
-            lengthfile.write("%s\n" % item)
-        lengthfile.close()
-        
-        rulefile = open(filename3, 'w')
-        for ii in range(0, len(cfg.rule[0])):
-            rulefile.write("%s\n" % ''.join([cfg.rule[0][ii],"  -->  ",cfg.rule[1][ii]]))
-        rulefile.close()
-        
-        wx.MessageBox("""Grammar text files created and saved!""",
-                          "Done", wx.OK)
-                          
-                          
-    def Savepicklefile(self, cfg, Grammar, Grammar_length):
-    
-        dt=datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-         
-        filename1 = ''.join([cfg.outputpath, os.sep, cfg.prefix, "_grammar_", dt, ".dat"])
-        filename12 = ''.join([cfg.outputpath, os.sep, cfg.prefix, "_grammar_", dt, ".p"])
-        #filename2 = ''.join([cfg.outputpath, os.sep, cfg.prefix, "_grammar_length_", dt, ".dat"])
-        #filename3 = ''.join([cfg.outputpath, os.sep, cfg.prefix, "_grammar_rule_", dt, ".dat"])
+    def __init__(self, parent, cfg):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.cfg = cfg
+        self.cancel = threading.Event()
         
-        rule = cfg.rule
+        self.L = LSEXfunctions()
+        lengths = None
+        if self.L.Isclassic(cfg):
+            lengths = self.L.Lengths_classic(cfg)
+        self.progress = Progress(cfg, lengths)
+        self.L.Subscribe(self.progress)
+        
+        self.dialog = wx.ProgressDialog('Generating grammar', self.progress.Message(),
+                                        maximum=max(cfg.recs, 1), parent=parent,
+                                        style=wx.PD_CAN_ABORT | wx.PD_ELAPSED_TIME)
+        # the dialog is polled in the GUI thread, also during long iterations
+        self.timer = wx.Timer(self.dialog)
+        self.dialog.Bind(wx.EVT_TIMER, self.OnTimer, self.timer)
+        self.timer.Start(POLL_MS)
+        
+    def run(self):
+        error = None
+        try:
+            self.L.Stream(self.cfg, cancel=self.cancel)
+        except Cancelled:
+            error = 'cancelled'
+        except Exception as e:
+            error = str(e)
+        wx.CallAfter(self.OnDone, error)
+        
+    def OnTimer(self, event):
+        # GUI thread: progress of the worker, cancel is seen within POLL_MS
+        if self.dialog is None or self.cancel.is_set():
+            return
+        iteration = min(self.progress.iteration, self.cfg.recs)
+        keepgoing = self.dialog.Update(iteration, self.progress.Message())[0]
+        if not keepgoing:
+            self.cancel.set()
+            
+    def OnDone(self, error):
+        self.timer.Stop()
+        self.dialog.Destroy()
+        self.dialog = None
+        if error is None:
+            ShowSaved(self.cfg)
+        elif error == 'cancelled':
+            wx.MessageBox("""Generation cancelled, no files were saved.""",
+                          "Cancelled", wx.OK)
+        else:
+            wx.MessageBox(error, "ERROR", wx.OK)
         
-        with open(filename1, 'wb') as f:
-            pickle.dump(Grammar, f)
         
-        pickle.dump( Grammar, open( filename12, "wb" ) )
-            
-        wx.MessageBox("""Grammar file saved!""",
-                          "Done", wx.OK)
 """
 ##############################################################################
 
@@ -1275,11 +1223,10 @@ class LSGhelp(wx.Frame):
         s +=  (os.linesep + 'You need to specify an output folder by typing in a path or')
         s +=  (os.linesep + 'by using the browse button.')
         s +=  (os.linesep + 'Furthermore, you can specify an output file prefix and the type of')
-        s +=  (os.linesep + 'output which should be stored. Either a Pickle .dat file, ')
+        s +=  (os.linesep + 'output which should be stored. Either a container .lsx file, ')
         s +=  (os.linesep + 'a text file, or both are valid:')
-        s +=  (os.linesep + 'In the case of a .mat file, three variables are stored: a cell')
-        s +=  (os.linesep + 'with the grammar of each iteration, the rule and a vector with the')
-        s +=  (os.linesep + 'length of each iteration.')
+        s +=  (os.linesep + 'In the case of a .lsx file, the grammar of each iteration, the rule')
+        s +=  (os.linesep + 'and the length of each iteration are stored in one indexed file.')
         s +=  (os.linesep + 'In the case of a .txt file, three output files are stored. One with')
         s +=  (os.linesep + 'the grammar, one including the length of each iteration and one')
         s +=  (os.linesep + 'containing the rule.')
@@ -1337,9 +1284,9 @@ class LSMhelp(wx.Frame):
         s +=  (os.linesep + 'USAGE:')
         s +=  (os.linesep + '')
         s +=  (os.linesep + 'First you need to load a system by using the Load L-system button.')
-        s +=  (os.linesep + 'You can easily load a Pickle output file from the Lindenmayer')
+        s +=  (os.linesep + 'You can easily load a container (.lsx) output file from the Lindenmayer')
         s +=  (os.linesep + 'System Generator. You can also load other systems, as long as the system')
-        s +=  (os.linesep + 'is stored in a Pickle .dat file!')
+        s +=  (os.linesep + 'is stored in a .lsx container or in a Pickle .dat file (list of iterations)!')
         s +=  (os.linesep + '')
         s +=  (os.linesep + 'You can define any rules for replacement by pressing')
         s +=  (os.linesep + 'the "Define rules" button. After pressing the button')
@@ -1392,11 +1339,10 @@ class LSMhelp(wx.Frame):
         s +=  (os.linesep + 'You need to specify an output folder by typing in a path or')
         s +=  (os.linesep + 'by using the browse button.')
         s +=  (os.linesep + 'Furthermore, you can specify an output file prefix and the type of')
-        s +=  (os.linesep + 'output which should be stored. Either a pickle .dat file, ')
+        s +=  (os.linesep + 'output which should be stored. Either a container .lsx file, ')
         s +=  (os.linesep + 'a text file, or both are valid:')
-        s +=  (os.linesep + 'In the case of a .mat file, three variables are stored: a cell')
-        s +=  (os.linesep + 'with the grammar of each iteration, the rule and a vector with the')
-        s +=  (os.linesep + 'length of each iteration.')
+        s +=  (os.linesep + 'In the case of a .lsx file, the grammar of each iteration, the rule')
+        s +=  (os.linesep + 'and the length of each iteration are stored in one indexed file.')
         s +=  (os.linesep + 'In the case of a .txt file, three output files are stored. One with')
         s +=  (os.linesep + 'the grammar, one including the length of each iteration and one')
         s +=  (os.linesep + 'containing the rule.')
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Reference output of the engines: the generation loops of pyLSEx.py
+before the lsex package (LSEXfunctions.Generate_classic and
+Generate_extended), without the debug prints and the file output.
+
+They return the list of all iterations (Grammar). Classic rules must
+cover every symbol (the original replaced symbols without a rule by
+"nan"), extended rules must have left hand sides of the same length.
+"""
+
+# two symbol systems of rules.SAMPLES, every symbol has a rule
+SYSTEMS = ["Fibonacci", "Algea", "Thue-Morse", "Feigenbaum", "Cantor dust"]
+
+
+def Classic(rule, start, recs):
+
+    Grammar = ["nan"]*(recs+1)
+    Grammar[0] = start
+
+    for rr in range(0, recs):
+        ag = list(Grammar[rr])
+        ng = ["nan"]*len(ag)
+        for ss in range(0, len(rule[1])):
+            indexes = [i for i, x in enumerate(ag) if x == rule[0][ss]]
+            for ii in indexes:
+                ng[ii] = rule[1][ss]
+        Grammar[rr+1] = ''.join(ng)
+
+    return Grammar
+
+
+def Extended(rule, start, recs, replacetype):
+
+    Grammar = ["nan"]*(recs+1)
+    Grammar[0] = start
+
+    if replacetype == "segm": # segmentwise replacement
+
+        steps=max(len(s) for s in rule[0])
+
+        for rr in range(0, recs):
+
+            ag = Grammar[rr]
+            ng = [""]*len(ag) # create empty new grammar
+
+            for xx in range(0, len(ag), steps):
+
+                tag = ag[xx:xx+steps]
+
+                re=1
+                for ii in range(0, len(rule[0])):
+
+                    if  tag == rule[0][ii]:
+                        ng[xx] = rule[1][ii]
+                        re=0
+                    elif len(tag) < steps:
+                        re=0
+
+                if re == 1:
+                    ng[xx]=ag[xx:xx+steps]
+
+            Grammar[rr+1] = ''.join(ng)
+
+    elif replacetype == "cont":  # continuous replacement
+
+        for rr in range(0, recs):
+
+            ag = Grammar[rr]
+            ng = [""]*len(ag) # create empty new grammar
+
+            for xx in range(0, len(ag)):
+
+                re=1
+                for ii in range(0, len(rule[0])):
+
+                    tag = ag[xx:xx+len(rule[0][ii])]
+
+                    if  tag == rule[0][ii]:
+                        ng[xx] = rule[1][ii]
+                        re=0
+                    elif len(tag) < len(rule[0]):
+                        re=0
+
+                if re == 1:
+                    ng[xx]=ag[xx]
+
+            Grammar[rr+1] = ''.join(ng)
+
+    elif replacetype == "cont_n":   # continuous replacement (skip last n)
+
+        for rr in range(0, recs):
+
+            ag = Grammar[rr]
+            ng = [""]*len(ag)
+
+            xxflag = 0
+            xx = -1
+            while xxflag == 0:
+                xx = xx + 1
+                if xx > len(ag) - 1:
+                    break
+
+                tag = ag[xx:xx+len(rule[0][0])]
+                re=1
+
+                for ii in range(0, len(rule[0])):
+
+                    if  tag == rule[0][ii]:
+                        ng[xx] = rule[1][ii]
+                        xx = xx + len(rule[0][0])-1
+                        re=0
+                    elif len(tag) < len(rule[0]):
+                        re=0
+
+                if re == 1:
+                    ng[xx]=ag[xx]
+
+            Grammar[rr+1] = ''.join(ng)
+
+    return Grammar
+
+
+def Randomrule(rng, symbols='AB', width=2, nrules=None, maxrhs=3):
+    """ Random extended rule with distinct left hand sides of width
+    symbols (all the same length, as the original required) """
+    if nrules is None:
+        nrules = rng.randint(1, len(symbols) ** width)
+    nrules = min(nrules, len(symbols) ** width)
+    lhs = set()
+    while len(lhs) < nrules:
+        lhs.add(''.join(rng.choice(symbols) for _ in range(width)))
+    lhs = sorted(lhs)
+    rng.shuffle(lhs)
+    rhs = [''.join(rng.choice(symbols) for _ in range(rng.randint(0, maxrhs)))
+           for _ in lhs]
+    return [lhs, rhs]
+
+
+def Randomstring(rng, symbols='AB', length=None):
+    if length is None:
+        length = rng.randint(1, 12)
+    return ''.join(rng.choice(symbols) for _ in range(length))
+
+
+def Randomclassic(rng, symbols='abc'):
+    """ Random classic rule covering all symbols (right hand sides may be
+    empty), and a start string """
+    symbols = symbols[:rng.randint(1, len(symbols))]
+    rhs = [Randomstring(rng, symbols, rng.randint(0, 3)) for _ in symbols]
+    return [list(symbols), rhs], Randomstring(rng, symbols)
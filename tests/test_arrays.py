@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Array backed classic expansion (arrays.ArrayRules) against the original
+loop (requires numpy).
+"""
+
+import random
+import unittest
+
+import baseline
+from lsex import arrays
+from lsex.functions import LSEXfunctions, LSEXconfig
+from lsex.rules import Sample
+
+
+@unittest.skipUnless(arrays.Available(), "numpy is not installed")
+class ArrayRulesTest(unittest.TestCase):
+
+    def _Check(self, rule, start, recs):
+        Grammar = baseline.Classic(rule, start, recs)
+        rules = arrays.ArrayRules(rule, start)
+        g = rules.start
+        for rr in range(0, recs + 1):
+            self.assertEqual(g.Tostring(), Grammar[rr], (rule, start, rr))
+            self.assertEqual(g.Counts(), dict((c, Grammar[rr].count(c)) for c in rules.alphabet))
+            if rr < recs:
+                self.assertEqual(rules.Length(g), len(Grammar[rr + 1]))
+                chunks = [block.Tostring() for block in rules.Expand_chunks(g, 3)]
+                g = rules.Expand(g)
+                self.assertEqual(''.join(chunks), Grammar[rr + 1])
+        cfg = LSEXconfig(rule, start, recs)
+        self.assertEqual([g.Tostring() for g in LSEXfunctions().Iterate_arrays(cfg)], Grammar)
+
+    def test_samples(self):
+        for name in baseline.SYSTEMS:
+            self._Check(Sample(name), '0', 10)
+
+    def test_random(self):
+        rng = random.Random(15)
+        for tt in range(0, 200):
+            rule, start = baseline.Randomclassic(rng, 'abcde')
+            self._Check(rule, start, 5)
+
+    def test_blocks(self):
+        # inputs longer than one block
+        rule = Sample("Fibonacci")
+        old = arrays.BLOCK
+        arrays.BLOCK = 7
+        try:
+            self._Check(rule, '0', 10)
+        finally:
+            arrays.BLOCK = old
+
+    def test_non_latin(self):
+        self._Check([[u'α', u'β', u'γ'], [u'βγ', u'α', u'']], u'αγβ', 6)
+
+    def test_slices(self):
+        g = arrays.ArrayGrammar.Fromstring('abcab', ['a', 'b', 'c'])
+        self.assertEqual(g.Tostring(1, 4), 'bca')
+        self.assertEqual(list(g.Chunks(2)), ['ab', 'ca', 'b'])
+        self.assertEqual(list(arrays.ArrayGrammar.Fromstring('', ['a']).Chunks(2)), [''])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+Smoke test of the benchmark suite (bench.py) on small cases, the
+measured lengths against the original loops.
+"""
+
+import unittest
+
+import baseline
+from lsex import bench
+from lsex.functions import LSEXfunctions, LSEXconfig
+from lsex.rules import Sample
+
+
+class BenchTest(unittest.TestCase):
+
+    def test_run(self):
+        cases = bench.Cases(sizes=[100], maxsymbols=1000)
+        results = bench.Run(cases, inprocess=True)
+        self.assertEqual(len(results), len(cases))
+        self.assertEqual(len(set(bench.Key(r) for r in results)), len(results))
+        for result in results:
+            iterations = result['iterations']
+            if result['group'] == 'systems' and result['name'] in baseline.SYSTEMS:
+                rule = Sample(result['name'])
+                reference = baseline.Classic(rule, rule[0][0], result['depth'])
+                lengths = [len(item) for item in reference]
+                if result['engine'] == 'direct':
+                    lengths = lengths[-1:]
+                else:
+                    lengths = lengths[1:]
+                self.assertEqual([it['length'] for it in iterations], lengths,
+                                 bench.Key(result))
+            elif result['group'] == 'extended':
+                # left hand sides of different lengths: not in the original
+                cfg = LSEXconfig(bench.EXTENDED[result['name']], bench.Randomgrammar(100), 1,
+                                 result['name'])
+                self.assertEqual(iterations[0]['output'],
+                                 len(LSEXfunctions().Generate_extended(cfg)[1]))
+            elif result['group'] == 'writers':
+                self.assertTrue(iterations[0]['bytes'] > 0)
+        lines = bench.Compare({'results': results}, {'results': results})
+        self.assertTrue(all(line.endswith('x1.00') for line in lines))
+
+
+if __name__ == '__main__':
+    unittest.main()
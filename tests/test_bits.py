@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Bit packed classic expansion (bits.BitRules, BitEncoder) against the
+original loop (requires numpy).
+"""
+
+import random
+import unittest
+
+import baseline
+from lsex import arrays
+from lsex.functions import LSEXfunctions, LSEXconfig
+from lsex.rules import Sample
+
+
+@unittest.skipUnless(arrays.Available(), "numpy is not installed")
+class BitRulesTest(unittest.TestCase):
+
+    def _Check(self, rule, start, recs):
+        from lsex.bits import BitRules
+        Grammar = baseline.Classic(rule, start, recs)
+        rules = BitRules(rule, start)
+        g = rules.start
+        for rr in range(0, recs + 1):
+            self.assertEqual(g.Tostring(), Grammar[rr], (rule, start, rr))
+            self.assertEqual(len(g), len(Grammar[rr]))
+            self.assertEqual(g.Counts(), dict((c, Grammar[rr].count(c)) for c in rules.alphabet))
+            if rr < recs:
+                chunks = [block.Tostring() for block in rules.Expand_chunks(g, 5)]
+                g = rules.Expand(g)
+                self.assertEqual(''.join(chunks), Grammar[rr + 1])
+        cfg = LSEXconfig(rule, start, recs)
+        self.assertEqual([g.Tostring() for g in LSEXfunctions().Iterate_bits(cfg)], Grammar)
+
+    def test_samples(self):
+        for name in baseline.SYSTEMS:
+            for start in ('0', '1', '0110100'):
+                self._Check(Sample(name), start, 9)
+
+    def test_random(self):
+        rng = random.Random(16)
+        for tt in range(0, 200):
+            rule, start = baseline.Randomclassic(rng, 'ab')
+            self._Check(rule, start, 6)
+
+    def test_windows(self):
+        from lsex.bits import BitGrammar
+        rng = random.Random(17)
+        s = baseline.Randomstring(rng, '01', 100)
+        g = BitGrammar.Fromstring(s, ['0', '1'])
+        for tt in range(0, 100):
+            a = rng.randint(0, 100)
+            b = rng.randint(0, 100)
+            self.assertEqual(g.Tostring(a, b), s[a:b])
+        self.assertEqual(''.join(g.Chunks(7)), s)
+
+    def test_encoder(self):
+        from lsex.bits import BitEncoder, BitGrammar
+        rng = random.Random(18)
+        s = baseline.Randomstring(rng, 'xy', 1000)
+        encoder = BitEncoder(['x', 'y'])
+        data = []
+        for xx in range(0, len(s), 13):
+            data.append(encoder.Encode(s[xx:xx+13]))
+        data.append(encoder.Flush())
+        numpy = arrays.Numpy()
+        g = BitGrammar(numpy.frombuffer(b''.join(data), dtype=numpy.uint8), len(s), ['x', 'y'])
+        self.assertEqual(g.Tostring(), s)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Cached runs (cache.Cache, cfg.cache) against the original loops.
+"""
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+import baseline
+from lsex.cache import Cache
+from lsex.functions import LSEXfunctions, LSEXconfig
+from lsex.rules import Sample
+
+
+class CacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _Iterate(self, cache, rule, start, recs, replacetype=None):
+        cfg = LSEXconfig(rule, start, recs, replacetype, cache=cache)
+        return list(LSEXfunctions().Iterate(cfg))
+
+    def test_classic(self):
+        cache = Cache(self.folder)
+        for name in baseline.SYSTEMS:
+            rule = Sample(name)
+            for recs in (5, 9, 7):
+                self.assertEqual(self._Iterate(cache, rule, '0', recs),
+                                 baseline.Classic(rule, '0', recs), (name, recs))
+        # depths 1..9 of every system, 1..5 and 1..7 were loaded
+        self.assertEqual(len(cache.Entries()), 9 * len(baseline.SYSTEMS))
+        self.assertEqual(cache.hits, 12 * len(baseline.SYSTEMS))
+
+    def test_extended(self):
+        cache = Cache(self.folder)
+        rng = random.Random(6)
+        for replacetype in ('segm', 'cont', 'cont_n'):
+            for tt in range(0, 30):
+                rule = baseline.Randomrule(rng, width=2)
+                start = baseline.Randomstring(rng)
+                reference = baseline.Extended(rule, start, 6, replacetype)
+                self.assertEqual(self._Iterate(cache, rule, start, 4, replacetype),
+                                 reference[:5])
+                self.assertEqual(self._Iterate(cache, rule, start, 6, replacetype),
+                                 reference, (rule, start, replacetype))
+
+    def test_non_latin(self):
+        # two symbols, but not single byte: stored as utf-8
+        rule = [[u'α', u'β'], [u'β', u'αβ']]
+        reference = baseline.Classic(rule, u'α', 8)
+        cache = Cache(self.folder)
+        self.assertEqual(self._Iterate(cache, rule, u'α', 8), reference)
+        self.assertEqual(self._Iterate(cache, rule, u'α', 8), reference)
+        self.assertEqual(cache.hits, 8)
+
+    def test_evict(self):
+        rule = Sample("Fibonacci")
+        cache = Cache(self.folder)
+        self._Iterate(cache, rule, '0', 12)
+        size = cache.Size()
+        cache.Evict(size // 2)
+        self.assertTrue(0 < cache.Size() <= size // 2)
+        self.assertEqual(self._Iterate(cache, rule, '0', 12), baseline.Classic(rule, '0', 12))
+        cache.Clear()
+        self.assertEqual(os.listdir(self.folder), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Command line entry point (cli.main) against the original loops.
+"""
+
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import unittest
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+import baseline
+from lsex.cli import main
+from lsex.container import Container
+from lsex.rules import Sample
+
+
+class CliTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _Run(self, *argv):
+        """ exit code and printed lines of main(argv) """
+        stdout, stderr = sys.stdout, sys.stderr
+        sys.stdout, sys.stderr = StringIO(), StringIO()
+        try:
+            try:
+                code = main(['-o', self.folder] + list(argv))
+            except SystemExit as e:
+                code = e.code
+            return code, sys.stdout.getvalue().splitlines()
+        finally:
+            sys.stdout, sys.stderr = stdout, stderr
+
+    def _Load(self, files, ext):
+        filename = [f for f in files if f.endswith(ext)][0]
+        if ext == '.lsx':
+            c = Container(filename)
+            try:
+                return [c.Load(n) for n in range(len(c))]
+            finally:
+                c.Close()
+        with open(filename, 'rb') as f:
+            return pickle.load(f)
+
+    def test_generate(self):
+        code, files = self._Run('-r', '0=1', '-r', '1=01', '-s', '0', '-n', '9',
+                                '-f', 'dat', '-f', 'lsx', '-f', 'txt')
+        self.assertEqual(code, 0)
+        reference = baseline.Classic(Sample("Fibonacci"), '0', 9)
+        self.assertEqual(self._Load(files, '.dat'), reference)
+        self.assertEqual(self._Load(files, '.lsx'), reference)
+        grammar = [f for f in files if '_grammar_' in f and f.endswith('.txt')][0]
+        with open(grammar) as f:
+            self.assertEqual(f.read().splitlines(), reference)
+
+    def test_system(self):
+        code, files = self._Run('--system', 'Cantor dust', '-s', '0', '-n', '5', '-f', 'dat',
+                                '--keeplast')
+        self.assertEqual(code, 0)
+        self.assertEqual(self._Load(files, '.dat'),
+                         baseline.Classic(Sample("Cantor dust"), '0', 5)[-1:])
+
+    def test_modify(self):
+        code, files = self._Run('--system', 'Thue-Morse', '-s', '0', '-n', '6', '-f', 'lsx',
+                                '-p', 'thue')
+        lsx = [f for f in files if f.endswith('.lsx')][0]
+        start = baseline.Classic(Sample("Thue-Morse"), '0', 6)[4]
+        rule = [['01', '10'], ['10', '0110']]
+        for replacetype in ('segm', 'cont', 'cont_n'):
+            code, files = self._Run('-r', '01=10', '-r', '10=0110', '-t', replacetype,
+                                    '--startfile', lsx, '--startiteration', '4',
+                                    '-n', '4', '-f', 'dat', '-p', replacetype)
+            self.assertEqual(code, 0)
+            self.assertEqual(self._Load(files, '.dat'),
+                             baseline.Extended(rule, start, 4, replacetype))
+
+    def test_jobs(self):
+        jobs = os.path.join(self.folder, 'jobs.json')
+        with open(jobs, 'w') as f:
+            json.dump({'outputpath': self.folder, 'txtout': False, 'pickout': True,
+                       'jobs': [{'rule': 'Algea', 'start': '0', 'recs': [3, 5]}]}, f)
+        code, files = self._Run('--jobs', jobs, '--workers', '1')
+        self.assertEqual(code, 0)
+        dats = sorted(f for f in files if f.endswith('.dat'))
+        loaded = []
+        for dat in dats:
+            with open(dat, 'rb') as f:
+                loaded.append(pickle.load(f))
+        rule = Sample("Algea")
+        self.assertEqual(sorted(loaded, key=len),
+                         [baseline.Classic(rule, '0', 3), baseline.Classic(rule, '0', 5)])
+
+    def test_errors(self):
+        self.assertEqual(self._Run('-r', '0=1', '-s', '0')[0], 2)
+        self.assertEqual(self._Run('-s', '0', '-n', '3')[0], 2)
+        self.assertEqual(self._Run('-r', 'ab=b', '-s', 'ab', '-n', '3')[0], 2)
+        self.assertEqual(self._Run('-r', 'ab=b', '-r', 'a=b', '-t', 'segm', '-s', 'ab',
+                                   '-n', '3')[0], 2)
+        self.assertEqual(self._Run('-r', '0=1', '-s', '0', '-n', '3', '-f', 'bits')[0], 2)
+
+    def test_plan(self):
+        code, lines = self._Run('--system', 'Fibonacci', '-s', '0', '-n', '10', '--plan')
+        self.assertEqual(code, 0)
+        self.assertEqual(os.listdir(self.folder), [])
+        lengths = [len(item) for item in baseline.Classic(Sample("Fibonacci"), '0', 10)]
+        self.assertEqual([int(line.split()[1]) for line in lines[:11]], lengths)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Round trips of the grammar files: .lsx containers (write, read, Reopen),
+Convertlegacy and PickleWriter.Reopen on legacy pickles.
+"""
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+import baseline
+from lsex import arrays
+from lsex.functions import LSEXfunctions, LSEXconfig
+from lsex.container import Container, ContainerWriter, Convertlegacy
+from lsex.output import PickleWriter
+
+RULE = [['A', 'B'], ['AB', 'A']]
+GRAMMAR = ['A', 'AB', 'ABA', 'ABAAB', 'ABAABABA']
+
+
+class ContainerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _Path(self, name):
+        return os.path.join(self.folder, name)
+
+    def _Write(self, filename, Grammar, encoding):
+        w = ContainerWriter(filename, RULE, ['A', 'B'], 'segm', encoding)
+        for item in Grammar[:2]:
+            w.Add(item)
+        # chunks of the same iteration
+        for item in Grammar[2:]:
+            for xx in range(0, len(item), 3):
+                w.Write(item[xx:xx+3])
+            w.EndIteration()
+        return w.Close()
+
+    def _Check(self, filename, Grammar, encoding):
+        c = Container(filename)
+        try:
+            self.assertEqual(c.encoding, encoding)
+            self.assertEqual(c.rule, RULE)
+            self.assertEqual(c.replacetype, 'segm')
+            self.assertEqual(c.Lengths(), [len(item) for item in Grammar])
+            self.assertEqual([c.Load(n) for n in range(len(c))], Grammar)
+        finally:
+            c.Close()
+
+    def _Roundtrip(self, encoding):
+        filename = self._Path('grammar.lsx')
+        self.assertEqual(self._Write(filename, GRAMMAR, encoding), [filename])
+        self._Check(filename, GRAMMAR, encoding)
+
+        w = ContainerWriter.Reopen(filename)
+        w.Add('ABAABABAABAAB')
+        w.Reference(1)
+        w.Close()
+        self._Check(filename, GRAMMAR + ['ABAABABAABAAB', 'AB'], encoding)
+
+    def test_utf8(self):
+        self._Roundtrip('utf-8')
+
+    @unittest.skipUnless(arrays.Available(), "numpy is not installed")
+    def test_bits(self):
+        self._Roundtrip('bits')
+
+    def test_non_latin(self):
+        # two symbols, but not single byte: utf-8 instead of packed bits
+        rule = [[u'α', u'β'], [u'β', u'αβ']]
+        Grammar = [u'α', u'β', u'αβ', u'βαβ', u'αββαβ']
+        filename = self._Path('greek.lsx')
+        w = ContainerWriter(filename, rule, [u'α', u'β'], 'segm')
+        for item in Grammar:
+            w.Add(item)
+        w.Close()
+        c = Container(filename)
+        self.assertEqual(c.encoding, 'utf-8')
+        self.assertEqual([c.Load(n) for n in range(len(c))], Grammar)
+        c.Close()
+        if arrays.Available():
+            self.assertRaises(ValueError, ContainerWriter, self._Path('bits.lsx'), rule,
+                              [u'α', u'β'], 'segm', 'bits')
+
+    def test_stream_non_latin(self):
+        rule = [[u'α', u'β'], [u'β', u'αβ']]
+        reference = baseline.Classic(rule, u'α', 8)
+        for keeplast in (False, True):
+            cfg = LSEXconfig(rule, u'α', 8, outputpath=self.folder,
+                             prefix='run%d' % keeplast, lsxout=True)
+            files = LSEXfunctions().Stream(cfg, keeplast, chunksize=3)
+            c = Container([f for f in files if f.endswith('.lsx')][0])
+            loaded = [c.Load(n) for n in range(len(c))]
+            c.Close()
+            self.assertEqual(loaded, reference[-1:] if keeplast else reference)
+        cfg = LSEXconfig(rule, u'α', 8, outputpath=self.folder, prefix='save', lsxout=True)
+        LSEXfunctions().Generate_classic(cfg)
+        c = Container(os.path.join(self.folder, [f for f in os.listdir(self.folder)
+                                                 if f.startswith('save')][0]))
+        self.assertEqual([c.Load(n) for n in range(len(c))], reference)
+        c.Close()
+
+    def test_empty_iteration(self):
+        filename = self._Path('empty.lsx')
+        w = ContainerWriter(filename, RULE, ['A', 'B'], None, 'utf-8')
+        w.Add('AB')
+        w.Add('')
+        w.Close()
+        c = Container(filename)
+        self.assertEqual([c.Load(0), c.Load(1)], ['AB', ''])
+        c.Close()
+
+    def test_cycle(self):
+        filename = self._Path('cycle.lsx')
+        w = ContainerWriter(filename, RULE, ['A', 'B'], 'segm', 'utf-8')
+        w.Add('AB')
+        w.Add('BA')
+        w.Reference(0)
+        w.Cycle(0, 2)
+        w.Close()
+        c = Container(filename)
+        self.assertEqual(c.cycle, {'start': 0, 'period': 2})
+        self.assertEqual(c.iterations[2], c.iterations[0])
+        self.assertEqual(c.Load(2), 'AB')
+        c.Close()
+
+    def test_not_a_container(self):
+        filename = self._Path('grammar.dat')
+        with open(filename, 'wb') as f:
+            pickle.dump(GRAMMAR, f, 2)
+        self.assertRaises(ValueError, Container, filename)
+
+    def test_convertlegacy(self):
+        for protocol in (0, 2):
+            datfile = self._Path('legacy%d.dat' % protocol)
+            lsxfile = self._Path('legacy%d.lsx' % protocol)
+            with open(datfile, 'wb') as f:
+                pickle.dump(GRAMMAR, f, protocol)
+            self.assertEqual(Convertlegacy(datfile, lsxfile, RULE, 'segm', 'utf-8'),
+                             [lsxfile])
+            self._Check(lsxfile, GRAMMAR, 'utf-8')
+
+
+class PickleWriterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_reopen(self):
+        # protocol 0 is what the original pickle.dump(Grammar, f) wrote
+        for protocol in (0, 2):
+            filename = os.path.join(self.folder, 'grammar%d.dat' % protocol)
+            with open(filename, 'wb') as f:
+                pickle.dump(GRAMMAR[:3], f, protocol)
+
+            w = PickleWriter.Reopen(filename)
+            w.Add(GRAMMAR[3])
+            w.Write(GRAMMAR[4][:3])
+            w.Write(GRAMMAR[4][3:])
+            w.EndIteration()
+            self.assertEqual(w.Close(None), [filename])
+
+            with open(filename, 'rb') as f:
+                self.assertEqual(pickle.load(f), GRAMMAR)
+
+    def test_reopen_not_a_pickle(self):
+        filename = os.path.join(self.folder, 'grammar.txt')
+        with open(filename, 'w') as f:
+            f.write('ABA\n')
+        self.assertRaises(ValueError, PickleWriter.Reopen, filename)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Fixed points and cycles of extended runs (cycles.Cycles) against the
+original loops: the short-circuited iterations and the reported cycle.
+"""
+
+import random
+import shutil
+import tempfile
+import unittest
+
+import baseline
+from test_functions import Joined
+from lsex.container import Container
+from lsex.cycles import Cycles
+from lsex.functions import LSEXfunctions, LSEXconfig
+
+
+def Firstcycle(Grammar):
+    """ (start, period) of the first iteration repeating an earlier one """
+    seen = {}
+    for n, item in enumerate(Grammar):
+        if item in seen:
+            return seen[item], n - seen[item]
+        seen[item] = n
+    return None
+
+
+class CyclesTest(unittest.TestCase):
+
+    def _Random(self, rng, replacetype):
+        # right hand sides not longer than the left hand sides (segm) or
+        # single symbols (cont): the length can not grow, runs are periodic
+        maxrhs = 2 if replacetype == 'segm' else 1
+        rule = baseline.Randomrule(rng, width=2, maxrhs=maxrhs)
+        return rule, baseline.Randomstring(rng, length=rng.randint(4, 12))
+
+    def test_iterate(self):
+        rng = random.Random(14)
+        cycles = 0
+        for replacetype in ('segm', 'cont', 'cont_n'):
+            for tt in range(0, 100):
+                rule, start = self._Random(rng, replacetype)
+                reference = baseline.Extended(rule, start, 20, replacetype)
+                cfg = LSEXconfig(rule, start, 20, replacetype)
+                L = LSEXfunctions()
+                self.assertEqual(list(L.Iterate_extended(cfg)), reference,
+                                 (rule, start, replacetype))
+                self.assertEqual(L.cycle, Firstcycle(reference))
+                self.assertEqual(Joined(L.Iterate_chunks(cfg, 3)), reference)
+                self.assertEqual(L.cycle, Firstcycle(reference))
+                cfg.memory = 0
+                self.assertEqual(Joined(L.Iterate_chunks(cfg, 3)), reference)
+                self.assertEqual(L.cycle, Firstcycle(reference))
+                cycles += L.cycle is not None
+        self.assertTrue(cycles > 200)
+
+    def test_first(self):
+        # cycles of a continued run are reported in absolute iterations
+        rule = [['AB', 'BA'], ['BA', 'AB']]
+        reference = baseline.Extended(rule, 'ABAB', 9, 'segm')
+        cfg = LSEXconfig(rule, reference[3], 6, 'segm')
+        cfg.first = 3
+        L = LSEXfunctions()
+        self.assertEqual(list(L.Iterate_extended(cfg)), reference[3:])
+        self.assertEqual(L.cycle, (3, 2))
+        self.assertEqual(Firstcycle(reference), (0, 2))
+
+    def test_maxsymbols(self):
+        # period too long to be kept: reported, but not short-circuited
+        c = Cycles(maxsymbols=3)
+        for n, ag in enumerate(['AB', 'BA', 'AB', 'BA']):
+            c.Add(n, ag)
+        self.assertEqual(c.Cycle(), (0, 2))
+        self.assertFalse(c.Complete())
+
+    def test_container(self):
+        folder = tempfile.mkdtemp()
+        try:
+            rule = [['AB', 'BA'], ['BA', 'AB']]
+            reference = baseline.Extended(rule, 'ABAB', 12, 'segm')
+            cfg = LSEXconfig(rule, 'ABAB', 12, 'segm', outputpath=folder, lsxout=True)
+            L = LSEXfunctions()
+            files = L.Stream(cfg, chunksize=2)
+            c = Container(files[0])
+            try:
+                self.assertEqual([c.Load(n) for n in range(len(c))], reference)
+                self.assertEqual(c.cycle, {'start': 0, 'period': 2})
+                # repetitions are references to the first period
+                self.assertEqual(c.iterations[11], c.iterations[1])
+            finally:
+                c.Close()
+        finally:
+            shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Events of the generation runs (events.Probe, LSEXfunctions.Subscribe)
+against the original loops, and cancelled streams.
+"""
+
+import os
+import random
+import shutil
+import tempfile
+import threading
+import unittest
+
+import baseline
+from lsex.cache import Cache
+from lsex.events import Cancelled, Progress
+from lsex.functions import LSEXfunctions, LSEXconfig
+from lsex.rules import Sample
+
+
+class Recorder(object):
+    """ Subscriber keeping all events """
+
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event, info):
+        self.events.append((event, info))
+
+    def Names(self):
+        return [event for event, info in self.events]
+
+    def Ends(self):
+        return [info for event, info in self.events if event == 'iteration_end']
+
+
+class EventsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _Check(self, recorder, Grammar):
+        recs = len(Grammar) - 1
+        self.assertEqual(recorder.Names(), ['run_start'] + ['iteration_start', 'iteration_end']
+                         * recs + ['run_end'])
+        ends = recorder.Ends()
+        self.assertEqual([info['iteration'] for info in ends], list(range(1, recs + 1)))
+        self.assertEqual([info['input_length'] for info in ends],
+                         [len(item) for item in Grammar[:-1]])
+        self.assertEqual([info['output_length'] for info in ends],
+                         [len(item) for item in Grammar[1:]])
+        self.assertEqual(recorder.events[-1][1]['lengths'], [len(item) for item in Grammar])
+
+    def test_classic(self):
+        for name in baseline.SYSTEMS:
+            rule = Sample(name)
+            reference = baseline.Classic(rule, '0', 8)
+            for memory in (None, 0):
+                recorder = Recorder()
+                L = LSEXfunctions()
+                L.Subscribe(recorder)
+                cfg = LSEXconfig(rule, '0', 8, memory=memory)
+                if memory is None:
+                    L.Generate_classic(cfg)
+                else:
+                    list(L.Iterate_chunks(cfg, 5))
+                self._Check(recorder, reference)
+                # the last rule of every symbol replaced all its occurrences
+                for info, item in zip(recorder.Ends(), reference):
+                    self.assertEqual(info['matches'], [item.count(s) for s in rule[0]])
+
+    def test_extended(self):
+        rng = random.Random(17)
+        for replacetype in ('segm', 'cont', 'cont_n'):
+            for tt in range(0, 30):
+                rule = baseline.Randomrule(rng, width=2, maxrhs=4)
+                start = baseline.Randomstring(rng)
+                reference = baseline.Extended(rule, start, 5, replacetype)
+                recorder = Recorder()
+                L = LSEXfunctions()
+                L.Subscribe(recorder)
+                cfg = LSEXconfig(rule, start, 5, replacetype)
+                self.assertEqual(L.Generate_extended(cfg), reference)
+                if L.cycle is None:
+                    self._Check(recorder, reference)
+                else:
+                    self.assertEqual(recorder.events[-1][1]['lengths'],
+                                     [len(item) for item in reference])
+
+    def test_cache(self):
+        rule = Sample("Fibonacci")
+        reference = baseline.Classic(rule, '0', 9)
+        cache = Cache(self.folder)
+        list(LSEXfunctions().Iterate(LSEXconfig(rule, '0', 5, cache=cache)))
+        recorder = Recorder()
+        L = LSEXfunctions()
+        L.Subscribe(recorder)
+        self.assertEqual(list(L.Iterate(LSEXconfig(rule, '0', 9, cache=cache))), reference)
+        self._Check(recorder, reference)
+        # loaded iterations have no matches
+        self.assertEqual([info['matches'] is None for info in recorder.Ends()],
+                         [True] * 5 + [False] * 4)
+
+    def test_cancel(self):
+        rule = Sample("Fibonacci")
+        cancel = threading.Event()
+        progress = Progress(LSEXconfig(rule, '0', 20))
+
+        def Cancel(event, info):
+            if event == 'iteration_end' and info['iteration'] == 10:
+                cancel.set()
+
+        L = LSEXfunctions()
+        L.Subscribe(progress)
+        L.Subscribe(Cancel)
+        cfg = LSEXconfig(rule, '0', 20, outputpath=self.folder, txtout=True, pickout=True,
+                         memory=0)
+        self.assertRaises(Cancelled, L.Stream, cfg, False, 10, cancel)
+        self.assertEqual(os.listdir(self.folder), [])
+        self.assertEqual(progress.iteration, 10)
+        self.assertEqual(progress.symbols, sum(len(item) for item in
+                                               baseline.Classic(rule, '0', 10)))
+
+
+if __name__ == '__main__':
+    unittest.main()
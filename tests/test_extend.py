@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Saved grammars extended in place (LSEXfunctions.Extend) against the
+original loops.
+"""
+
+import os
+import pickle
+import random
+import re
+import shutil
+import tempfile
+import unittest
+
+import baseline
+from lsex.container import Container
+from lsex.functions import LSEXfunctions, LSEXconfig
+from lsex.rules import Sample
+
+
+class ExtendTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _Saved(self, ext, rule, start, recs, replacetype=None, prefix='run'):
+        cfg = LSEXconfig(rule, start, recs, replacetype, outputpath=self.folder, prefix=prefix,
+                         txtout=ext == '.txt', pickout=ext == '.dat', lsxout=ext == '.lsx')
+        LSEXfunctions().Generate_extended(cfg)
+        # <prefix>_grammar_<date><ext>, not the length or rule file
+        return [os.path.join(self.folder, f) for f in os.listdir(self.folder)
+                if re.match(re.escape(prefix) + r'_grammar_\d.*' + re.escape(ext) + '$', f)][0]
+
+    def _Load(self, filename):
+        if filename.endswith('.lsx'):
+            c = Container(filename)
+            try:
+                return [c.Load(n) for n in range(len(c))]
+            finally:
+                c.Close()
+        if filename.endswith('.dat'):
+            with open(filename, 'rb') as f:
+                return pickle.load(f)
+        with open(filename, 'rb') as f:
+            return f.read().decode('utf-8').splitlines()
+
+    def test_classic(self):
+        for ext in ('.lsx', '.txt', '.dat'):
+            for name in baseline.SYSTEMS:
+                rule = Sample(name)
+                prefix = name.replace(' ', '') + ext[1:]
+                filename = self._Saved(ext, rule, '0', 4, prefix=prefix)
+                L = LSEXfunctions()
+                L.Extend(filename, 9, rule, chunksize=5)
+                reference = baseline.Classic(rule, '0', 9)
+                self.assertEqual(self._Load(filename), reference, (name, ext))
+                self.assertEqual(L.Grammar_length, [len(item) for item in reference])
+
+    def test_extended(self):
+        rng = random.Random(7)
+        for replacetype in ('segm', 'cont', 'cont_n'):
+            for tt in range(0, 10):
+                rule = baseline.Randomrule(rng, width=2, nrules=4)
+                start = baseline.Randomstring(rng)
+                reference = baseline.Extended(rule, start, 6, replacetype)
+                for ext in ('.lsx', '.dat'):
+                    prefix = '%s%d%s' % (replacetype, tt, ext[1:])
+                    filename = self._Saved(ext, rule, start, 3, replacetype, prefix)
+                    LSEXfunctions().Extend(filename, 6, rule, replacetype, chunksize=3)
+                    self.assertEqual(self._Load(filename), reference,
+                                     (rule, start, replacetype, ext))
+
+
+if __name__ == '__main__':
+    unittest.main()
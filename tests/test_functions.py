@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+LSEXfunctions compared with the original generation loops (baseline.py).
+"""
+
+import os
+import pickle
+import random
+import re
+import shutil
+import tempfile
+import unittest
+
+import baseline
+from lsex.functions import LSEXfunctions, LSEXconfig
+from lsex.rules import Sample
+
+
+class GenerateTest(unittest.TestCase):
+
+    def test_classic(self):
+        for name in baseline.SYSTEMS:
+            rule = Sample(name)
+            for start in ('0', '1', '0110'):
+                cfg = LSEXconfig(rule, start, 8)
+                self.assertEqual(LSEXfunctions().Generate_classic(cfg),
+                                 baseline.Classic(rule, start, 8), (name, start))
+
+    def test_extended(self):
+        rng = random.Random(1)
+        for replacetype in ('segm', 'cont', 'cont_n'):
+            for tt in range(0, 150):
+                width = rng.randint(2, 3)
+                rule = baseline.Randomrule(rng, width=width, nrules=rng.randint(1, 5))
+                start = baseline.Randomstring(rng)
+                recs = rng.randint(0, 6)
+                cfg = LSEXconfig(rule, start, recs, replacetype)
+                self.assertEqual(LSEXfunctions().Generate_extended(cfg),
+                                 baseline.Extended(rule, start, recs, replacetype),
+                                 (rule, start, recs, replacetype))
+
+
+def Joined(chunks):
+    """ Iterations of (iteration, chunk) pairs """
+    Grammar = []
+    for rr, chunk in chunks:
+        if rr == len(Grammar):
+            Grammar.append('')
+        Grammar[rr] += chunk
+    return Grammar
+
+
+class IterateTest(unittest.TestCase):
+
+    def test_classic(self):
+        for name in baseline.SYSTEMS:
+            rule = Sample(name)
+            reference = baseline.Classic(rule, '0', 9)
+            cfg = LSEXconfig(rule, '0', 9)
+            self.assertEqual(list(LSEXfunctions().Iterate_classic(cfg)), reference)
+            self.assertEqual(list(LSEXfunctions().Iterate(cfg)), reference)
+            for chunksize in (1, 5, 1 << 20):
+                self.assertEqual(Joined(LSEXfunctions().Iterate_chunks(cfg, chunksize)),
+                                 reference, (name, chunksize))
+
+    def test_extended(self):
+        rng = random.Random(3)
+        for replacetype in ('segm', 'cont', 'cont_n'):
+            for tt in range(0, 100):
+                rule = baseline.Randomrule(rng, width=rng.randint(2, 3))
+                start = baseline.Randomstring(rng)
+                recs = rng.randint(0, 6)
+                reference = baseline.Extended(rule, start, recs, replacetype)
+                cfg = LSEXconfig(rule, start, recs, replacetype)
+                self.assertEqual(list(LSEXfunctions().Iterate_extended(cfg)), reference)
+                self.assertEqual(Joined(LSEXfunctions().Iterate_chunks(cfg, rng.randint(1, 7))),
+                                 reference, (rule, start, recs, replacetype))
+
+    def test_entry_points(self):
+        # single character rules are classic rules in every entry point,
+        # whatever the replacement type (the original GUI did the same)
+        folder = tempfile.mkdtemp()
+        try:
+            for replacetype in (None, 'segm', 'cont', 'cont_n'):
+                for name in baseline.SYSTEMS:
+                    rule = Sample(name)
+                    reference = baseline.Classic(rule, '0', 7)
+                    cfg = LSEXconfig(rule, '0', 7, replacetype, outputpath=folder,
+                                     pickout=True)
+                    L = LSEXfunctions()
+                    self.assertEqual(L.Generate_extended(cfg), reference)
+                    self.assertEqual(list(L.Iterate_extended(cfg)), reference)
+                    files = L.Stream(cfg, chunksize=3)
+                    with open(files[0], 'rb') as f:
+                        self.assertEqual(pickle.load(f), reference, (name, replacetype))
+                    for filename in os.listdir(folder):
+                        os.remove(os.path.join(folder, filename))
+        finally:
+            shutil.rmtree(folder)
+
+    def test_stream(self):
+        rng = random.Random(4)
+        folder = tempfile.mkdtemp()
+        try:
+            for replacetype in ('segm', 'cont', 'cont_n'):
+                for tt in range(0, 20):
+                    rule = baseline.Randomrule(rng, width=2)
+                    start = baseline.Randomstring(rng)
+                    reference = baseline.Extended(rule, start, 5, replacetype)
+                    cfg = LSEXconfig(rule, start, 5, replacetype, outputpath=folder,
+                                     prefix='run%d' % tt, txtout=True, pickout=True)
+                    L = LSEXfunctions()
+                    self.assertEqual(L.Generate_extended(cfg), reference)
+                    generated = sorted(os.listdir(folder))
+                    for filename in generated:
+                        os.remove(os.path.join(folder, filename))
+                    L.Stream(cfg, chunksize=rng.randint(1, 5))
+                    streamed = os.listdir(folder)
+                    self.assertEqual(len(streamed), len(generated))
+                    for filename in streamed:
+                        path = os.path.join(folder, filename)
+                        if filename.endswith('.dat'):
+                            with open(path, 'rb') as f:
+                                self.assertEqual(pickle.load(f), reference)
+                        os.remove(path)
+                    self.assertEqual(L.Grammar_length, [len(item) for item in reference])
+        finally:
+            shutil.rmtree(folder)
+
+
+class SaveTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_files(self):
+        rule = Sample("Fibonacci")
+        cfg = LSEXconfig(rule, '0', 6, outputpath=self.folder, txtout=True, pickout=True)
+        Grammar = LSEXfunctions().Generate_classic(cfg)
+        files = sorted(os.listdir(self.folder))
+        self.assertEqual(len(files), 4)
+        contents = {}
+        for filename in files:
+            with open(os.path.join(self.folder, filename), 'rb') as f:
+                # output_<kind>_<date>.<ext>
+                kind = re.match(r'output_(\w+?)_\d', filename).group(1)
+                contents[kind + os.path.splitext(filename)[1]] = f.read()
+
+        self.assertEqual(pickle.loads(contents['grammar.dat']), Grammar)
+        self.assertEqual(contents['grammar.txt'].decode('utf-8'),
+                         ''.join("%s\n" % item for item in Grammar))
+        self.assertEqual(contents['grammar_length.txt'].decode('utf-8'),
+                         ''.join("%s\n" % len(item) for item in Grammar))
+        self.assertEqual(contents['grammar_rule.txt'].decode('utf-8'), "0  -->  1\n1  -->  01\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Closed-form lengths and symbol counts (growth.Growth) against the
+iterations of the original loop.
+"""
+
+import random
+import unittest
+
+import baseline
+from lsex.growth import Growth, Maxlength
+from lsex.rules import Sample
+
+
+class GrowthTest(unittest.TestCase):
+
+    def _Check(self, rule, start, recs):
+        Grammar = baseline.Classic(rule, start, recs)
+        g = Growth(rule, start)
+        self.assertEqual(g.Lengths(recs), [len(item) for item in Grammar])
+        for n in range(0, recs + 1):
+            self.assertEqual(g.Length(n), len(Grammar[n]))
+            self.assertEqual(g.Counts(n),
+                             dict((c, Grammar[n].count(c)) for c in g.alphabet))
+
+    def test_samples(self):
+        for name in baseline.SYSTEMS:
+            self._Check(Sample(name), '0', 10)
+
+    def test_random(self):
+        rng = random.Random(5)
+        for tt in range(0, 200):
+            rule, start = baseline.Randomclassic(rng)
+            self._Check(rule, start, 6)
+
+    def test_deep(self):
+        # Fibonacci numbers, no strings built
+        g = Growth(Sample("Fibonacci"), '0')
+        a, b = 1, 1
+        for n in range(0, 300):
+            a, b = b, a + b
+        self.assertEqual(g.Length(300), a)
+
+    def test_maxlength(self):
+        rng = random.Random(6)
+        for replacetype in ('segm', 'cont', 'cont_n'):
+            for tt in range(0, 100):
+                rule = baseline.Randomrule(rng, width=rng.randint(2, 3))
+                start = baseline.Randomstring(rng)
+                Grammar = baseline.Extended(rule, start, 4, replacetype)
+                for ag, ng in zip(Grammar, Grammar[1:]):
+                    self.assertTrue(len(ng) <= Maxlength(rule, replacetype, len(ag)))
+
+
+if __name__ == '__main__':
+    unittest.main()
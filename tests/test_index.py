@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+Random access into classic iterations (index.Index) against the
+iterations of the original loop.
+"""
+
+import random
+import unittest
+
+import baseline
+from lsex.index import Index
+from lsex.rules import Sample
+
+
+class IndexTest(unittest.TestCase):
+
+    def _Check(self, rule, start, recs, rng):
+        Grammar = baseline.Classic(rule, start, recs)
+        index = Index(rule, start)
+        for n, ag in enumerate(Grammar):
+            self.assertEqual(index.Length(n), len(ag))
+            self.assertEqual(index.Slice(n, 0, None), ag)
+            for k in range(-len(ag), len(ag)):
+                self.assertEqual(index.Char_at(n, k), ag[k])
+            self.assertRaises(IndexError, index.Char_at, n, len(ag))
+            for tt in range(0, 10):
+                a = rng.randint(-len(ag) - 2, len(ag) + 2)
+                b = rng.randint(-len(ag) - 2, len(ag) + 2)
+                self.assertEqual(index.Slice(n, a, b), ag[a:b], (rule, start, n, a, b))
+
+    def test_samples(self):
+        rng = random.Random(7)
+        for name in baseline.SYSTEMS:
+            self._Check(Sample(name), '01', 7, rng)
+
+    def test_random(self):
+        rng = random.Random(8)
+        for tt in range(0, 100):
+            rule, start = baseline.Randomclassic(rng)
+            self._Check(rule, start, 5, rng)
+
+    def test_deep(self):
+        # window of a Thue-Morse iteration of 2^60 symbols
+        index = Index(Sample("Thue-Morse"), '0')
+        k = (1 << 60) - 5
+        expected = ''.join(str(bin(ii).count('1') % 2) for ii in range(k, k + 5))
+        self.assertEqual(index.Slice(60, k, k + 5), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
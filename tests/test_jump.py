@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Direct expansion of classic iterations (jump.Jump, Direct_classic and
+Stream with keeplast) against the original loop.
+"""
+
+import os
+import pickle
+import random
+import shutil
+import tempfile
+import unittest
+
+import baseline
+from lsex.functions import LSEXfunctions, LSEXconfig
+from lsex.jump import Jump
+from lsex.rules import Sample
+
+
+class JumpTest(unittest.TestCase):
+
+    def test_samples(self):
+        for name in baseline.SYSTEMS:
+            rule = Sample(name)
+            reference = baseline.Classic(rule, '01', 11)
+            # small tables: larger powers apply the last table repeatedly
+            for tablemax in (1, 16, 1 << 16):
+                jump = Jump(rule, '01', tablemax)
+                for n in range(0, 12):
+                    self.assertEqual(jump.Expand(n), reference[n], (name, tablemax, n))
+                    self.assertEqual(''.join(jump.Chunks(n, 10)), reference[n])
+
+    def test_random(self):
+        rng = random.Random(9)
+        for tt in range(0, 200):
+            rule, start = baseline.Randomclassic(rng)
+            reference = baseline.Classic(rule, start, 8)
+            jump = Jump(rule, start, rng.choice((1, 8, 1 << 16)))
+            n = rng.randint(0, 8)
+            self.assertEqual(jump.Expand(n), reference[n], (rule, start, n))
+            self.assertEqual(''.join(jump.Chunks(n, rng.randint(1, 20))), reference[n])
+            cfg = LSEXconfig(rule, start, n)
+            self.assertEqual(LSEXfunctions().Direct_classic(cfg), reference[n])
+
+    def test_keeplast(self):
+        folder = tempfile.mkdtemp()
+        try:
+            rule = Sample("Fibonacci")
+            cfg = LSEXconfig(rule, '0', 20, outputpath=folder, pickout=True)
+            files = LSEXfunctions().Stream(cfg, keeplast=True, chunksize=100)
+            with open([f for f in files if f.endswith('.dat')][0], 'rb') as f:
+                self.assertEqual(pickle.load(f), baseline.Classic(rule, '0', 20)[-1:])
+            self.assertEqual(len(os.listdir(folder)), len(files))
+        finally:
+            shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    unittest.main()
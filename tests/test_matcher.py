@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Continuous replacement (matcher.Matcher) against the original cont and
+cont_n loops, including their drop rule for unmatched characters.
+"""
+
+import random
+import unittest
+
+import baseline
+from lsex.matcher import Matcher
+
+
+def Naive(rule, ag, skip):
+    """ cont/cont_n for left hand sides of any length: the last rule
+    starting at a position wins, cont_n skips the matched symbols """
+    lhs, rhs = rule
+    nrules = len(lhs)
+    keepend = 0 if min(map(len, lhs)) < nrules else len(ag) - nrules + 1
+    ng = []
+    xx = 0
+    while xx < len(ag):
+        match = -1
+        for ii in range(0, nrules):
+            if ag.startswith(lhs[ii], xx):
+                match = ii
+        if match >= 0:
+            ng.append(rhs[match])
+            xx += max(len(lhs[match]), 1) if skip else 1
+        else:
+            if xx < keepend:
+                ng.append(ag[xx])
+            xx += 1
+    return ''.join(ng)
+
+
+class MatcherTest(unittest.TestCase):
+
+    def _Check(self, rule, start, recs):
+        m = Matcher(rule)
+        for replacetype, Replace in (('cont', m.Replace_cont), ('cont_n', m.Replace_cont_n)):
+            Grammar = [start]
+            for rr in range(0, recs):
+                Grammar.append(Replace(Grammar[-1]))
+            self.assertEqual(Grammar, baseline.Extended(rule, start, recs, replacetype),
+                             (rule, start, replacetype))
+
+    def test_random(self):
+        rng = random.Random(9)
+        for tt in range(0, 300):
+            width = rng.randint(1, 4)
+            symbols = 'ABC'[:rng.randint(2, 3)]
+            rule = baseline.Randomrule(rng, symbols, width, rng.randint(1, 6))
+            self._Check(rule, baseline.Randomstring(rng, symbols, rng.randint(0, 30)), 4)
+
+    def test_drop_rule(self):
+        # shortest left hand side shorter than the number of rules: all
+        # unmatched characters are dropped
+        rule = [['ab', 'ba', 'aa'], ['X', 'Y', 'Z']]
+        self.assertEqual(Matcher(rule).Replace_cont('abbbaab'), 'XYZX')
+        self.assertEqual(Matcher(rule).Replace_cont_n('abbbaab'), 'XYX')
+        self.assertEqual(Matcher(rule).Replace_cont('cccc'), '')
+        # else only the last number of rules - 1 characters are dropped
+        rule = [['abc', 'bca'], ['X', 'Y']]
+        self.assertEqual(Matcher(rule).Replace_cont('cabcab'), 'cXYca')
+        self.assertEqual(Matcher(rule).Replace_cont_n('cabcab'), 'cXa')
+        self.assertEqual(Matcher(rule).Replace_cont('cccc'), 'ccc')
+        self._Check([['ab', 'ba', 'aa'], ['X', 'Y', 'Z']], 'abbbaab', 1)
+        self._Check([['abc', 'bca'], ['X', 'Y']], 'cabcab', 1)
+
+    def test_large(self):
+        # long iterations, single scan
+        rng = random.Random(10)
+        ag = baseline.Randomstring(rng, '01', 20000)
+        rule = [['01', '10', '11'], ['1', '0110', '0']]
+        self._Check(rule, ag, 1)
+        rule = [['000', '011', '101', '110'], ['1', '0', '10', '']]
+        self._Check(rule, ag, 1)
+
+    def test_lengths(self):
+        # left hand sides of different lengths
+        rng = random.Random(11)
+        for tt in range(0, 300):
+            lhs = list(set(baseline.Randomstring(rng, 'AB', rng.randint(1, 4))
+                           for ii in range(rng.randint(1, 5))))
+            rhs = [baseline.Randomstring(rng, 'AB', rng.randint(0, 3)) for s in lhs]
+            ag = baseline.Randomstring(rng, 'AB', rng.randint(0, 40))
+            m = Matcher([lhs, rhs])
+            self.assertEqual(m.Replace_cont(ag), Naive([lhs, rhs], ag, False))
+            self.assertEqual(m.Replace_cont_n(ag), Naive([lhs, rhs], ag, True))
+
+    def test_matches(self):
+        m = Matcher([['ab', 'b', 'abb'], ['1', '2', '3']])
+        self.assertEqual(list(m.Matches('abbab')), [(0, 2), (1, 1), (2, 1), (3, 0), (4, 1)])
+        self.assertEqual(list(m.Matches('abbab', skip=True)), [(0, 2), (3, 0)])
+        self.assertEqual(list(m.Matches('abbab', 1, settled=3)), [(1, 1), (2, 1)])
+
+    def test_counts(self):
+        m = Matcher([['ab', 'ba'], ['X', 'Y']])
+        counts = [0, 0]
+        m.Replace_cont('ababa', counts)
+        self.assertEqual(counts, [2, 2])
+        counts = [0, 0]
+        m.Replace_cont_n('ababa', counts)
+        self.assertEqual(counts, [2, 0])
+
+    def test_stream(self):
+        rng = random.Random(12)
+        for tt in range(0, 200):
+            lhs = list(set(baseline.Randomstring(rng, 'AB', rng.randint(1, 3))
+                           for ii in range(rng.randint(1, 4))))
+            rhs = [baseline.Randomstring(rng, 'AB', rng.randint(0, 3)) for s in lhs]
+            ag = baseline.Randomstring(rng, 'AB', rng.randint(0, 40))
+            size = rng.randint(1, 6)
+            chunks = [ag[xx:xx+size] for xx in range(0, len(ag), size)]
+            m = Matcher([lhs, rhs])
+            for skip, Replace in ((False, m.Replace_cont), (True, m.Replace_cont_n)):
+                counts = [0]*len(lhs)
+                expected = [0]*len(lhs)
+                self.assertEqual(''.join(m.Replace_stream(chunks, len(ag), skip, counts)),
+                                 Replace(ag, expected))
+                self.assertEqual(counts, expected)
+
+    def test_unicode(self):
+        self._Check([[u'αβ', u'βα'], [u'β', u'ααβ']], u'αββα', 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Replacement with block memo (memo.Memosegm, memo.Memocont, cfg.memo and
+Direct_extended) against the original loops.
+"""
+
+import random
+import unittest
+
+import baseline
+from lsex.functions import LSEXfunctions, LSEXconfig
+from lsex.matcher import Matcher
+from lsex.memo import Blockmemo, Memosegm, Memocont, Aligned
+from lsex.segments import Segmenter
+
+
+class MemoTest(unittest.TestCase):
+
+    def test_replace(self):
+        rng = random.Random(10)
+        for tt in range(0, 300):
+            rule = baseline.Randomrule(rng, width=rng.randint(2, 4))
+            ag = baseline.Randomstring(rng, length=rng.randint(0, 200))
+            memo = Blockmemo(rng.randint(1, 16))
+            memo.Bind(rule, 'segm')
+            segm = Memosegm(Segmenter(rule), memo)
+            self.assertEqual(segm.Replace_segm(ag), baseline.Extended(rule, ag, 1, 'segm')[1])
+            for replacetype, skip in (('cont', False), ('cont_n', True)):
+                # entries of the other replacement types are removed
+                memo.Bind(rule, replacetype)
+                cont = Memocont(Matcher(rule), memo, skip)
+                self.assertEqual(cont.Replace(ag), baseline.Extended(rule, ag, 1, replacetype)[1],
+                                 (rule, ag, replacetype, memo.blocksize))
+                # repeated blocks: hits
+                self.assertEqual(cont.Replace(ag), baseline.Extended(rule, ag, 1, replacetype)[1])
+
+    def test_counts(self):
+        rng = random.Random(11)
+        for tt in range(0, 100):
+            rule = baseline.Randomrule(rng, width=2)
+            ag = baseline.Randomstring(rng, length=rng.randint(0, 100))
+            memo = Blockmemo(rng.randint(1, 8))
+            for replacetype, skip in (('cont', False), ('cont_n', True)):
+                memo.Bind(rule, replacetype)
+                matcher = Matcher(rule)
+                expected = [0] * len(rule[0])
+                getattr(matcher, 'Replace_' + replacetype)(ag, expected)
+                counts = [0] * len(rule[0])
+                Memocont(matcher, memo, skip).Replace(ag, counts)
+                Memocont(matcher, memo, skip).Replace(ag, counts)
+                self.assertEqual(counts, [2 * c for c in expected])
+
+    def test_generate(self):
+        rng = random.Random(12)
+        for replacetype in ('segm', 'cont', 'cont_n'):
+            for tt in range(0, 50):
+                rule = baseline.Randomrule(rng, width=rng.randint(2, 3))
+                start = baseline.Randomstring(rng)
+                cfg = LSEXconfig(rule, start, 7, replacetype, memo=rng.randint(1, 10))
+                self.assertEqual(LSEXfunctions().Generate_extended(cfg),
+                                 baseline.Extended(rule, start, 7, replacetype),
+                                 (rule, start, replacetype))
+
+    def test_direct(self):
+        rng = random.Random(13)
+        for tt in range(0, 100):
+            width = rng.randint(1, 3)
+            lhs = sorted(set(baseline.Randomstring(rng, length=width) for _ in range(4)))
+            rhs = [baseline.Randomstring(rng, length=width * rng.randint(0, 3)) for _ in lhs]
+            rule = [lhs, rhs]
+            self.assertTrue(Aligned(rule))
+            start = baseline.Randomstring(rng)
+            recs = rng.randint(0, 9)
+            reference = baseline.Extended(rule, start, recs, 'segm')
+            memo = Blockmemo(rng.randint(1, 8), lookahead=rng.randint(1, 4))
+            L = LSEXfunctions()
+            cfg = LSEXconfig(rule, start, recs, 'segm', memo=memo)
+            self.assertEqual(L.Direct_extended(cfg), reference[-1], (rule, start, recs))
+            self.assertEqual(L.Grammar_length, [len(item) for item in reference])
+
+    def test_not_aligned(self):
+        cfg = LSEXconfig([['AB', 'BA'], ['A', 'BAB']], 'AB', 3, 'segm')
+        self.assertRaises(ValueError, LSEXfunctions().Direct_extended, cfg)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+Multi-process classic expansion (parallel.ParallelExpander) against the
+original loop.
+"""
+
+import unittest
+
+import baseline
+from lsex.functions import LSEXfunctions, LSEXconfig
+from lsex.parallel import ParallelExpander
+from lsex.rules import Sample
+
+
+class ParallelTest(unittest.TestCase):
+
+    def test_expand(self):
+        # minsize 1: every iteration is split over the workers
+        for name in ("Fibonacci", "Cantor dust"):
+            rule = Sample(name)
+            Grammar = baseline.Classic(rule, '0', 10)
+            with ParallelExpander(rule, 2, minsize=1) as rules:
+                ag = Grammar[0]
+                for rr in range(0, 10):
+                    ag = rules.Expand(ag)
+                    self.assertEqual(ag, Grammar[rr + 1], (name, rr))
+
+    def test_non_latin(self):
+        rule = [[u'α', u'β'], [u'β', u'αβ']]
+        Grammar = baseline.Classic(rule, u'α', 12)
+        with ParallelExpander(rule, 2, minsize=1) as rules:
+            self.assertEqual(rules.Expand(Grammar[11]), Grammar[12])
+
+    def test_functions(self):
+        rule = Sample("Thue-Morse")
+        reference = baseline.Classic(rule, '0', 10)
+        cfg = LSEXconfig(rule, '0', 10, workers=2, parallel_min=1)
+        self.assertEqual(list(LSEXfunctions().Iterate_classic(cfg)), reference)
+        chunks = {}
+        for rr, chunk in LSEXfunctions().Iterate_chunks(cfg, 100):
+            chunks[rr] = chunks.get(rr, '') + chunk
+        self.assertEqual([chunks[rr] for rr in sorted(chunks)], reference)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Pre-flight estimates (plan.Plan) against the original loops.
+"""
+
+import random
+import shutil
+import tempfile
+import unittest
+
+import baseline
+from lsex import arrays
+from lsex.functions import LSEXconfig
+from lsex.plan import Plan
+from lsex.rules import Sample
+
+
+class PlanTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _Plan(self, rule, start, recs, replacetype=None, **kw):
+        cfg = LSEXconfig(rule, start, recs, replacetype, outputpath=self.folder, **kw)
+        return Plan(cfg, memory=1 << 30, disk=1 << 40)
+
+    def test_lengths(self):
+        for name in baseline.SYSTEMS:
+            rule = Sample(name)
+            self.assertEqual(self._Plan(rule, '0', 12).lengths,
+                             [len(item) for item in baseline.Classic(rule, '0', 12)])
+
+    def test_bound(self):
+        rng = random.Random(5)
+        for replacetype in ('segm', 'cont', 'cont_n'):
+            for tt in range(0, 100):
+                rule = baseline.Randomrule(rng, width=rng.randint(2, 3))
+                start = baseline.Randomstring(rng)
+                reference = baseline.Extended(rule, start, 5, replacetype)
+                lengths = self._Plan(rule, start, 5, replacetype).lengths
+                for item, bound in zip(reference, lengths):
+                    self.assertTrue(len(item) <= bound, (rule, start, replacetype))
+
+    def test_lsx(self):
+        rule = Sample("Fibonacci")
+        output = self._Plan(rule, '0', 20, lsxout=True).output
+        symbols = sum(len(item) for item in baseline.Classic(rule, '0', 20))
+        self.assertEqual(output, symbols // 8 if arrays.Available() else symbols)
+        # two symbols, but not single byte: utf-8 containers
+        rule = [[u'α', u'β'], [u'β', u'αβ']]
+        output = self._Plan(rule, u'α', 20, lsxout=True).output
+        self.assertEqual(output, 2 * sum(len(item) for item in baseline.Classic(rule, u'α', 20)))
+
+    def test_engine(self):
+        rule = Sample("Fibonacci")
+        cfg = LSEXconfig(rule, '0', 32, outputpath=self.folder)
+        self.assertEqual(Plan(cfg, memory=1 << 30, disk=1 << 40).engine, 'memory')
+        self.assertEqual(Plan(cfg, memory=1 << 23, disk=1 << 40).engine, 'streaming')
+        plan = Plan(cfg, memory=1 << 16, disk=1 << 40)
+        self.assertEqual(plan.engine, 'out-of-core')
+        plan.Apply(cfg)
+        self.assertEqual(cfg.memory, 1 << 16)
+        cfg = LSEXconfig(rule, '0', 32, outputpath=self.folder, txtout=True)
+        self.assertEqual(Plan(cfg, memory=1 << 30, disk=1 << 20).engine, 'refuse')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Compiled classic rules (rules.ClassicRules) against the original
+replacement loop.
+"""
+
+import random
+import unittest
+
+import baseline
+from lsex.rules import ClassicRules, Alphabet, Checkrules, Sample, SAMPLES
+
+
+class ClassicRulesTest(unittest.TestCase):
+
+    def _Iterations(self, rule, start, recs):
+        rules = ClassicRules(rule)
+        Grammar = [start]
+        for rr in range(0, recs):
+            Grammar.append(rules.Expand(Grammar[-1]))
+        return Grammar
+
+    def test_samples(self):
+        for name in baseline.SYSTEMS:
+            rule = Sample(name)
+            self.assertEqual(self._Iterations(rule, '01', 9),
+                             baseline.Classic(rule, '01', 9), name)
+
+    def test_random(self):
+        rng = random.Random(2)
+        for tt in range(0, 200):
+            symbols = 'abc'[:rng.randint(1, 3)]
+            # the last rule of a symbol wins, as in the original loop
+            lhs = list(symbols) + [rng.choice(symbols) for _ in range(rng.randint(0, 2))]
+            rhs = [baseline.Randomstring(rng, symbols, rng.randint(0, 3)) for _ in lhs]
+            start = baseline.Randomstring(rng, symbols)
+            self.assertEqual(self._Iterations([lhs, rhs], start, 5),
+                             baseline.Classic([lhs, rhs], start, 5), (lhs, rhs, start))
+
+    def test_unicode(self):
+        rule = [[u'α', u'β'], [u'β', u'αβ']]
+        self.assertEqual(self._Iterations(rule, u'α', 6),
+                         baseline.Classic(rule, u'α', 6))
+
+    def test_symbols_without_rule(self):
+        # the original replaced them by "nan"
+        rule = Sample("Koch curve")
+        self.assertEqual(ClassicRules(rule).Expand('1+1'), '1+1-1-1+1+1+1-1-1+1')
+
+    def test_checkrules(self):
+        for name, rule in SAMPLES:
+            Checkrules(rule)
+        self.assertRaises(ValueError, Checkrules, [['', 'a'], ['a', 'b']])
+        self.assertRaises(ValueError, Checkrules, [['ab', 'a'], ['a', 'b']], 'segm')
+        Checkrules([['ab', 'a'], ['a', 'b']], 'cont')
+        self.assertRaises(ValueError, ClassicRules, [['ab'], ['a']])
+
+    def test_alphabet(self):
+        self.assertEqual(Alphabet(Sample("Pythagoras tree"), '0'), ['0', '1', '[', ']'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Segmentwise replacement (segments.Segmenter) against the original segm
+loop, with and without the numpy engine.
+"""
+
+import random
+import unittest
+
+import baseline
+from lsex import arrays
+from lsex.segments import Segmenter, NUMPY_MIN
+
+
+class SegmenterTest(unittest.TestCase):
+
+    def _Check(self, rule, start, recs):
+        Grammar = baseline.Extended(rule, start, recs, 'segm')
+        for usenumpy in (False, True):
+            segmenter = Segmenter(rule, usenumpy)
+            ag = start
+            for rr in range(0, recs):
+                counts = [0]*len(rule[0])
+                ag = segmenter.Replace_segm(ag, counts)
+                self.assertEqual(ag, Grammar[rr + 1], (rule, start, rr, usenumpy))
+                self.assertEqual(counts, self._Counts(rule, Grammar[rr]))
+
+    def _Counts(self, rule, ag):
+        """ replacements of every rule (the last rule of a left hand side) """
+        steps = max(len(s) for s in rule[0])
+        counts = [0]*len(rule[0])
+        for xx in range(0, len(ag), steps):
+            matched = [ii for ii, lhs in enumerate(rule[0]) if ag[xx:xx+steps] == lhs]
+            if matched:
+                counts[matched[-1]] += 1
+        return counts
+
+    def test_random(self):
+        rng = random.Random(13)
+        for tt in range(0, 300):
+            width = rng.randint(1, 4)
+            symbols = 'ABC'[:rng.randint(2, 3)]
+            rule = baseline.Randomrule(rng, symbols, width, rng.randint(1, 6))
+            self._Check(rule, baseline.Randomstring(rng, symbols, rng.randint(0, 30)), 4)
+
+    def test_long(self):
+        # above NUMPY_MIN the numpy engine is used (if installed)
+        rng = random.Random(14)
+        for width in range(1, 10):
+            rule = baseline.Randomrule(rng, '01', width, min(2 ** width, 5))
+            start = baseline.Randomstring(rng, '01', NUMPY_MIN * 2 + rng.randint(0, width))
+            self._Check(rule, start, 2)
+
+    def test_non_latin_rules(self):
+        # the numpy tables are latin-1, rules with other symbols use the
+        # dict lookup at any length
+        rule = [['ab', 'ba'], [u'→', 'b']]
+        start = 'ab' * (NUMPY_MIN * 2)
+        self.assertEqual(Segmenter(rule).Replace_segm(start), u'→' * (NUMPY_MIN * 2))
+        self._Check(rule, start + 'ba', 2)
+        rule = [[u'αβ', u'βα'], [u'α', u'αββ']]
+        self._Check(rule, u'αβ' * NUMPY_MIN, 2)
+
+    def test_non_latin_grammar(self):
+        rule = [['ab', 'ba'], ['b', 'a']]
+        start = u'ab→b' * NUMPY_MIN
+        self._Check(rule, start, 2)
+
+    @unittest.skipUnless(arrays.Available(), "numpy is not installed")
+    def test_numpy_used(self):
+        segmenter = Segmenter([['ab', 'ba'], ['b', 'abb']])
+        self.assertTrue(segmenter._Replace_numpy('ab' * NUMPY_MIN) is not None)
+        self.assertFalse(Segmenter([['ab', 'ba'], [u'→', 'b']]).usenumpy)
+
+
+if __name__ == '__main__':
+    unittest.main()
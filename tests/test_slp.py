@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Straight line programs of classic iterations (slp.SLP) against the
+original loop.
+"""
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+import baseline
+from lsex.slp import SLP
+from lsex.rules import Sample
+
+
+class SLPTest(unittest.TestCase):
+
+    def _Check(self, rule, start, recs, rng):
+        Grammar = baseline.Classic(rule, start, recs)
+        for n, ag in enumerate(Grammar):
+            slp = SLP.Fromclassic(rule, start, n)
+            self.assertEqual(len(slp), len(ag))
+            self.assertEqual(''.join(slp.Chunks(rng.randint(1, 9))), ag, (rule, start, n))
+            self.assertEqual(''.join(slp), ag)
+            for tt in range(0, 5):
+                a = rng.randint(-len(ag) - 1, len(ag) + 1)
+                b = rng.randint(-len(ag) - 1, len(ag) + 1)
+                self.assertEqual(slp[a:b], ag[a:b])
+            if ag:
+                self.assertEqual(slp[-1], ag[-1])
+                self.assertEqual(slp[0], ag[0])
+                # same hash as the uncompressed string
+                flat = SLP(list(ag) + [tuple(range(len(ag)))])
+                self.assertEqual(slp.Hash(), flat.Hash())
+
+    def test_samples(self):
+        rng = random.Random(19)
+        for name in baseline.SYSTEMS:
+            self._Check(Sample(name), '01', 8, rng)
+
+    def test_random(self):
+        rng = random.Random(20)
+        for tt in range(0, 100):
+            rule, start = baseline.Randomclassic(rng)
+            self._Check(rule, start, 5, rng)
+
+    def test_deep(self):
+        # Fibonacci iteration 80 (~3.8e16 symbols) is the concatenation
+        # of iterations 79 and 78
+        rule = Sample("Fibonacci")
+        slp = SLP.Fromclassic(rule, '0', 80)
+        a = SLP.Fromclassic(rule, '0', 79)
+        b = SLP.Fromclassic(rule, '0', 78)
+        self.assertEqual(slp.Length(), a.Length() + b.Length())
+        self.assertEqual(slp[a.Length() - 10:a.Length() + 10],
+                         a[a.Length() - 10:] + b[:10])
+
+    def test_save(self):
+        folder = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(folder, 'thue.json')
+            slp = SLP.Fromclassic(Sample("Thue-Morse"), '0', 12)
+            slp.Save(filename)
+            loaded = SLP.Load(filename)
+            self.assertEqual(''.join(loaded.Chunks()), baseline.Classic(Sample("Thue-Morse"), '0', 12)[-1])
+            self.assertEqual(loaded.Hash(), slp.Hash())
+        finally:
+            shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    unittest.main()
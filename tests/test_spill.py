@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Out-of-core generation (cfg.memory, spill.py) against the original loops.
+"""
+
+import os
+import pickle
+import random
+import shutil
+import tempfile
+import unittest
+
+import baseline
+from test_functions import Joined
+from lsex.functions import LSEXfunctions, LSEXconfig
+from lsex.rules import Sample
+
+
+class SpillTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _Chunks(self, rule, start, recs, replacetype=None, memory=64, chunksize=7):
+        cfg = LSEXconfig(rule, start, recs, replacetype, memory=memory,
+                         spillpath=self.folder)
+        Grammar = Joined(LSEXfunctions().Iterate_chunks(cfg, chunksize))
+        # spill files are removed when the run ends
+        self.assertEqual(os.listdir(self.folder), [])
+        return Grammar
+
+    def test_classic(self):
+        for name in baseline.SYSTEMS:
+            rule = Sample(name)
+            reference = baseline.Classic(rule, '0', 12)
+            for memory in (0, 64, 1 << 12):
+                self.assertEqual(self._Chunks(rule, '0', 12, memory=memory), reference,
+                                 (name, memory))
+
+    def test_extended(self):
+        rng = random.Random(8)
+        for replacetype in ('segm', 'cont', 'cont_n'):
+            for tt in range(0, 60):
+                rule = baseline.Randomrule(rng, width=rng.randint(2, 3))
+                start = baseline.Randomstring(rng)
+                reference = baseline.Extended(rule, start, 7, replacetype)
+                self.assertEqual(self._Chunks(rule, start, 7, replacetype,
+                                              memory=rng.choice((0, 16, 256)),
+                                              chunksize=rng.randint(1, 9)),
+                                 reference, (rule, start, replacetype))
+
+    def test_unicode(self):
+        rule = [[u'αβ', u'βα'], [u'βα', u'αβ€β']]
+        start = u'αβαβ'
+        for replacetype in ('segm', 'cont', 'cont_n'):
+            self.assertEqual(self._Chunks(rule, start, 6, replacetype, memory=16),
+                             baseline.Extended(rule, start, 6, replacetype))
+
+    def test_stream(self):
+        rule = Sample("Thue-Morse")
+        output = os.path.join(self.folder, 'output')
+        os.mkdir(output)
+        cfg = LSEXconfig(rule, '0', 11, outputpath=output, pickout=True, memory=128)
+        files = LSEXfunctions().Stream(cfg, chunksize=10)
+        with open(files[0], 'rb') as f:
+            self.assertEqual(pickle.load(f), baseline.Classic(rule, '0', 11))
+        # the spill files were written next to the output files
+        self.assertEqual(sorted(os.listdir(output)), sorted(os.path.basename(f) for f in files))
+
+
+if __name__ == '__main__':
+    unittest.main()
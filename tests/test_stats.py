@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+n-gram statistics (stats.Classicstats, stats.Streamstats, the stats
+file) against the n-grams of the original iterations.
+"""
+
+import os
+import random
+import shutil
+import tempfile
+import unittest
+
+import baseline
+from lsex.functions import LSEXfunctions, LSEXconfig
+from lsex.rules import Sample
+from lsex.stats import Classicstats, Streamstats, Readstatsfile
+
+
+def Counted(Grammar, order):
+    """ n-gram counts of every iteration, counted directly """
+    iterations = []
+    for item in Grammar:
+        counts = []
+        for n in range(1, order + 1):
+            grams = {}
+            for ii in range(0, len(item) - n + 1):
+                grams[item[ii:ii+n]] = grams.get(item[ii:ii+n], 0) + 1
+            counts.append(grams)
+        iterations.append(counts)
+    return iterations
+
+
+class StatsTest(unittest.TestCase):
+
+    def test_classic(self):
+        for name in baseline.SYSTEMS:
+            rule = Sample(name)
+            for order in (1, 2, 4):
+                self.assertEqual(list(Classicstats(rule, '01', order).Iterations(9)),
+                                 Counted(baseline.Classic(rule, '01', 9), order), (name, order))
+
+    def test_random(self):
+        rng = random.Random(15)
+        for tt in range(0, 200):
+            rule, start = baseline.Randomclassic(rng)
+            order = rng.randint(1, 4)
+            reference = Counted(baseline.Classic(rule, start, 6), order)
+            cfg = LSEXconfig(rule, start, 6)
+            # erasing rules are counted by Streamstats
+            self.assertEqual(LSEXfunctions().Statistics(cfg, order), reference, (rule, start))
+
+    def test_stream(self):
+        rng = random.Random(16)
+        for replacetype in ('segm', 'cont', 'cont_n'):
+            for tt in range(0, 50):
+                rule = baseline.Randomrule(rng, width=rng.randint(2, 3))
+                start = baseline.Randomstring(rng)
+                order = rng.randint(1, 3)
+                Grammar = baseline.Extended(rule, start, 6, replacetype)
+                cfg = LSEXconfig(rule, start, 6, replacetype)
+                self.assertEqual(LSEXfunctions().Statistics(cfg, order), Counted(Grammar, order),
+                                 (rule, start, replacetype))
+                stats = Streamstats(order)
+                for item in Grammar:
+                    size = rng.randint(1, 5)
+                    for xx in range(0, len(item), size):
+                        stats.Write(item[xx:xx+size])
+                    stats.EndIteration()
+                self.assertEqual(stats.iterations, Counted(Grammar, order))
+
+    def test_statsfile(self):
+        folder = tempfile.mkdtemp()
+        try:
+            for rule, replacetype in ((Sample("Fibonacci"), None),
+                                      ([['01', '10'], ['10', '011']], 'cont')):
+                for keeplast in (False, True):
+                    prefix = '%s%d' % (replacetype, keeplast)
+                    cfg = LSEXconfig(rule, '0110', 8, replacetype, outputpath=folder,
+                                     prefix=prefix, stats=3)
+                    files = LSEXfunctions().Stream(cfg, keeplast, chunksize=4)
+                    statsfile = [f for f in files if '_grammar_stats_' in f][0]
+                    if replacetype is None:
+                        Grammar = baseline.Classic(rule, '0110', 8)
+                    else:
+                        Grammar = baseline.Extended(rule, '0110', 8, replacetype)
+                    reference = dict(enumerate(Counted(Grammar, 3)))
+                    if keeplast:
+                        reference = {8: reference[8]}
+                    self.assertEqual(Readstatsfile(statsfile), reference)
+                    for f in files:
+                        os.remove(f)
+        finally:
+            shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+Parameter sweeps (sweep.Sweep) against the original loops.
+"""
+
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+import baseline
+from lsex.rules import Sample
+from lsex.sweep import Sweep, Loadstart
+
+
+def Loaddat(files):
+    """ Grammar of the .dat file of a job """
+    dat = [f for f in files if f.endswith('.dat')][0]
+    with open(dat, 'rb') as f:
+        return pickle.load(f)
+
+
+class SweepTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _Spec(self, jobs):
+        return {'outputpath': self.folder, 'txtout': False, 'pickout': True, 'jobs': jobs}
+
+    def test_jobs(self):
+        extended = [['ab', 'ba'], ['abba', 'b']]
+        sweep = Sweep(self._Spec([
+            {'rule': baseline.SYSTEMS, 'start': ['0', '1'], 'recs': [4, 6]},
+            {'rule': extended, 'start': 'abab', 'recs': 4,
+             'replacetype': ['segm', 'cont', 'cont_n']},
+            # classic rules ignore the replacement type: duplicates
+            {'rule': 'Fibonacci', 'start': '0', 'recs': 4, 'replacetype': ['segm', 'cont']}]))
+        self.assertEqual(len(sweep.jobs), len(baseline.SYSTEMS) * 4 + 3)
+        self.assertEqual(sweep.duplicates, 2)
+
+        for workers in (1, 2):
+            results = sweep.Run(workers, manifest=workers == 1)
+            self.assertEqual(len(results), len(sweep.jobs))
+            for job, result in zip(sweep.jobs, results):
+                self.assertTrue(result['error'] is None, result['error'])
+                if job['replacetype'] is None:
+                    reference = baseline.Classic(job['rule'], job['start'], job['recs'])
+                else:
+                    reference = baseline.Extended(job['rule'], job['start'], job['recs'],
+                                                  job['replacetype'])
+                self.assertEqual(Loaddat(result['files']), reference)
+                self.assertEqual(result['lengths'], [len(item) for item in reference])
+                for f in result['files']:
+                    os.remove(f)
+
+        with open(sweep.manifest) as f:
+            manifest = json.load(f)
+        self.assertEqual(len(manifest['jobs']), len(sweep.jobs))
+        self.assertEqual(manifest['duplicates'], 2)
+
+    def test_startfile(self):
+        rule = Sample("Fibonacci")
+        first = Sweep(self._Spec([{'rule': rule, 'start': '0', 'recs': 6}])).Run(1, False)[0]
+        dat = [f for f in first['files'] if f.endswith('.dat')][0]
+        Grammar = baseline.Classic(rule, '0', 6)
+        self.assertEqual(Loadstart(dat, 3), Grammar[3])
+        self.assertEqual(Loadstart(dat), Grammar[6])
+        self.assertRaises(IndexError, Loadstart, dat, 7)
+        self.assertRaises(IndexError, Loadstart, dat, -2)
+
+        extended = [['01', '10'], ['10', '0110']]
+        result = Sweep(self._Spec([{'rule': extended, 'startfile': dat, 'startiteration': 4,
+                                    'recs': 3, 'replacetype': 'cont'}])).Run(1, False)[0]
+        self.assertTrue(result['error'] is None, result['error'])
+        self.assertEqual(Loaddat(result['files']),
+                         baseline.Extended(extended, Grammar[4], 3, 'cont'))
+
+        result = Sweep(self._Spec([{'rule': extended, 'startfile': dat, 'startiteration': 9,
+                                    'recs': 3, 'replacetype': 'cont'}])).Run(1, False)[0]
+        self.assertTrue(result['error'].startswith('IndexError'))
+
+    def test_errors(self):
+        self.assertRaises(ValueError, Sweep, self._Spec([{'rule': 'Fibonacci', 'recs': 3}]))
+        self.assertRaises(ValueError, Sweep, self._Spec([{'rule': 'Fibonacci', 'start': '0'}]))
+        self.assertRaises(ValueError, Sweep,
+                          self._Spec([{'rule': 'Fibonacci', 'start': '0', 'recs': 3, 'bitout': True}]))
+        self.assertRaises(KeyError, Sweep, self._Spec([{'rule': 'Fib', 'start': '0', 'recs': 3}]))
+
+
+if __name__ == '__main__':
+    unittest.main()